@@ -1,17 +1,36 @@
 import os
-from fastapi import FastAPI, HTTPException
+import threading
+import httpx
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from fastapi import FastAPI, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional
+from pydantic import BaseModel
 
 from immich_pyclient import Immich
 from jellyfin_pyclient import JellyfinCollectionManager
-from up_bank_pyclient import UpClient
+from up_bank_pyclient import AsyncUpClient, ResponseCache
+from up_bank_pyclient.database import MAX_QUERY_LIMIT, UpDatabase
+from up_bank_pyclient.local import LocalReader
+from up_bank_pyclient.metrics import get_metrics_registry
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Release the shared Up API connection pool on shutdown"""
+    yield
+    await client.aclose()
+    if _local is not None:
+        _local.db.close()
 
 app = FastAPI(
     title="API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware( 
@@ -57,23 +76,96 @@ async def scan_library() -> Dict[str, str]:
     except Exception as e:
         return {"status": "error", "message": f"Error triggering scan: {str(e)}"}
 
-client = UpClient(api_key=os.getenv("UP_API_KEY"))
+# Shared with the sync tool and any other client in this process
+metrics_registry = get_metrics_registry()
+client = AsyncUpClient(
+    api_key=os.getenv("UP_API_KEY"),
+    cache=ResponseCache(),
+    metrics=metrics_registry,
+)
+
+# Local copy kept up to date by the sync tool
+DB_PATH = os.getenv("UPBANK_DB_PATH", "upbank.db")
+LOCAL_MAX_AGE = timedelta(seconds=int(os.getenv("UPBANK_LOCAL_MAX_AGE", "900")))
+
+# Where /accounts, /categories and /transactions read from when a request
+# doesn't pass ?source=: "upstream" (the Up API) or "local" (the database,
+# falling back to upstream when the last full sync is older than the max age)
+API_SOURCE = os.getenv("UPBANK_API_SOURCE", "upstream")
+
+_local: Optional[LocalReader] = None
+_local_lock = threading.Lock()
+
+def local_reader() -> Optional[LocalReader]:
+    """Reader over the synced database, opened on first use (None until the sync tool creates it)
+
+    The API never writes, so it opens only a pool of WAL readers, which
+    keep serving while a sync writes, and neither creates nor migrates the
+    file. Opening blocks, so the first call comes from a worker thread
+    (``fresh_local`` and the sync search route).
+    """
+    global _local
+    with _local_lock:
+        if _local is None and os.path.exists(DB_PATH):
+            database = UpDatabase(DB_PATH, profile="wal", readers=4, read_only=True)
+            _local = LocalReader(database, max_age=LOCAL_MAX_AGE)
+        return _local
+
+SourceQuery = Query(None, pattern="^(local|upstream)$", description="Read from the local database or the Up API")
+
+async def fresh_local(resource: str, source: Optional[str]) -> Optional[datetime]:
+    """When ``resource`` was synced, if this request should and can be served locally"""
+    if (source or API_SOURCE) != "local":
+        return None
+    local = await run_in_threadpool(local_reader)
+    return await run_in_threadpool(local.fresh, resource) if local else None
+
+def freshness_headers(synced_at: Optional[datetime]) -> Dict[str, str]:
+    """Say where a response came from and how current it is (upstream data is current now)"""
+    return {
+        "X-Data-Source": "local" if synced_at else "upstream",
+        "X-Data-Synced-At": (synced_at or datetime.now(timezone.utc)).isoformat(),
+    }
+
+def upstream_error(error: httpx.HTTPError) -> HTTPException:
+    """The error to answer with when an Up API request fails
+
+    Client errors (a rejected filter, a bad key, throttling) keep their
+    status; server errors and network failures become 502.
+    """
+    if isinstance(error, httpx.HTTPStatusError) and error.response.status_code < 500:
+        return HTTPException(status_code=error.response.status_code, detail=str(error))
+    return HTTPException(status_code=502, detail=f"Up API request failed: {error}")
+
+@app.get("/metrics")
+async def metrics():
+    """Per-endpoint request latency, size, retry and parse-time metrics for the UP client"""
+    return metrics_registry.snapshot()
 
 @app.get("/ping")
 async def ping():
     """Check if the API is working"""
-    return client.ping()
+    return await client.ping()
 
 @app.get("/accounts")
-async def list_accounts(page_size = None):
+async def list_accounts(response: Response, page_size = None, source: Optional[str] = SourceQuery):
     """List all accounts"""
-    return client.list_accounts(page_size=page_size)
+    synced_at = await fresh_local("accounts", source)
+    response.headers.update(freshness_headers(synced_at))
+    if synced_at:
+        return await run_in_threadpool(local_reader().list_accounts)
+    return await client.list_accounts(page_size=page_size)
 
 @app.get("/accounts/{account_id}")
-async def get_account(account_id):
+async def get_account(account_id, response: Response, source: Optional[str] = SourceQuery):
     """Get a specific account"""
+    synced_at = await fresh_local("accounts", source)
+    account = await run_in_threadpool(local_reader().get_account, account_id) if synced_at else None
+    response.headers.update(freshness_headers(synced_at if account else None))
+    if account:
+        return account
     try:
-        return client.get_account(account_id)
+        return await client.get_account(account_id)
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -84,10 +176,41 @@ async def list_transactions(
     since = None,
     until = None,
     category = None,
-    tag = None
+    tag = None,
+    source: Optional[str] = SourceQuery
 ):
-    """List all transactions with optional filters"""
-    return client.list_transactions(
+    """List all transactions with optional filters
+    
+    Upstream pages are streamed to the caller as they arrive instead of
+    buffering the whole history in memory first. Local reads stream the
+    database a keyset page at a time.
+    """
+    synced_at = await fresh_local("transactions", source)
+    headers = freshness_headers(synced_at)
+
+    if synced_at:
+        transactions = local_reader().iter_transactions(
+            status=status, since=since, until=until, category=category, tag=tag
+        )
+        # Like the upstream path, read the first row before the 200 goes
+        # out, so an unparseable since/until is still a 400
+        try:
+            first = await run_in_threadpool(next, transactions, None)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        def local_body(transaction):
+            yield '{"data":['
+            separator = ""
+            while transaction is not None:
+                yield separator + transaction.model_dump_json(by_alias=True)
+                separator = ","
+                transaction = next(transactions, None)
+            yield '],"links":{"prev":null,"next":null}}'
+
+        return StreamingResponse(local_body(first), media_type="application/json", headers=headers)
+
+    pages = client.iter_transaction_pages(
         page_size=page_size,
         status=status,
         since=since,
@@ -95,67 +218,151 @@ async def list_transactions(
         category=category,
         tag=tag
     )
+    # Fetch the first page before the 200 goes out, so an upstream failure
+    # is still reported with an error status
+    try:
+        first = await anext(pages, None)
+    except httpx.HTTPError as e:
+        raise upstream_error(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def upstream_body(page):
+        yield '{"data":['
+        separator = ""
+        while page is not None:
+            for transaction in page.data:
+                yield separator + transaction.model_dump_json(by_alias=True)
+                separator = ","
+            page = await anext(pages, None)
+        yield '],"links":{"prev":null,"next":null}}'
+
+    return StreamingResponse(upstream_body(first), media_type="application/json", headers=headers)
+
+@app.get("/transactions/search")
+def search_transactions(
+    response: Response,
+    q: str,
+    account: Optional[str] = None,
+    category: Optional[str] = None,
+    tag: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=MAX_QUERY_LIMIT),
+):
+    """Full-text search of synced transactions, best match first"""
+    local = local_reader()
+    if local is None:
+        raise HTTPException(status_code=503, detail="No synced database to search yet")
+    database = local.db
+    try:
+        results = database.search_transactions(
+            q, account=account, category=category, tag=tag, status=status,
+            since=since, until=until, limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    synced_at = database.get_synced_at("transactions")
+    response.headers.update({
+        "X-Data-Source": "local",
+        "X-Data-Synced-At": synced_at.isoformat() if synced_at else "",
+    })
+    return {"data": results}
 
 @app.get("/transactions/{transaction_id}")
-async def get_transaction(transaction_id):
+async def get_transaction(transaction_id, response: Response, source: Optional[str] = SourceQuery):
     """Get a specific transaction"""
-    return client.get_transaction(transaction_id)
+    synced_at = await fresh_local("transactions", source)
+    transaction = await run_in_threadpool(local_reader().get_transaction, transaction_id) if synced_at else None
+    response.headers.update(freshness_headers(synced_at if transaction else None))
+    return transaction or await client.get_transaction(transaction_id)
 
 @app.get("/categories")
-async def list_categories(parent = None):
+async def list_categories(response: Response, parent = None, source: Optional[str] = SourceQuery):
     """List all categories"""
-    return client.list_categories(parent=parent)
+    synced_at = await fresh_local("categories", source)
+    response.headers.update(freshness_headers(synced_at))
+    if synced_at:
+        return await run_in_threadpool(local_reader().list_categories, parent)
+    return await client.list_categories(parent=parent)
 
 @app.get("/categories/{category_id}")
-async def get_category(category_id):
+async def get_category(category_id, response: Response, source: Optional[str] = SourceQuery):
     """Get a specific category"""
-    return client.get_category(category_id)
+    synced_at = await fresh_local("categories", source)
+    category = await run_in_threadpool(local_reader().get_category, category_id) if synced_at else None
+    response.headers.update(freshness_headers(synced_at if category else None))
+    return category or await client.get_category(category_id)
 
 @app.get("/tags")
 async def list_tags(page_size = None):
     """List all tags"""
-    return client.list_tags(page_size=page_size)
+    return await client.list_tags(page_size=page_size)
+
+class BulkTagUpdate(BaseModel):
+    """Tags to add or remove, keyed by transaction ID"""
+    tags: Dict[str, List[str]]
+
+class BulkCategoryUpdate(BaseModel):
+    """Category to set (or null to clear), keyed by transaction ID"""
+    categories: Dict[str, Optional[str]]
+
+@app.post("/transactions/bulk/tags")
+async def bulk_add_tags(update: BulkTagUpdate):
+    """Add tags to many transactions, reporting per-transaction success"""
+    return await client.bulk_add_tags(update.tags)
+
+@app.delete("/transactions/bulk/tags")
+async def bulk_remove_tags(update: BulkTagUpdate):
+    """Remove tags from many transactions, reporting per-transaction success"""
+    return await client.bulk_remove_tags(update.tags)
+
+@app.patch("/transactions/bulk/category")
+async def bulk_set_category(update: BulkCategoryUpdate):
+    """Set or clear the category of many transactions, reporting per-transaction success"""
+    return await client.bulk_set_category(update.categories)
 
 @app.post("/transactions/{transaction_id}/tags")
 async def add_tags(transaction_id, tag_update):
     """Add tags to a transaction"""
-    client.add_tags_to_transaction(transaction_id, tag_update.tags)
+    await client.add_tags_to_transaction(transaction_id, tag_update.tags)
     return {"status": "success"}
 
 @app.delete("/transactions/{transaction_id}/tags")
 async def remove_tags(transaction_id, tag_update):
     """Remove tags from a transaction"""
-    client.remove_tags_from_transaction(transaction_id, tag_update.tags)
+    await client.remove_tags_from_transaction(transaction_id, tag_update.tags)
     return {"status": "success"}
 
 @app.patch("/transactions/{transaction_id}/category")
 async def update_category(transaction_id, category_update):
     """Update or remove a transaction's category"""
-    client.update_transaction_category(transaction_id, category_update.category_id)
+    await client.update_transaction_category(transaction_id, category_update.category_id)
     return {"status": "success"}
 
 @app.get("/webhooks")
 async def list_webhooks(page_size = None):
     """List all webhooks"""
-    return client.list_webhooks(page_size=page_size)
+    return await client.list_webhooks(page_size=page_size)
 
 @app.post("/webhooks")
 async def create_webhook(webhook):
     """Create a new webhook"""
-    return client.create_webhook(url=webhook.url, description=webhook.description)
+    return await client.create_webhook(url=webhook.url, description=webhook.description)
 
 @app.get("/webhooks/{webhook_id}")
 async def get_webhook(webhook_id):
     """Get a specific webhook"""
-    return client.get_webhook(webhook_id)
+    return await client.get_webhook(webhook_id)
 
 @app.delete("/webhooks/{webhook_id}")
 async def delete_webhook(webhook_id):
     """Delete a webhook"""
-    client.delete_webhook(webhook_id)
+    await client.delete_webhook(webhook_id)
     return {"status": "success"}
 
 @app.get("/webhooks/{webhook_id}/logs")
 async def list_webhook_logs(webhook_id, page_size = None):
     """List logs for a specific webhook"""
-    return client.list_webhook_logs(webhook_id, page_size=page_size)
\ No newline at end of file
+    return await client.list_webhook_logs(webhook_id, page_size=page_size)
\ No newline at end of file
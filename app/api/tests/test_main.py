@@ -0,0 +1,126 @@
+"""
+Tests for the API's transaction routes
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import httpx
+from fastapi.testclient import TestClient
+
+WORKDIR = tempfile.mkdtemp()
+os.environ.setdefault("UP_API_KEY", "test-api-key")
+os.environ["UPBANK_DB_PATH"] = os.path.join(WORKDIR, "api.db")
+
+from api import main
+from up_bank_pyclient.async_client import AsyncUpClient
+from up_bank_pyclient.benchmarks.synthetic import make_transaction_page, make_transactions
+from up_bank_pyclient.database import UpDatabase
+from up_bank_pyclient.models.records import TransactionRecord
+from up_bank_pyclient.ratelimit import RateLimiter
+
+NEXT_PAGE = "https://api.up.com.au/api/v1/transactions?page%5Bafter%5D=page-2"
+
+def tearDownModule():
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+
+def sync_database() -> None:
+    """Store a few transactions where the API reads, as the sync tool would"""
+    db = UpDatabase(os.environ["UPBANK_DB_PATH"])
+    db.insert_transactions(TransactionRecord.from_json(t).model_dump() for t in make_transactions(5))
+    db.mark_synced("transactions")
+    db.close()
+
+def make_client(handler) -> AsyncUpClient:
+    """An AsyncUpClient answering from ``handler`` instead of the network"""
+    return AsyncUpClient(
+        "test-api-key",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        rate_limiter=RateLimiter(rate=1000, burst=1000),
+        max_retries=0,
+        prefetch=False,
+    )
+
+class TestUpstreamTransactions(unittest.TestCase):
+    def get(self, handler, params=None):
+        with patch.object(main, "client", make_client(handler)):
+            return TestClient(main.app).get("/transactions", params={"source": "upstream", **(params or {})})
+
+    def test_pages_are_streamed_in_order(self):
+        """Test every upstream page reaches the body, starting with the one fetched up front"""
+        def handler(request):
+            if "page[after]" in request.url.params:
+                return httpx.Response(200, json=make_transaction_page(2, 3))
+            return httpx.Response(200, json=make_transaction_page(0, 2, NEXT_PAGE))
+
+        response = self.get(handler)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Data-Source"], "upstream")
+        self.assertEqual(
+            [transaction["id"] for transaction in response.json()["data"]],
+            [f"txn-{i:08d}" for i in range(5)]
+        )
+
+    def test_upstream_failures_keep_an_error_status(self):
+        """Test a failed first page is an error response, not a 200 with a broken body"""
+        for upstream, expected in ((400, 400), (401, 401), (429, 429), (503, 502)):
+            with self.subTest(upstream=upstream):
+                response = self.get(lambda request: httpx.Response(upstream, json={"errors": []}))
+                self.assertEqual(response.status_code, expected)
+                self.assertIn("detail", response.json())
+
+        def unreachable(request):
+            raise httpx.ConnectError("connection refused", request=request)
+
+        self.assertEqual(self.get(unreachable).status_code, 502)
+
+class TestLocalTransactions(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        sync_database()
+
+    def test_rows_are_streamed(self):
+        """Test a fresh local copy is served without going upstream"""
+        response = TestClient(main.app).get("/transactions", params={"source": "local"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Data-Source"], "local")
+        self.assertEqual(len(response.json()["data"]), 5)
+
+    def test_invalid_dates_are_rejected_before_streaming(self):
+        """Test an unparseable since/until is a 400 rather than a 200 with an empty body"""
+        for params in ({"since": "yesterday"}, {"until": "2024-13-01"}):
+            with self.subTest(**params):
+                response = TestClient(main.app).get("/transactions", params={"source": "local", **params})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("detail", response.json())
+
+class TestDatabaseAccess(unittest.TestCase):
+    def test_nothing_is_opened_until_needed(self):
+        """Test upstream reads never create the database and search reports a missing one"""
+        missing = os.path.join(WORKDIR, "missing.db")
+        accounts = {"data": [], "links": {"prev": None, "next": None}}
+        with patch.object(main, "DB_PATH", missing), patch.object(main, "_local", None), \
+                patch.object(main, "client", make_client(lambda request: httpx.Response(200, json=accounts))):
+            client = TestClient(main.app)
+            self.assertEqual(client.get("/accounts").status_code, 200)
+            response = client.get("/accounts", params={"source": "local"})
+            self.assertEqual(response.headers["X-Data-Source"], "upstream")
+            self.assertEqual(client.get("/transactions/search", params={"q": "coffee"}).status_code, 503)
+            self.assertFalse(os.path.exists(missing))
+
+    def test_database_is_opened_read_only(self):
+        """Test the API reads through a reader pool without holding a writer connection"""
+        sync_database()
+        with patch.object(main, "_local", None):
+            local = main.local_reader()
+            try:
+                self.assertIsNone(local.db.conn)
+                self.assertEqual(len(local.db.readers), 4)
+            finally:
+                local.db.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,9 @@ UP Bank Python API Client
 """
 
 from upbank.client import UpClient
+from upbank.async_client import AsyncUpClient
+from upbank.cache import ResponseCache
+from upbank.metrics import MetricsRegistry
 
 __version__ = "0.1.0"
-__all__ = ["UpClient"] 
\ No newline at end of file
+__all__ = ["UpClient", "AsyncUpClient", "ResponseCache", "MetricsRegistry"] 
\ No newline at end of file
@@ -0,0 +1,437 @@
+"""
+Asynchronous UP Bank API Client implementation
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar, Union
+
+import httpx
+
+from upbank.client import (
+    DEFAULT_BASE_URL,
+    bulk_item_result,
+    category_list_payload,
+    next_page_cursor,
+    normalize_transaction,
+    parse_transaction_page,
+    transaction_params,
+)
+from upbank.cache import ResponseCache
+from upbank.metrics import MetricsRegistry
+from upbank.ratelimit import (
+    RateLimiter,
+    backoff_delay,
+    get_rate_limiter,
+    parse_retry_after,
+    should_retry,
+)
+from upbank.models.account import Account, AccountList
+from upbank.models.base import Links
+from upbank.models.bulk import BulkItemResult, BulkResult
+from upbank.models.records import RecordPage
+from upbank.models.transaction import Transaction, TransactionList
+from upbank.models.category import Category, CategoryList
+from upbank.models.tag import TagList
+from upbank.models.webhook import Webhook, WebhookList, WebhookLogList
+
+T = TypeVar("T")
+
+class AsyncPaginator:
+    """
+    Asynchronously iterate over every page of a paginated Up API endpoint
+
+    The async counterpart of ``upbank.client.Paginator``: with ``prefetch``
+    enabled the request for page N+1 runs as a task while the caller
+    handles page N.
+    """
+
+    def __init__(
+        self,
+        request: Callable[..., Awaitable[Dict]],
+        endpoint: str,
+        params: Optional[Dict] = None,
+        prefetch: bool = True,
+    ):
+        self.request = request
+        self.endpoint = endpoint
+        self.params = params
+        self.prefetch = prefetch
+
+    async def _fetch(self, cursor: Optional[str]) -> Dict:
+        params = dict(self.params or {})
+        if cursor:
+            params["page[after]"] = cursor
+        return await self.request("GET", self.endpoint, params=params or None)
+
+    async def __aiter__(self) -> AsyncIterator[Dict]:
+        pending = None
+        try:
+            data = await self._fetch(None)
+            while True:
+                cursor = next_page_cursor(data)
+                if cursor and self.prefetch:
+                    pending = asyncio.ensure_future(self._fetch(cursor))
+                yield data
+                if not cursor:
+                    return
+                data = await pending if pending else await self._fetch(cursor)
+                pending = None
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+class AsyncUpClient:
+    """
+    Asynchronous UP Bank API Client
+
+    All requests share one pooled ``httpx.AsyncClient``, so concurrent calls
+    reuse keep-alive connections instead of blocking the event loop.
+
+    Args:
+        api_key (str): Your UP Bank API key
+        base_url (str, optional): Base URL for the API. Defaults to "https://api.up.com.au/api/v1".
+        http_client (httpx.AsyncClient, optional): Pre-configured client to share between instances
+        max_connections (int, optional): Size of the connection pool when no client is given
+        timeout (float, optional): Per-request timeout in seconds when no client is given
+        rate_limiter (RateLimiter, optional): Limiter to pace requests. Defaults to the process-wide one
+        max_retries (int, optional): Retries for throttled or transient failures
+        cache (ResponseCache, optional): Opt-in cache for slow-changing GET responses
+        prefetch (bool, optional): Fetch the next page of list endpoints in the background
+        metrics (MetricsRegistry, optional): Registry to record per-endpoint request metrics in
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = DEFAULT_BASE_URL,
+        http_client: Optional[httpx.AsyncClient] = None,
+        max_connections: int = 20,
+        timeout: float = 30.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: int = 5,
+        cache: Optional[ResponseCache] = None,
+        prefetch: bool = True,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        self.api_key = api_key
+        self.token = api_key
+        self.base_url = base_url.rstrip("/")
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Accept": "application/json"
+        }
+        self._owns_http_client = http_client is None
+        self.http = http_client or httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=timeout,
+        )
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.max_retries = max_retries
+        self.cache = cache
+        self.prefetch = prefetch
+        self.metrics = metrics
+
+    async def __aenter__(self) -> "AsyncUpClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool if this client created it"""
+        if self._owns_http_client:
+            await self.http.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        json: Optional[Dict] = None
+    ) -> Dict:
+        """Make a request to the UP API, paced and retried like ``UpClient._request``"""
+        use_cache = method == "GET" and self.cache is not None and self.cache.cacheable(endpoint)
+        if use_cache:
+            cached = self.cache.get(endpoint, params)
+            if cached is not None:
+                return cached
+
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        for attempt in range(self.max_retries + 1):
+            wait = self.rate_limiter.reserve()
+            if wait:
+                await asyncio.sleep(wait)
+            start = time.perf_counter()
+            response = await self.http.request(
+                method, url, params=params, json=json, headers=self.headers
+            )
+            if self.metrics is not None:
+                self.metrics.record_request(
+                    method, endpoint, time.perf_counter() - start,
+                    response.status_code, len(response.content)
+                )
+            self.rate_limiter.observe(response.headers)
+            if attempt < self.max_retries and should_retry(method, response.status_code):
+                if self.metrics is not None:
+                    self.metrics.record_retry(method, endpoint)
+                delay = backoff_delay(attempt, parse_retry_after(response.headers))
+                if response.status_code == 429:
+                    self.rate_limiter.pause(delay)
+                await asyncio.sleep(delay)
+                continue
+            break
+        response.raise_for_status()
+        start = time.perf_counter()
+        data = response.json() if response.content else {}
+        if self.metrics is not None:
+            self.metrics.record_decode(method, endpoint, time.perf_counter() - start)
+        if use_cache:
+            self.cache.set(endpoint, params, data)
+        return data
+
+    def _parse(self, endpoint: str, parse: Callable[[Any], T], data: Any, method: str = "GET") -> T:
+        """Turn response data into models, timing validation when metrics are enabled"""
+        if self.metrics is None:
+            return parse(data)
+        with self.metrics.time_validation(method, endpoint):
+            return parse(data)
+
+    def invalidate_cache(self, resource: Optional[str] = None, endpoint: Optional[str] = None) -> None:
+        """Evict cached responses; clears everything when called without arguments"""
+        if self.cache is not None:
+            self.cache.invalidate(resource=resource, endpoint=endpoint)
+
+    def paginate(self, endpoint: str, params: Optional[Dict] = None) -> AsyncPaginator:
+        """Iterate over the raw JSON of every page of a list endpoint"""
+        return AsyncPaginator(self._request, endpoint, params, prefetch=self.prefetch)
+
+    async def _collect(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
+        data = []
+        async for page in self.paginate(endpoint, params):
+            data.extend(page["data"])
+        return {"data": data, "links": {"prev": None, "next": None}}
+
+    async def list_accounts(self, page_size: Optional[int] = None) -> AccountList:
+        """List all accounts"""
+        params = {"page[size]": page_size} if page_size else None
+        data = await self._collect("/accounts", params)
+        return self._parse("/accounts", AccountList.model_validate, data)
+
+    async def get_account(self, account_id: str) -> Account:
+        """Get a specific account"""
+        data = await self._request("GET", f"/accounts/{account_id}")
+        return self._parse(f"/accounts/{account_id}", Account.model_validate, data["data"])
+
+    async def iter_transaction_pages(
+        self,
+        since: Optional[Union[datetime, str]] = None,
+        until: Optional[Union[datetime, str]] = None,
+        category: Optional[str] = None,
+        tag: Optional[str] = None,
+        status: Optional[str] = None,
+        page_size: Optional[int] = 100,
+        raw: bool = False,
+        account_id: Optional[str] = None,
+    ) -> AsyncIterator[Union[TransactionList, RecordPage]]:
+        """Iterate over transaction pages as they arrive
+
+        Accepts the same filters as ``UpClient.iter_transaction_pages``.
+        """
+        params = transaction_params(
+            since=since,
+            until=until,
+            category=category,
+            tag=tag,
+            status=status,
+            page_size=page_size,
+        )
+        endpoint = f"/accounts/{account_id}/transactions" if account_id else "/transactions"
+        async for data in self.paginate(endpoint, params):
+            parse = RecordPage.from_json if raw else parse_transaction_page
+            yield self._parse(endpoint, parse, data)
+
+    async def iter_transactions(self, **kwargs) -> AsyncIterator[Transaction]:
+        """Iterate over individual transactions, fetching pages lazily"""
+        async for page in self.iter_transaction_pages(**kwargs):
+            for transaction in page.data:
+                yield transaction
+
+    async def list_transactions(
+        self,
+        since: Optional[Union[datetime, str]] = None,
+        until: Optional[Union[datetime, str]] = None,
+        category: Optional[str] = None,
+        tag: Optional[str] = None,
+        status: Optional[str] = None,
+        page_size: Optional[int] = 100,
+        raw: bool = False,
+    ) -> Union[TransactionList, RecordPage]:
+        """List all transactions
+
+        Accepts the same filters as ``UpClient.list_transactions``.
+        """
+        transactions = [
+            transaction
+            async for transaction in self.iter_transactions(
+                since=since,
+                until=until,
+                category=category,
+                tag=tag,
+                status=status,
+                page_size=page_size,
+                raw=raw,
+            )
+        ]
+        if raw:
+            return RecordPage(transactions, Links(prev=None, next=None))
+        return TransactionList(data=transactions, links=Links(prev=None, next=None))
+
+    async def get_transaction(self, transaction_id: str) -> Transaction:
+        """Get a specific transaction"""
+        data = await self._request("GET", f"/transactions/{transaction_id}")
+        return self._parse(
+            f"/transactions/{transaction_id}", Transaction.model_validate, normalize_transaction(data["data"])
+        )
+
+    async def list_categories(self, parent: Optional[str] = None) -> CategoryList:
+        """List all categories"""
+        params = {"filter[parent]": parent} if parent else None
+        data = await self._request("GET", "/categories", params=params)
+        return self._parse("/categories", CategoryList.model_validate, category_list_payload(data))
+
+    async def get_category(self, category_id: str) -> Category:
+        """Get a specific category"""
+        data = await self._request("GET", f"/categories/{category_id}")
+        return self._parse(f"/categories/{category_id}", Category.model_validate, data["data"])
+
+    async def list_tags(self, page_size: Optional[int] = None) -> TagList:
+        """List all tags"""
+        params = {"page[size]": page_size} if page_size else None
+        data = await self._collect("/tags", params)
+        return self._parse("/tags", TagList.model_validate, data)
+
+    async def add_tags_to_transaction(self, transaction_id: str, tags: List[str]) -> None:
+        """Add tags to a transaction"""
+        json = {
+            "data": [{"type": "tags", "id": tag} for tag in tags]
+        }
+        await self._request("POST", f"/transactions/{transaction_id}/relationships/tags", json=json)
+        self.invalidate_cache(resource="tags")
+        self.invalidate_cache(resource="transactions")
+
+    async def remove_tags_from_transaction(self, transaction_id: str, tags: List[str]) -> None:
+        """Remove tags from a transaction"""
+        json = {
+            "data": [{"type": "tags", "id": tag} for tag in tags]
+        }
+        await self._request("DELETE", f"/transactions/{transaction_id}/relationships/tags", json=json)
+        self.invalidate_cache(resource="tags")
+        self.invalidate_cache(resource="transactions")
+
+    async def update_transaction_category(
+        self, transaction_id: str, category_id: Optional[str]
+    ) -> None:
+        """Update or remove a transaction's category"""
+        json = {
+            "data": {"type": "categories", "id": category_id} if category_id else None
+        }
+        await self._request(
+            "PATCH",
+            f"/transactions/{transaction_id}/relationships/category",
+            json=json
+        )
+        self.invalidate_cache(resource="transactions")
+
+    async def _bulk(
+        self,
+        operation: Callable[[str, Any], Awaitable[None]],
+        mapping: Dict[str, Any],
+        max_workers: int,
+    ) -> BulkResult:
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def run(transaction_id: str, value: Any) -> BulkItemResult:
+            async with semaphore:
+                try:
+                    await operation(transaction_id, value)
+                except Exception as e:
+                    return bulk_item_result(transaction_id, e)
+                return bulk_item_result(transaction_id, None)
+
+        results = await asyncio.gather(*(run(tid, value) for tid, value in mapping.items()))
+        return BulkResult(results=list(results))
+
+    async def bulk_add_tags(self, mapping: Dict[str, List[str]], max_workers: int = 8) -> BulkResult:
+        """Add tags to many transactions concurrently; see ``UpClient.bulk_add_tags``"""
+        return await self._bulk(self.add_tags_to_transaction, mapping, max_workers)
+
+    async def bulk_remove_tags(self, mapping: Dict[str, List[str]], max_workers: int = 8) -> BulkResult:
+        """Remove tags from many transactions concurrently"""
+        return await self._bulk(self.remove_tags_from_transaction, mapping, max_workers)
+
+    async def bulk_set_category(self, mapping: Dict[str, Optional[str]], max_workers: int = 8) -> BulkResult:
+        """Set or clear (with None) the category of many transactions concurrently"""
+        return await self._bulk(self.update_transaction_category, mapping, max_workers)
+
+    async def list_webhooks(self, page_size: Optional[int] = None) -> WebhookList:
+        """List all webhooks"""
+        params = {"page[size]": page_size} if page_size else None
+        data = await self._collect("/webhooks", params)
+        return self._parse("/webhooks", WebhookList.model_validate, data)
+
+    async def create_webhook(self, url: str, description: Optional[str] = None) -> Webhook:
+        """Create a new webhook"""
+        json = {
+            "data": {
+                "attributes": {
+                    "url": url,
+                    "description": description
+                }
+            }
+        }
+        data = await self._request("POST", "/webhooks", json=json)
+        self.invalidate_cache(resource="webhooks")
+        return self._parse("/webhooks", Webhook.model_validate, data["data"], method="POST")
+
+    async def get_webhook(self, webhook_id: str) -> Webhook:
+        """Get a specific webhook"""
+        data = await self._request("GET", f"/webhooks/{webhook_id}")
+        return self._parse(f"/webhooks/{webhook_id}", Webhook.model_validate, data["data"])
+
+    async def delete_webhook(self, webhook_id: str) -> None:
+        """Delete a webhook"""
+        await self._request("DELETE", f"/webhooks/{webhook_id}")
+        self.invalidate_cache(resource="webhooks")
+
+    async def list_webhook_logs(
+        self, webhook_id: str, page_size: Optional[int] = None
+    ) -> WebhookLogList:
+        """List logs for a specific webhook"""
+        params = {"page[size]": page_size} if page_size else None
+        data = await self._collect(f"/webhooks/{webhook_id}/logs", params)
+        return self._parse(f"/webhooks/{webhook_id}/logs", WebhookLogList.model_validate, data)
+
+    async def get_accounts(self, page_size: Optional[int] = None) -> AccountList:
+        """Alias for list_accounts"""
+        return await self.list_accounts(page_size)
+
+    async def get_transactions(self, **kwargs) -> TransactionList:
+        """Alias for list_transactions"""
+        return await self.list_transactions(**kwargs)
+
+    async def get_categories(self, parent: Optional[str] = None) -> CategoryList:
+        """Alias for list_categories"""
+        return await self.list_categories(parent)
+
+    async def get_webhooks(self, page_size: Optional[int] = None) -> WebhookList:
+        """Alias for list_webhooks"""
+        return await self.list_webhooks(page_size)
+
+    async def ping(self) -> Dict:
+        """Ping the API to check if it's working"""
+        return await self._request("GET", "/util/ping")
@@ -0,0 +1,3 @@
+"""
+Benchmarks for the UP Bank client, sync and storage layers
+"""
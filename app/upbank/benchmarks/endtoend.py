@@ -0,0 +1,127 @@
+"""
+Time UpClient, UpBankSync and both handlers end to end against the local simulator
+
+Usage: python -m upbank.benchmarks.endtoend [--sizes 10000 100000 1000000]
+       [--latency 0.0] [--throttle-every 0] [--output results.json] [--baseline results.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from upbank.benchmarks.simulator import MAX_PAGE_SIZE, UpSimulator
+from upbank.client import UpClient
+from upbank.ratelimit import RateLimiter
+from upbank.sync import CsvHandler, DatabaseHandler, UpBankSync
+
+def make_client(simulator: UpSimulator) -> UpClient:
+    """A client pointed at the simulator, paced only by the simulator's own throttling"""
+    return UpClient(
+        "benchmark",
+        base_url=simulator.base_url,
+        rate_limiter=RateLimiter(rate=1_000_000, burst=1_000_000),
+    )
+
+def client_pages(simulator: UpSimulator, raw: bool) -> int:
+    client = make_client(simulator)
+    return sum(
+        len(page.data)
+        for page in client.iter_transaction_pages(page_size=MAX_PAGE_SIZE, raw=raw)
+    )
+
+def sync_to(simulator: UpSimulator, handler, trusted: bool) -> int:
+    sync = UpBankSync("benchmark", handler, trusted=trusted)
+    sync.client = make_client(simulator)
+    sync.dev_mode = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        sync.sync_accounts()
+        sync.sync_categories()
+        sync.sync_transactions()
+    return simulator.bank.transactions
+
+def sync_database(simulator: UpSimulator, workdir: str, trusted: bool) -> int:
+    handler = DatabaseHandler(os.path.join(workdir, f"bench-{time.monotonic_ns()}.db"))
+    try:
+        return sync_to(simulator, handler, trusted)
+    finally:
+        handler.db.close()
+
+def sync_csv(simulator: UpSimulator, workdir: str, trusted: bool) -> int:
+    handler = CsvHandler(os.path.join(workdir, f"csv-{time.monotonic_ns()}"))
+    count = sync_to(simulator, handler, trusted)
+    handler.flush()
+    return count
+
+SCENARIOS: Dict[str, Callable[[UpSimulator, str], int]] = {
+    "client": lambda sim, _: client_pages(sim, raw=False),
+    "client raw": lambda sim, _: client_pages(sim, raw=True),
+    "sync sqlite": lambda sim, workdir: sync_database(sim, workdir, trusted=False),
+    "sync sqlite trusted": lambda sim, workdir: sync_database(sim, workdir, trusted=True),
+    "sync csv": lambda sim, workdir: sync_csv(sim, workdir, trusted=False),
+    "sync csv trusted": lambda sim, workdir: sync_csv(sim, workdir, trusted=True),
+}
+
+def run(
+    sizes: List[int],
+    scenarios: List[str],
+    latency: float = 0.0,
+    throttle_every: int = 0,
+    retry_after: float = 0.05,
+) -> Dict[str, Dict[str, float]]:
+    """Run every scenario at every size, returning seconds keyed by "scenario@size" """
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'scenario':<22} {'size':>10} {'seconds':>9} {'txn/s':>12} {'requests':>9} {'429s':>6}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            for name in scenarios:
+                with UpSimulator(
+                    transactions=size,
+                    latency=latency,
+                    throttle_every=throttle_every,
+                    retry_after=retry_after,
+                ) as simulator:
+                    start = time.perf_counter()
+                    count = SCENARIOS[name](simulator, workdir)
+                    elapsed = time.perf_counter() - start
+                    requests, throttled = simulator.requests, simulator.throttled
+                rate = count / elapsed if elapsed else 0.0
+                results[f"{name}@{size}"] = {"seconds": elapsed, "rate": rate, "requests": requests}
+                print(f"{name:<22} {size:>10,} {elapsed:>9.2f} {rate:>12,.0f} {requests:>9,} {throttled:>6,}")
+    return results
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]]) -> None:
+    """Print the change in throughput against a previous run"""
+    print(f"\n{'vs baseline':<33} {'before':>12} {'after':>12} {'change':>8}")
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        before, after = baseline[key]["rate"], result["rate"]
+        change = (after / before - 1) * 100 if before else 0.0
+        print(f"{key:<33} {before:>12,.0f} {after:>12,.0f} {change:>+7.1f}%")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated API latency per request in seconds")
+    parser.add_argument("--throttle-every", type=int, default=0, help="Inject a 429 after this many requests")
+    parser.add_argument("--retry-after", type=float, default=0.05)
+    parser.add_argument("--output", help="Write results as JSON for later comparison")
+    parser.add_argument("--baseline", help="Compare against results written by a previous --output")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.scenarios, args.latency, args.throttle_every, args.retry_after)
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
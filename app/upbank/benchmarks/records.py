@@ -0,0 +1,58 @@
+"""
+Compare the pydantic transaction path against trusted TransactionRecord parsing
+
+Usage: python -m upbank.benchmarks.records [--count 20000] [--page-size 100]
+"""
+
+import argparse
+import copy
+import time
+from typing import Callable, Dict, List
+
+from upbank.benchmarks.synthetic import make_transaction_page
+from upbank.client import normalize_transaction
+from upbank.models.records import RecordPage
+from upbank.models.transaction import TransactionList
+
+def pydantic_path(page: Dict) -> List[Dict]:
+    """What UpBankSync does by default: normalise, validate, dump"""
+    for transaction in page["data"]:
+        normalize_transaction(transaction)
+    return [t.model_dump() for t in TransactionList.model_validate(page).data]
+
+def trusted_path(page: Dict) -> List[Dict]:
+    """What UpBankSync does with trusted=True"""
+    return [t.model_dump() for t in RecordPage.from_json(page).data]
+
+def records_only(page: Dict) -> List:
+    """Record construction alone, for consumers that read attributes directly"""
+    return RecordPage.from_json(page).data
+
+def measure(name: str, fn: Callable[[Dict], List], pages: List[Dict], count: int) -> float:
+    pages = copy.deepcopy(pages)
+    start = time.perf_counter()
+    for page in pages:
+        fn(page)
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed
+    print(f"{name:<16} {elapsed:8.3f}s  {rate:12,.0f} txn/s")
+    return rate
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    pages = [
+        make_transaction_page(start, min(args.page_size, args.count - start))
+        for start in range(0, args.count, args.page_size)
+    ]
+    print(f"Parsing {args.count:,} transactions in pages of {args.page_size}")
+    baseline = measure("pydantic", pydantic_path, pages, args.count)
+    trusted = measure("trusted", trusted_path, pages, args.count)
+    raw = measure("records only", records_only, pages, args.count)
+    print(f"trusted speedup: {trusted / baseline:.1f}x, records only: {raw / baseline:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""
+Local stand-in for the UP Bank API, serving synthetic data for offline benchmarks
+
+Usage: python -m upbank.benchmarks.simulator [--port 8080] [--transactions 100000]
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from upbank.benchmarks.synthetic import (
+    AEST,
+    EPOCH,
+    INTERVAL,
+    make_account,
+    make_categories,
+    make_tags,
+    make_transaction,
+)
+
+API_PREFIX = "/api/v1"
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+class SimulatedBank:
+    """
+    Synthetic account history generated on demand
+
+    Transaction ``i`` was created at ``EPOCH + i * INTERVAL`` on account
+    ``i % accounts``, and the newest ``held`` transactions are HELD. Nothing
+    is materialised up front, so histories of millions of transactions cost
+    no memory until they are paged through.
+    """
+
+    def __init__(self, transactions: int = 10000, accounts: int = 2, held: int = 5):
+        self.transactions = transactions
+        self.accounts = [make_account(i) for i in range(accounts)]
+        self.categories = make_categories()
+        self.tags = make_tags()
+        self.held = min(held, transactions)
+
+    def account_index(self, account_id: str) -> Optional[int]:
+        for index, account in enumerate(self.accounts):
+            if account["id"] == account_id:
+                return index
+        return None
+
+    def transaction(self, index: int) -> Dict[str, Any]:
+        status = "HELD" if index >= self.transactions - self.held else "SETTLED"
+        account_id = self.accounts[index % len(self.accounts)]["id"]
+        return make_transaction(index, account_id=account_id, status=status)
+
+    def transaction_by_id(self, transaction_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            index = int(transaction_id.rsplit("-", 1)[1])
+        except (IndexError, ValueError):
+            return None
+        return self.transaction(index) if 0 <= index < self.transactions else None
+
+    def bounds(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        status: Optional[str] = None,
+    ) -> Tuple[int, int]:
+        """Inclusive index range matching the time and status filters"""
+        low, high = 0, self.transactions - 1
+        if since is not None:
+            low = max(low, math.ceil((since - EPOCH) / INTERVAL))
+        if until is not None:
+            high = min(high, math.ceil((until - EPOCH) / INTERVAL) - 1)
+        if status == "HELD":
+            low = max(low, self.transactions - self.held)
+        elif status == "SETTLED":
+            high = min(high, self.transactions - self.held - 1)
+        return low, high
+
+    def page(
+        self,
+        size: int,
+        after: Optional[int] = None,
+        account: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        status: Optional[str] = None,
+        category: Optional[str] = None,
+        tag: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Return one page of transactions, newest first, and the cursor for the next"""
+        low, high = self.bounds(since, until, status)
+        if after is not None:
+            high = min(high, after)
+        stride = 1
+        if account is not None:
+            stride = len(self.accounts)
+            high -= (high - account) % stride
+        items = []
+        index = high
+        while index >= low and len(items) < size:
+            transaction = self.transaction(index)
+            index -= stride
+            relationships = transaction["relationships"]
+            if category is not None and (relationships["category"]["data"] or {}).get("id") != category:
+                continue
+            if tag is not None and tag not in {t["id"] for t in relationships["tags"]["data"]}:
+                continue
+            items.append(transaction)
+        return items, (index if index >= low else None)
+
+class SimulatorServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, bank: SimulatedBank, latency: float, jitter: float,
+                 throttle_every: int, throttle_burst: int, retry_after: float):
+        super().__init__(address, SimulatorRequestHandler)
+        self.bank = bank
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_every = throttle_every
+        self.throttle_burst = throttle_burst
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+
+    def should_throttle(self) -> bool:
+        with self.lock:
+            self.requests += 1
+            if not self.throttle_every:
+                return False
+            position = (self.requests - 1) % (self.throttle_every + self.throttle_burst)
+            if position >= self.throttle_every:
+                self.throttled += 1
+                return True
+            return False
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=AEST)
+
+class SimulatorRequestHandler(BaseHTTPRequestHandler):
+    server: SimulatorServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: Optional[Dict] = None, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        if payload:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _not_found(self) -> None:
+        self._send(404, {"errors": [{"status": "404", "title": "Not Found"}]})
+
+    def _handle(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        server = self.server
+        if server.latency or server.jitter:
+            time.sleep(server.latency + random.uniform(0, server.jitter))
+        if server.should_throttle():
+            self._send(
+                429,
+                {"errors": [{"status": "429", "title": "Too Many Requests"}]},
+                {"Retry-After": str(server.retry_after)},
+            )
+            return
+
+        url = urlparse(self.path)
+        if not url.path.startswith(API_PREFIX):
+            return self._not_found()
+        parts = [part for part in url.path[len(API_PREFIX):].split("/") if part]
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        bank = server.bank
+
+        if method != "GET":
+            # Tag and category mutations: accept and discard
+            if len(parts) == 4 and parts[0] == "transactions" and parts[2] == "relationships":
+                return self._send(204)
+            return self._not_found()
+
+        if parts == ["util", "ping"]:
+            return self._send(200, {"meta": {"id": "simulator", "statusEmoji": "⚡️"}})
+        if parts == ["accounts"]:
+            return self._send(200, self._list_page(bank.accounts, query))
+        if parts == ["categories"]:
+            parent = query.get("filter[parent]")
+            categories = [
+                c for c in bank.categories
+                if parent is None or (c["relationships"]["parent"]["data"] or {}).get("id") == parent
+            ]
+            return self._send(200, {"data": categories, "links": {"prev": None, "next": None}})
+        if parts == ["tags"]:
+            return self._send(200, self._list_page(bank.tags, query))
+        if parts == ["webhooks"]:
+            return self._send(200, {"data": [], "links": {"prev": None, "next": None}})
+        if len(parts) == 2 and parts[0] == "accounts":
+            account = bank.account_index(parts[1])
+            if account is None:
+                return self._not_found()
+            return self._send(200, {"data": bank.accounts[account]})
+        if len(parts) == 2 and parts[0] == "categories":
+            for category in bank.categories:
+                if category["id"] == parts[1]:
+                    return self._send(200, {"data": category})
+            return self._not_found()
+        if len(parts) == 2 and parts[0] == "transactions":
+            transaction = bank.transaction_by_id(parts[1])
+            if transaction is None:
+                return self._not_found()
+            return self._send(200, {"data": transaction})
+        if parts == ["transactions"]:
+            return self._transactions(None, query)
+        if len(parts) == 3 and parts[0] == "accounts" and parts[2] == "transactions":
+            account = bank.account_index(parts[1])
+            if account is None:
+                return self._not_found()
+            return self._transactions(account, query)
+        return self._not_found()
+
+    def _next_link(self, query: Dict[str, str], cursor: Any) -> Optional[str]:
+        if cursor is None:
+            return None
+        host, port = self.server.server_address[:2]
+        params = dict(query, **{"page[after]": str(cursor)})
+        return f"http://{host}:{port}{urlparse(self.path).path}?{urlencode(params)}"
+
+    def _list_page(self, items: List[Dict], query: Dict[str, str]) -> Dict[str, Any]:
+        size = min(int(query.get("page[size]", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+        start = int(query.get("page[after]", 0))
+        end = start + size
+        return {
+            "data": items[start:end],
+            "links": {"prev": None, "next": self._next_link(query, end if end < len(items) else None)},
+        }
+
+    def _transactions(self, account: Optional[int], query: Dict[str, str]) -> None:
+        try:
+            size = min(int(query.get("page[size]", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+            after = int(query["page[after]"]) if "page[after]" in query else None
+            since = _parse_time(query.get("filter[since]"))
+            until = _parse_time(query.get("filter[until]"))
+        except ValueError:
+            return self._send(400, {"errors": [{"status": "400", "title": "Invalid filter"}]})
+        items, cursor = self.server.bank.page(
+            size,
+            after=after,
+            account=account,
+            since=since,
+            until=until,
+            status=query.get("filter[status]"),
+            category=query.get("filter[category]"),
+            tag=query.get("filter[tag]"),
+        )
+        self._send(200, {"data": items, "links": {"prev": None, "next": self._next_link(query, cursor)}})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+class UpSimulator:
+    """
+    Run a simulated UP Bank API on a local port
+
+    Point a client at ``base_url`` to page through synthetic history with
+    real cursor pagination over HTTP. Every response can be delayed by
+    ``latency`` (plus up to ``jitter``) seconds, and with ``throttle_every``
+    set, every run of that many requests is followed by ``throttle_burst``
+    429 responses carrying ``Retry-After: retry_after``.
+
+    Args:
+        transactions (int): Size of the synthetic transaction history
+        accounts (int): Number of accounts transactions are spread over
+        held (int): How many of the newest transactions are HELD
+        latency (float): Fixed delay added to every response, in seconds
+        jitter (float): Maximum random delay added on top of ``latency``
+        throttle_every (int): Requests served between 429 bursts; 0 disables throttling
+        throttle_burst (int): Consecutive requests rejected with 429 in each burst
+        retry_after (float): Retry-After value sent with 429 responses
+        port (int): Port to listen on; 0 picks a free one
+    """
+
+    def __init__(
+        self,
+        transactions: int = 10000,
+        accounts: int = 2,
+        held: int = 5,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        throttle_every: int = 0,
+        throttle_burst: int = 1,
+        retry_after: float = 1.0,
+        port: int = 0,
+    ):
+        self.bank = SimulatedBank(transactions, accounts, held)
+        self.server = SimulatorServer(
+            ("127.0.0.1", port), self.bank, latency, jitter,
+            throttle_every, throttle_burst, retry_after,
+        )
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    @property
+    def requests(self) -> int:
+        return self.server.requests
+
+    @property
+    def throttled(self) -> int:
+        return self.server.throttled
+
+    def start(self) -> "UpSimulator":
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "UpSimulator":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--transactions", type=int, default=100000)
+    parser.add_argument("--accounts", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    parser.add_argument("--throttle-burst", type=int, default=1)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    args = parser.parse_args()
+
+    simulator = UpSimulator(
+        transactions=args.transactions,
+        accounts=args.accounts,
+        latency=args.latency,
+        jitter=args.jitter,
+        throttle_every=args.throttle_every,
+        throttle_burst=args.throttle_burst,
+        retry_after=args.retry_after,
+        port=args.port,
+    )
+    print(f"Simulated UP API with {args.transactions:,} transactions at {simulator.base_url}")
+    try:
+        simulator.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.server.server_close()
+
+if __name__ == "__main__":
+    main()
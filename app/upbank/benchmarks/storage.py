@@ -0,0 +1,79 @@
+"""
+Compare UpDatabase storage profiles: bulk write throughput and reads during a write
+
+Usage: python -m upbank.benchmarks.storage [--count 100000] [--batch-size 1000] [--readers 4]
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+from upbank.benchmarks.synthetic import make_transactions
+from upbank.database import PROFILES, UpDatabase
+from upbank.models.records import TransactionRecord
+
+READ_SQL = "SELECT COUNT(*), SUM(amount_value_in_base_units) FROM transactions WHERE account_id = ?"
+
+def reader_loop(db: UpDatabase, stop: threading.Event, latencies: List[float], errors: List[str]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            with db.reader() as conn:
+                conn.execute(READ_SQL, ("account-0",)).fetchone()
+        except sqlite3.OperationalError as e:
+            errors.append(str(e))
+            continue
+        latencies.append(time.perf_counter() - start)
+
+def measure(profile: str, rows: List[Dict], batch_size: int, readers: int, workdir: str) -> None:
+    path = os.path.join(workdir, f"{profile}.db")
+    setup = UpDatabase(path, profile=profile)
+    setup.close()
+    writer = UpDatabase(path, profile=profile)
+    reader_db = UpDatabase(path, profile=profile, readers=readers)
+
+    stop = threading.Event()
+    latencies: List[float] = []
+    errors: List[str] = []
+    threads = [
+        threading.Thread(target=reader_loop, args=(reader_db, stop, latencies, errors))
+        for _ in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    start = time.perf_counter()
+    writer.insert_transactions(rows, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in threads:
+        thread.join()
+    writer.close()
+    reader_db.close()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float("nan")
+    print(
+        f"{profile:<10} {elapsed:8.2f}s {len(rows) / elapsed:12,.0f} rows/s "
+        f"{len(latencies):10,} reads {p99:9.2f} ms p99 {len(errors):7,} errors"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--profiles", nargs="+", choices=sorted(PROFILES), default=list(PROFILES))
+    args = parser.parse_args()
+
+    rows = [TransactionRecord.from_json(t).model_dump() for t in make_transactions(args.count)]
+    print(f"Writing {args.count:,} transactions in batches of {args.batch_size} with {args.readers} concurrent readers")
+    with tempfile.TemporaryDirectory() as workdir:
+        for profile in args.profiles:
+            measure(profile, rows, args.batch_size, args.readers, workdir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Deterministic synthetic UP Bank API payloads for benchmarks
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+BASE_URL = "https://api.up.com.au/api/v1"
+MERCHANTS = [
+    "Woolworths", "Coles", "Aldi", "Bunnings", "Uber", "Spotify", "Netflix",
+    "Officeworks", "JB Hi-Fi", "Chemist Warehouse", "BP", "Ampol", "Kmart",
+]
+CATEGORIES = [
+    ("groceries", "good-life"), ("takeaway", "good-life"), ("fuel", "transport"),
+    ("public-transport", "transport"), ("streaming", "home"), ("hardware", "home"),
+]
+TAGS = ["holiday", "work", "reimbursable", "gift"]
+AEST = timezone(timedelta(hours=10))
+EPOCH = datetime(2020, 1, 1, tzinfo=AEST)
+INTERVAL = timedelta(minutes=37)
+
+def money(base_units: int, currency_code: str = "AUD") -> Dict[str, Any]:
+    return {
+        "currencyCode": currency_code,
+        "value": f"{base_units / 100:.2f}",
+        "valueInBaseUnits": base_units,
+    }
+
+def make_transaction(
+    index: int,
+    account_id: str = "account-0",
+    created_at: datetime = None,
+    status: str = "SETTLED",
+) -> Dict[str, Any]:
+    """Build one transaction resource shaped like the Up API's JSON"""
+    rng = random.Random(index)
+    if created_at is None:
+        created_at = EPOCH + INTERVAL * index
+    merchant = rng.choice(MERCHANTS)
+    amount = -rng.randint(100, 25000)
+    category = rng.choice(CATEGORIES) if rng.random() < 0.8 else None
+    tags = rng.sample(TAGS, rng.randint(0, 2))
+    transaction_id = f"txn-{index:08d}"
+    return {
+        "type": "transactions",
+        "id": transaction_id,
+        "attributes": {
+            "status": status,
+            "rawText": f"{merchant.upper()} SYDNEY NSW",
+            "description": merchant,
+            "message": None,
+            "isCategorizable": True,
+            "holdInfo": {"amount": money(amount), "foreignAmount": None},
+            "roundUp": {"amount": money(-(100 + amount % 100)), "boostPortion": None} if rng.random() < 0.3 else None,
+            "cashback": None,
+            "amount": money(amount),
+            "foreignAmount": None,
+            "cardPurchaseMethod": {"method": "CARD_PIN", "cardNumberSuffix": "0001"},
+            "settledAt": (created_at + timedelta(days=1)).isoformat() if status == "SETTLED" else None,
+            "createdAt": created_at.isoformat(),
+            "transactionType": "Purchase",
+            "note": {"value": "synthetic", "createdAt": created_at.isoformat()} if rng.random() < 0.05 else None,
+            "performingCustomer": {"displayName": "Bench"},
+        },
+        "relationships": {
+            "account": {
+                "data": {"type": "accounts", "id": account_id},
+                "links": {"related": f"{BASE_URL}/accounts/{account_id}"},
+            },
+            "transferAccount": {"data": None},
+            "category": {
+                "data": {"type": "categories", "id": category[0]} if category else None,
+                "links": {"self": f"{BASE_URL}/transactions/{transaction_id}/relationships/category"},
+            },
+            "parentCategory": {
+                "data": {"type": "categories", "id": category[1]} if category else None,
+            },
+            "tags": {
+                "data": [{"type": "tags", "id": tag} for tag in tags],
+                "links": {"self": f"{BASE_URL}/transactions/{transaction_id}/relationships/tags"},
+            },
+        },
+        "links": {"self": f"{BASE_URL}/transactions/{transaction_id}"},
+    }
+
+def make_transaction_page(start: int, count: int, next_url: str = None) -> Dict[str, Any]:
+    """Build a transactions list response"""
+    return {
+        "data": [make_transaction(i) for i in range(start, start + count)],
+        "links": {"prev": None, "next": next_url},
+    }
+
+def make_transactions(count: int) -> List[Dict[str, Any]]:
+    return [make_transaction(i) for i in range(count)]
+
+def make_account(index: int) -> Dict[str, Any]:
+    """Build one account resource"""
+    account_id = f"account-{index}"
+    return {
+        "type": "accounts",
+        "id": account_id,
+        "attributes": {
+            "displayName": "Spending" if index == 0 else f"Saver {index}",
+            "accountType": "TRANSACTIONAL" if index == 0 else "SAVER",
+            "ownershipType": "INDIVIDUAL",
+            "balance": money(100000 * (index + 1)),
+            "createdAt": EPOCH.isoformat(),
+        },
+        "relationships": {
+            "transactions": {"links": {"related": f"{BASE_URL}/accounts/{account_id}/transactions"}},
+        },
+        "links": {"self": f"{BASE_URL}/accounts/{account_id}"},
+    }
+
+def make_categories() -> List[Dict[str, Any]]:
+    """Build the parent and child categories referenced by synthetic transactions"""
+    parents = sorted({parent for _, parent in CATEGORIES})
+    categories = []
+    for parent in parents:
+        children = [child for child, p in CATEGORIES if p == parent]
+        categories.append(_category(parent, None, children))
+        categories.extend(_category(child, parent, []) for child in children)
+    return categories
+
+def _category(category_id: str, parent: str, children: List[str]) -> Dict[str, Any]:
+    return {
+        "type": "categories",
+        "id": category_id,
+        "attributes": {"name": category_id.replace("-", " ").title()},
+        "relationships": {
+            "parent": {"data": {"type": "categories", "id": parent} if parent else None},
+            "children": {"data": [{"type": "categories", "id": child} for child in children]},
+        },
+        "links": {"self": f"{BASE_URL}/categories/{category_id}"},
+    }
+
+def make_tags() -> List[Dict[str, Any]]:
+    return [
+        {
+            "type": "tags",
+            "id": tag,
+            "relationships": {"transactions": {"links": {"related": f"{BASE_URL}/transactions?filter[tag]={tag}"}}},
+        }
+        for tag in TAGS
+    ]
@@ -0,0 +1,111 @@
+"""
+In-process response cache for slow-changing UP Bank resources
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+DEFAULT_TTLS: Dict[str, float] = {
+    "categories": 24 * 60 * 60,
+    "tags": 5 * 60,
+    "webhooks": 5 * 60,
+    "accounts": 60,
+}
+
+class ResponseCache:
+    """
+    Bounded LRU cache of GET responses with a TTL per resource type
+
+    Only resources listed in ``ttls`` are cached; everything else (e.g.
+    transactions by default) always goes upstream. Entries are keyed by
+    endpoint path and query parameters.
+
+    Args:
+        max_entries (int): Maximum number of responses kept before the least recently used is evicted
+        ttls (dict, optional): Seconds to keep responses for, keyed by resource name
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttls: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict]]" = OrderedDict()
+
+    @staticmethod
+    def resource(endpoint: str) -> str:
+        """Return the resource an endpoint path lists or fetches
+
+        ``/accounts`` and ``/accounts/{id}`` are "accounts". A nested
+        collection such as ``/accounts/{id}/transactions`` is the resource it
+        lists, so it is cached (or not) and invalidated with "transactions"
+        rather than under the parent's TTL.
+        """
+        segments = endpoint.strip("/").split("/")
+        return segments[2] if len(segments) > 2 else segments[0]
+
+    @staticmethod
+    def key(endpoint: str, params: Optional[Dict] = None) -> Hashable:
+        """Build the cache key for a request"""
+        return ("/" + endpoint.strip("/"), tuple(sorted((params or {}).items())))
+
+    def cacheable(self, endpoint: str) -> bool:
+        """Whether responses for this endpoint are cached at all"""
+        return self.ttls.get(self.resource(endpoint), 0) > 0
+
+    def get(self, endpoint: str, params: Optional[Dict] = None) -> Optional[Dict]:
+        """Return a copy of a fresh cached response, or None"""
+        key = self.key(endpoint, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(data)
+
+    def set(self, endpoint: str, params: Optional[Dict], data: Dict) -> None:
+        """Store a response if its resource is cacheable"""
+        ttl = self.ttls.get(self.resource(endpoint), 0)
+        if ttl <= 0:
+            return
+        key = self.key(endpoint, params)
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, copy.deepcopy(data))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, resource: Optional[str] = None, endpoint: Optional[str] = None) -> None:
+        """Evict cached responses
+
+        Args:
+            resource: Evict every entry for this resource (e.g. "tags")
+            endpoint: Evict every entry for this exact path, whatever its params
+
+        With neither argument the whole cache is cleared.
+        """
+        with self._lock:
+            if resource is None and endpoint is None:
+                self._entries.clear()
+                return
+            path = "/" + endpoint.strip("/") if endpoint is not None else None
+            for key in list(self._entries):
+                if resource is not None and self.resource(key[0]) == resource:
+                    del self._entries[key]
+                elif path is not None and key[0] == path:
+                    del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
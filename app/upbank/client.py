@@ -2,18 +2,207 @@
 UP Bank API Client implementation
 """
 
-from typing import Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar, Union
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 import requests
 from pydantic import BaseModel
 from requests.exceptions import HTTPError
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlparse
 
+from upbank.cache import ResponseCache
+from upbank.metrics import MetricsRegistry
+from upbank.ratelimit import (
+    RateLimiter,
+    backoff_delay,
+    get_rate_limiter,
+    parse_retry_after,
+    should_retry,
+)
 from upbank.models.account import Account, AccountList
+from upbank.models.base import Links
+from upbank.models.bulk import BulkItemResult, BulkResult
+from upbank.models.records import RecordPage
 from upbank.models.transaction import Transaction, TransactionList
 from upbank.models.category import Category, CategoryList
 from upbank.models.tag import Tag, TagList
 from upbank.models.webhook import Webhook, WebhookList, WebhookLog, WebhookLogList
 
+T = TypeVar("T")
+
+DEFAULT_BASE_URL = "https://api.up.com.au/api/v1"
+
+def transaction_params(
+    since: Optional[Union[datetime, str]] = None,
+    until: Optional[Union[datetime, str]] = None,
+    category: Optional[str] = None,
+    tag: Optional[str] = None,
+    status: Optional[str] = None,
+    page_size: Optional[int] = None,
+    page_after: Optional[str] = None,
+) -> Dict:
+    """Build the query parameters for a transaction listing request"""
+    params = {
+        "filter[since]": since.isoformat() if isinstance(since, datetime) else since,
+        "filter[until]": until.isoformat() if isinstance(until, datetime) else until,
+        "filter[category]": category,
+        "filter[tag]": tag,
+        "filter[status]": status,
+        "page[size]": page_size,
+        "page[after]": page_after,
+    }
+    return {k: v for k, v in params.items() if v is not None}
+
+def next_page_cursor(data: Dict) -> Optional[str]:
+    """Extract the page[after] cursor from a response's links.next URL"""
+    next_url = (data.get("links") or {}).get("next")
+    if not next_url:
+        return None
+    query_params = parse_qs(urlparse(next_url).query)
+    return query_params.get("page[after]", [None])[0]
+
+def date_windows(
+    since: datetime, until: datetime, window: timedelta
+) -> List[Tuple[datetime, datetime]]:
+    """Split [since, until) into consecutive windows, newest first"""
+    if window <= timedelta(0):
+        raise ValueError("window must be a positive timedelta")
+    windows = []
+    window_until = until
+    while window_until > since:
+        window_since = max(since, window_until - window)
+        windows.append((window_since, window_until))
+        window_until = window_since
+    return windows
+
+def normalize_transaction(transaction: Dict) -> Dict:
+    """Coerce the optional money/customer objects of a raw transaction into model shape"""
+    attrs = transaction["attributes"]
+    
+    if "roundUp" in attrs:
+        if attrs["roundUp"] is None:
+            del attrs["roundUp"]
+        elif isinstance(attrs["roundUp"], dict) and "amount" in attrs["roundUp"]:
+            attrs["roundUp"] = attrs["roundUp"]["amount"]
+        else:
+            amount = attrs["amount"]
+            attrs["roundUp"] = {
+                "currencyCode": amount["currencyCode"],
+                "value": str(attrs["roundUp"]["amount"]["value"] if isinstance(attrs["roundUp"], dict) else "0.00"),
+                "valueInBaseUnits": attrs["roundUp"]["amount"]["valueInBaseUnits"] if isinstance(attrs["roundUp"], dict) else 0
+            }
+    
+    if "cashback" in attrs:
+        if attrs["cashback"] is None:
+            del attrs["cashback"]
+        elif isinstance(attrs["cashback"], dict) and all(k in attrs["cashback"] for k in ["currencyCode", "value", "valueInBaseUnits"]):
+            pass
+        else:
+            amount = attrs["amount"]
+            attrs["cashback"] = {
+                "currencyCode": amount["currencyCode"],
+                "value": str(attrs["cashback"].get("value", "0.00") if isinstance(attrs["cashback"], dict) else "0.00"),
+                "valueInBaseUnits": attrs["cashback"].get("valueInBaseUnits", 0) if isinstance(attrs["cashback"], dict) else 0
+            }
+    if "performingCustomer" in attrs:
+        if attrs["performingCustomer"] is None:
+            del attrs["performingCustomer"]
+        elif isinstance(attrs["performingCustomer"], dict):
+            if "id" not in attrs["performingCustomer"]:
+                attrs["performingCustomer"]["id"] = attrs["performingCustomer"].get("displayName")
+    return transaction
+
+def parse_transaction_page(data: Dict) -> TransactionList:
+    """Normalise and validate one page of a transactions response"""
+    for transaction in data["data"]:
+        normalize_transaction(transaction)
+    return TransactionList.model_validate(data)
+
+def category_list_payload(data: Union[Dict, List]) -> Dict:
+    """Wrap a categories response so it always validates as a CategoryList"""
+    if isinstance(data, list):
+        data = {
+            "data": data,
+            "links": {"self": None, "prev": None, "next": None}
+        }
+    elif isinstance(data, dict) and "links" not in data:
+        data["links"] = {"self": None, "prev": None, "next": None}
+    return data
+
+def merge_pages(pages: Iterator[Dict]) -> Dict:
+    """Concatenate the ``data`` of every page into one unpaginated response"""
+    data = []
+    for page in pages:
+        data.extend(page["data"])
+    return {"data": data, "links": {"prev": None, "next": None}}
+
+def bulk_item_result(transaction_id: str, error: Optional[BaseException]) -> BulkItemResult:
+    """Describe the outcome of one mutation in a bulk request"""
+    if error is None:
+        return BulkItemResult(transaction_id=transaction_id, success=True)
+    response = getattr(error, "response", None)
+    return BulkItemResult(
+        transaction_id=transaction_id,
+        success=False,
+        status_code=getattr(response, "status_code", None),
+        error=str(error),
+    )
+
+class Paginator:
+    """
+    Iterate over every page of a paginated Up API endpoint
+    
+    Follows the ``page[after]`` cursor in each response's ``links.next``.
+    With ``prefetch`` enabled, page N+1 is requested on a background thread
+    as soon as page N arrives, so network latency overlaps with whatever the
+    caller does with page N.
+    
+    Args:
+        request: Callable with the signature of ``UpClient._request``
+        endpoint: Endpoint path of the first page
+        params: Query parameters sent with every page
+        prefetch: Fetch the next page in the background
+        after: ``page[after]`` cursor to start from instead of the first page
+    """
+    
+    def __init__(
+        self,
+        request: Callable[..., Dict],
+        endpoint: str,
+        params: Optional[Dict] = None,
+        prefetch: bool = True,
+        after: Optional[str] = None,
+    ):
+        self.request = request
+        self.endpoint = endpoint
+        self.params = params
+        self.prefetch = prefetch
+        self.after = after
+    
+    def _fetch(self, cursor: Optional[str]) -> Dict:
+        params = dict(self.params or {})
+        if cursor:
+            params["page[after]"] = cursor
+        return self.request("GET", self.endpoint, params=params or None)
+    
+    def __iter__(self) -> Iterator[Dict]:
+        executor = ThreadPoolExecutor(max_workers=1) if self.prefetch else None
+        try:
+            data = self._fetch(self.after)
+            while True:
+                cursor = next_page_cursor(data)
+                pending = executor.submit(self._fetch, cursor) if cursor and executor else None
+                yield data
+                if not cursor:
+                    return
+                data = pending.result() if pending else self._fetch(cursor)
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
 class UpClient:
     """
     UP Bank API Client
@@ -21,9 +210,23 @@ class UpClient:
     Args:
         api_key (str): Your UP Bank API key
         base_url (str, optional): Base URL for the API. Defaults to "https://api.up.com.au/api/v1".
+        rate_limiter (RateLimiter, optional): Limiter to pace requests. Defaults to the process-wide one
+        max_retries (int, optional): Retries for throttled or transient failures. Defaults to 5.
+        cache (ResponseCache, optional): Opt-in cache for slow-changing GET responses
+        prefetch (bool, optional): Fetch the next page of list endpoints in the background. Defaults to True.
+        metrics (MetricsRegistry, optional): Registry to record per-endpoint request metrics in
     """
     
-    def __init__(self, api_key: str, base_url: str = "https://api.up.com.au/api/v1"):
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = DEFAULT_BASE_URL,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: int = 5,
+        cache: Optional[ResponseCache] = None,
+        prefetch: bool = True,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
         self.api_key = api_key
         self.token = api_key
         self.base_url = base_url.rstrip("/")
@@ -33,6 +236,11 @@ class UpClient:
             "Accept": "application/json"
         }
         self.session.headers.update(self.headers)
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.max_retries = max_retries
+        self.cache = cache
+        self.prefetch = prefetch
+        self.metrics = metrics
 
     def _request(
         self, 
@@ -41,32 +249,274 @@ class UpClient:
         params: Optional[Dict] = None,
         json: Optional[Dict] = None
     ) -> Dict:
-        """Make a request to the UP API"""
+        """Make a request to the UP API
+        
+        Requests are paced by the shared rate limiter. Throttled (429) and
+        transient server errors are retried with jittered backoff that
+        honours ``Retry-After``.
+        """
+        use_cache = method == "GET" and self.cache is not None and self.cache.cacheable(endpoint)
+        if use_cache:
+            cached = self.cache.get(endpoint, params)
+            if cached is not None:
+                return cached
+
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        response = self.session.request(method, url, params=params, json=json)
+        for attempt in range(self.max_retries + 1):
+            wait = self.rate_limiter.reserve()
+            if wait:
+                time.sleep(wait)
+            start = time.perf_counter()
+            response = self.session.request(method, url, params=params, json=json)
+            if self.metrics is not None:
+                self.metrics.record_request(
+                    method, endpoint, time.perf_counter() - start,
+                    response.status_code, len(response.content)
+                )
+            headers = getattr(response, "headers", None)
+            self.rate_limiter.observe(headers)
+            if attempt < self.max_retries and should_retry(method, response.status_code):
+                if self.metrics is not None:
+                    self.metrics.record_retry(method, endpoint)
+                delay = backoff_delay(attempt, parse_retry_after(headers))
+                if response.status_code == 429:
+                    self.rate_limiter.pause(delay)
+                time.sleep(delay)
+                continue
+            break
         response.raise_for_status()
-        return response.json() if response.content else {}
+        start = time.perf_counter()
+        data = response.json() if response.content else {}
+        if self.metrics is not None:
+            self.metrics.record_decode(method, endpoint, time.perf_counter() - start)
+        if use_cache:
+            self.cache.set(endpoint, params, data)
+        return data
+
+    def _parse(self, endpoint: str, parse: Callable[[Any], T], data: Any, method: str = "GET") -> T:
+        """Turn response data into models, timing validation when metrics are enabled"""
+        if self.metrics is None:
+            return parse(data)
+        with self.metrics.time_validation(method, endpoint):
+            return parse(data)
+
+    def invalidate_cache(self, resource: Optional[str] = None, endpoint: Optional[str] = None) -> None:
+        """Evict cached responses; clears everything when called without arguments"""
+        if self.cache is not None:
+            self.cache.invalidate(resource=resource, endpoint=endpoint)
+
+    def paginate(self, endpoint: str, params: Optional[Dict] = None, after: Optional[str] = None) -> Paginator:
+        """Iterate over the raw JSON of every page of a list endpoint, optionally from a cursor"""
+        return Paginator(self._request, endpoint, params, prefetch=self.prefetch, after=after)
 
     def list_accounts(self, page_size: Optional[int] = None) -> AccountList:
         """List all accounts"""
         params = {"page[size]": page_size} if page_size else None
-        data = self._request("GET", "/accounts", params=params)
-        return AccountList.model_validate(data)
+        data = merge_pages(self.paginate("/accounts", params))
+        return self._parse("/accounts", AccountList.model_validate, data)
 
     def get_account(self, account_id: str) -> Account:
         """Get a specific account"""
         data = self._request("GET", f"/accounts/{account_id}")
-        return Account.model_validate(data["data"])
+        return self._parse(f"/accounts/{account_id}", Account.model_validate, data["data"])
+
+    def iter_transaction_pages(
+        self,
+        since: Optional[Union[datetime, str]] = None,
+        until: Optional[Union[datetime, str]] = None,
+        category: Optional[str] = None,
+        tag: Optional[str] = None,
+        status: Optional[str] = None,
+        page_size: Optional[int] = 100,
+        raw: bool = False,
+        account_id: Optional[str] = None,
+        after: Optional[str] = None,
+    ) -> Iterator[Union[TransactionList, RecordPage]]:
+        """Iterate over transaction pages as they arrive
+        
+        Each page is validated on its own and keeps its ``links``, so callers
+        can start processing before the rest of the history is downloaded.
+        Accepts the same filters as ``list_transactions``; with ``raw=True``
+        pages are ``RecordPage`` objects of unvalidated ``TransactionRecord``.
+        With ``account_id`` only that account's transactions are listed.
+        With ``after`` listing resumes from a ``page[after]`` cursor saved
+        from an earlier page's ``links.next``.
+        """
+        params = transaction_params(
+            since=since,
+            until=until,
+            category=category,
+            tag=tag,
+            status=status,
+            page_size=page_size,
+        )
+        endpoint = f"/accounts/{account_id}/transactions" if account_id else "/transactions"
+        for data in self.paginate(endpoint, params, after=after):
+            parse = RecordPage.from_json if raw else parse_transaction_page
+            yield self._parse(endpoint, parse, data)
+
+    def iter_transactions(self, **kwargs) -> Iterator[Transaction]:
+        """Iterate over individual transactions, fetching pages lazily
+        
+        Accepts the same filters as ``list_transactions``.
+        """
+        for page in self.iter_transaction_pages(**kwargs):
+            yield from page.data
+
+    def backfill_windows(
+        self,
+        since: Optional[Union[datetime, str]] = None,
+        until: Optional[Union[datetime, str]] = None,
+        window: timedelta = timedelta(days=90),
+    ) -> List[Tuple[datetime, datetime]]:
+        """Split a backfill range into date windows, newest first
+
+        Args:
+            since: Start of the backfill. Defaults to the oldest account's creation date
+            until: End of the backfill. Defaults to now
+            window: Width of each window
+        """
+        if isinstance(since, str):
+            since = datetime.fromisoformat(since)
+        if isinstance(until, str):
+            until = datetime.fromisoformat(until)
+        if since is None:
+            since = min(
+                datetime.fromisoformat(account.attributes.created_at)
+                for account in self.list_accounts().data
+            )
+        if until is None:
+            until = datetime.now(timezone.utc) if since.tzinfo else datetime.now()
+        return date_windows(since, until, window)
+
+    def backfill_transactions(
+        self,
+        since: Optional[Union[datetime, str]] = None,
+        until: Optional[Union[datetime, str]] = None,
+        window: timedelta = timedelta(days=90),
+        max_workers: int = 4,
+        category: Optional[str] = None,
+        tag: Optional[str] = None,
+        status: Optional[str] = None,
+        page_size: Optional[int] = 100,
+        raw: bool = False,
+    ) -> Iterator[Union[TransactionList, RecordPage]]:
+        """Fetch a transaction history in parallel date windows
+        
+        The ``since``/``until`` range is split into ``window``-sized shards and
+        up to ``max_workers`` shards walk their cursor chains at the same
+        time. Pages are yielded as soon as any shard produces them, with
+        transactions already seen in another shard removed, so page order
+        is not chronological.
+        
+        Args:
+            since: Start of the backfill. Defaults to the oldest account's creation date
+            until: End of the backfill. Defaults to now
+            window: Width of each date shard
+            max_workers: Maximum number of shards fetched concurrently
+            category: Filter by category ID
+            tag: Filter by tag
+            status: Filter by transaction status (HELD or SETTLED)
+            page_size: Number of records to return per page
+            raw: Yield RecordPage objects of unvalidated TransactionRecord
+        """
+        pages = self.iter_window_pages(
+            self.backfill_windows(since, until, window),
+            max_workers=max_workers,
+            category=category,
+            tag=tag,
+            status=status,
+            page_size=page_size,
+            raw=raw,
+        )
+        for _, page in pages:
+            if page.data:
+                yield page
+
+    def iter_window_pages(
+        self,
+        windows: List[Tuple[datetime, datetime]],
+        cursors: Optional[List[Optional[str]]] = None,
+        max_workers: int = 4,
+        category: Optional[str] = None,
+        tag: Optional[str] = None,
+        status: Optional[str] = None,
+        page_size: Optional[int] = 100,
+        raw: bool = False,
+    ) -> Iterator[Tuple[int, Union[TransactionList, RecordPage]]]:
+        """Walk the cursor chains of several date windows in parallel
+
+        Yields ``(window index, page)`` as soon as any window produces a
+        page, with transactions already seen in another window removed
+        (pages may end up empty; the last page of each window is always
+        yielded so callers can tell the window is finished).
+
+        Args:
+            windows: ``(since, until)`` of each window, e.g. from ``backfill_windows``
+            cursors: ``page[after]`` cursor to resume each window from, if any
+            max_workers: Maximum number of windows fetched concurrently
+            category: Filter by category ID
+            tag: Filter by tag
+            status: Filter by transaction status (HELD or SETTLED)
+            page_size: Number of records to return per page
+            raw: Yield RecordPage objects of unvalidated TransactionRecord
+        """
+        cursors = cursors or [None] * len(windows)
+        results: queue.Queue = queue.Queue()
+        slots = threading.Semaphore(max_workers * 2)
+        stop = threading.Event()
+        
+        def walk(index: int) -> None:
+            window_since, window_until = windows[index]
+            pages = self.iter_transaction_pages(
+                since=window_since,
+                until=window_until,
+                category=category,
+                tag=tag,
+                status=status,
+                page_size=page_size,
+                raw=raw,
+                after=cursors[index],
+            )
+            for page in pages:
+                while not slots.acquire(timeout=0.1):
+                    if stop.is_set():
+                        return
+                results.put((index, page))
+        
+        seen = set()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(walk, index) for index in range(len(windows))]
+            for future in futures:
+                future.add_done_callback(results.put)
+            try:
+                pending = len(futures)
+                while pending:
+                    item = results.get()
+                    if isinstance(item, Future):
+                        pending -= 1
+                        item.result()
+                        continue
+                    slots.release()
+                    index, page = item
+                    page.data = [t for t in page.data if t.id not in seen]
+                    seen.update(t.id for t in page.data)
+                    yield index, page
+            finally:
+                stop.set()
+                for future in futures:
+                    future.cancel()
 
     def list_transactions(
         self,
-        since: Optional[datetime] = None,
-        until: Optional[datetime] = None,
+        since: Optional[Union[datetime, str]] = None,
+        until: Optional[Union[datetime, str]] = None,
         category: Optional[str] = None,
         tag: Optional[str] = None,
         status: Optional[str] = None,
         page_size: Optional[int] = 100,
-    ) -> TransactionList:
+        raw: bool = False,
+    ) -> Union[TransactionList, RecordPage]:
         """List all transactions
         
         Args:
@@ -76,129 +526,47 @@ class UpClient:
             tag: Filter by tag
             status: Filter by transaction status (HELD or SETTLED)
             page_size: Number of records to return per page
+            raw: Skip validation and return a RecordPage of TransactionRecord
             
         Returns:
             TransactionList containing all transactions matching the filters
         """
-        all_transactions = []
-        next_page = None
-        
-        while True:
-            params = {
-                "filter[since]": since.isoformat() if since else None,
-                "filter[until]": until.isoformat() if until else None,
-                "filter[category]": category,
-                "filter[tag]": tag,
-                "filter[status]": status,
-                "page[size]": page_size,
-                "page[after]": next_page,
-            }
-            params = {k: v for k, v in params.items() if v is not None}
-            
-            max_retries = 5
-            retry_delay = 1 
-            for retry in range(max_retries):
-                try:
-                    data = self._request("GET", "/transactions", params=params)
-                    break
-                except HTTPError as e:
-                    if e.response.status_code in [429]:
-                        if retry == max_retries - 1:
-                            raise
-                        import time
-                        time.sleep(retry_delay)
-                        retry_delay *= 2
-                        continue
-                    raise 
-            
-            for transaction in data["data"]:
-                attrs = transaction["attributes"]
-                
-                if "roundUp" in attrs:
-                    if attrs["roundUp"] is None:
-                        del attrs["roundUp"]
-                    elif isinstance(attrs["roundUp"], dict) and "amount" in attrs["roundUp"]:
-                        attrs["roundUp"] = attrs["roundUp"]["amount"]
-                    else:
-                        amount = attrs["amount"]
-                        attrs["roundUp"] = {
-                            "currencyCode": amount["currencyCode"],
-                            "value": str(attrs["roundUp"]["amount"]["value"] if isinstance(attrs["roundUp"], dict) else "0.00"),
-                            "valueInBaseUnits": attrs["roundUp"]["amount"]["valueInBaseUnits"] if isinstance(attrs["roundUp"], dict) else 0
-                        }
-                
-                if "cashback" in attrs:
-                    if attrs["cashback"] is None:
-                        del attrs["cashback"]
-                    elif isinstance(attrs["cashback"], dict) and all(k in attrs["cashback"] for k in ["currencyCode", "value", "valueInBaseUnits"]):
-                        pass
-                    else:
-                        amount = attrs["amount"]
-                        attrs["cashback"] = {
-                            "currencyCode": amount["currencyCode"],
-                            "value": str(attrs["cashback"].get("value", "0.00") if isinstance(attrs["cashback"], dict) else "0.00"),
-                            "valueInBaseUnits": attrs["cashback"].get("valueInBaseUnits", 0) if isinstance(attrs["cashback"], dict) else 0
-                        }
-                if "performingCustomer" in attrs:
-                    if attrs["performingCustomer"] is None:
-                        del attrs["performingCustomer"]
-                    elif isinstance(attrs["performingCustomer"], dict):
-                        if "id" not in attrs["performingCustomer"]:
-                            attrs["performingCustomer"]["id"] = attrs["performingCustomer"].get("displayName")
-            
-            all_transactions.extend(data["data"])
-            
-            links = data.get("links", {})
-            if not links.get("next"):
-                break
-                
-            next_url = links["next"]
-            from urllib.parse import parse_qs, urlparse
-            parsed = urlparse(next_url)
-            query_params = parse_qs(parsed.query)
-            next_page = query_params.get("page[after]", [None])[0]
-            
-            if not next_page:
-                break
-        
-        final_response = {
-            "data": all_transactions,
-            "links": {
-                "prev": None,
-                "next": None
-            }
-        }
-        
-        return TransactionList.model_validate(final_response)
+        transactions = self.iter_transactions(
+            since=since,
+            until=until,
+            category=category,
+            tag=tag,
+            status=status,
+            page_size=page_size,
+            raw=raw,
+        )
+        if raw:
+            return RecordPage(list(transactions), Links(prev=None, next=None))
+        return TransactionList(data=list(transactions), links=Links(prev=None, next=None))
 
     def get_transaction(self, transaction_id: str) -> Transaction:
         """Get a specific transaction"""
         data = self._request("GET", f"/transactions/{transaction_id}")
-        return Transaction.model_validate(data["data"])
+        return self._parse(
+            f"/transactions/{transaction_id}", Transaction.model_validate, normalize_transaction(data["data"])
+        )
 
     def list_categories(self, parent: Optional[str] = None) -> CategoryList:
         """List all categories"""
         params = {"filter[parent]": parent} if parent else None
         data = self._request("GET", "/categories", params=params)
-        if isinstance(data, list):
-            data = {
-                "data": data,
-                "links": {"self": None, "prev": None, "next": None}
-            }
-        elif isinstance(data, dict) and "links" not in data:
-            data["links"] = {"self": None, "prev": None, "next": None}
-        return CategoryList.model_validate(data)
+        return self._parse("/categories", CategoryList.model_validate, category_list_payload(data))
 
     def get_category(self, category_id: str) -> Category:
         """Get a specific category"""
         data = self._request("GET", f"/categories/{category_id}")
-        return Category.model_validate(data["data"])
+        return self._parse(f"/categories/{category_id}", Category.model_validate, data["data"])
 
     def list_tags(self, page_size: Optional[int] = None) -> TagList:
         """List all tags"""
         params = {"page[size]": page_size} if page_size else None
-        data = self._request("GET", "/tags", params=params)
-        return TagList.model_validate(data)
+        data = merge_pages(self.paginate("/tags", params))
+        return self._parse("/tags", TagList.model_validate, data)
 
     def add_tags_to_transaction(self, transaction_id: str, tags: List[str]) -> None:
         """Add tags to a transaction"""
@@ -206,6 +574,8 @@ class UpClient:
             "data": [{"type": "tags", "id": tag} for tag in tags]
         }
         self._request("POST", f"/transactions/{transaction_id}/relationships/tags", json=json)
+        self.invalidate_cache(resource="tags")
+        self.invalidate_cache(resource="transactions")
 
     def remove_tags_from_transaction(self, transaction_id: str, tags: List[str]) -> None:
         """Remove tags from a transaction"""
@@ -213,6 +583,8 @@ class UpClient:
             "data": [{"type": "tags", "id": tag} for tag in tags]
         }
         self._request("DELETE", f"/transactions/{transaction_id}/relationships/tags", json=json)
+        self.invalidate_cache(resource="tags")
+        self.invalidate_cache(resource="transactions")
 
     def update_transaction_category(
         self, transaction_id: str, category_id: Optional[str]
@@ -226,12 +598,49 @@ class UpClient:
             f"/transactions/{transaction_id}/relationships/category",
             json=json
         )
+        self.invalidate_cache(resource="transactions")
+
+    def _bulk(
+        self,
+        operation: Callable[[str, Any], None],
+        mapping: Dict[str, Any],
+        max_workers: int,
+    ) -> BulkResult:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                (transaction_id, executor.submit(operation, transaction_id, value))
+                for transaction_id, value in mapping.items()
+            ]
+            return BulkResult(results=[
+                bulk_item_result(transaction_id, future.exception())
+                for transaction_id, future in futures
+            ])
+
+    def bulk_add_tags(self, mapping: Dict[str, List[str]], max_workers: int = 8) -> BulkResult:
+        """Add tags to many transactions concurrently
+        
+        Args:
+            mapping: Tags to add, keyed by transaction ID
+            max_workers: Maximum number of requests in flight; the shared rate limiter still applies
+            
+        Returns:
+            BulkResult with one entry per transaction, in mapping order
+        """
+        return self._bulk(self.add_tags_to_transaction, mapping, max_workers)
+
+    def bulk_remove_tags(self, mapping: Dict[str, List[str]], max_workers: int = 8) -> BulkResult:
+        """Remove tags from many transactions concurrently; see ``bulk_add_tags``"""
+        return self._bulk(self.remove_tags_from_transaction, mapping, max_workers)
+
+    def bulk_set_category(self, mapping: Dict[str, Optional[str]], max_workers: int = 8) -> BulkResult:
+        """Set or clear (with None) the category of many transactions concurrently; see ``bulk_add_tags``"""
+        return self._bulk(self.update_transaction_category, mapping, max_workers)
 
     def list_webhooks(self, page_size: Optional[int] = None) -> WebhookList:
         """List all webhooks"""
         params = {"page[size]": page_size} if page_size else None
-        data = self._request("GET", "/webhooks", params=params)
-        return WebhookList.model_validate(data)
+        data = merge_pages(self.paginate("/webhooks", params))
+        return self._parse("/webhooks", WebhookList.model_validate, data)
 
     def create_webhook(self, url: str, description: Optional[str] = None) -> Webhook:
         """Create a new webhook"""
@@ -244,24 +653,26 @@ class UpClient:
             }
         }
         data = self._request("POST", "/webhooks", json=json)
-        return Webhook.model_validate(data["data"])
+        self.invalidate_cache(resource="webhooks")
+        return self._parse("/webhooks", Webhook.model_validate, data["data"], method="POST")
 
     def get_webhook(self, webhook_id: str) -> Webhook:
         """Get a specific webhook"""
         data = self._request("GET", f"/webhooks/{webhook_id}")
-        return Webhook.model_validate(data["data"])
+        return self._parse(f"/webhooks/{webhook_id}", Webhook.model_validate, data["data"])
 
     def delete_webhook(self, webhook_id: str) -> None:
         """Delete a webhook"""
         self._request("DELETE", f"/webhooks/{webhook_id}")
+        self.invalidate_cache(resource="webhooks")
 
     def list_webhook_logs(
         self, webhook_id: str, page_size: Optional[int] = None
     ) -> WebhookLogList:
         """List logs for a specific webhook"""
         params = {"page[size]": page_size} if page_size else None
-        data = self._request("GET", f"/webhooks/{webhook_id}/logs", params=params)
-        return WebhookLogList.model_validate(data)
+        data = merge_pages(self.paginate(f"/webhooks/{webhook_id}/logs", params))
+        return self._parse(f"/webhooks/{webhook_id}/logs", WebhookLogList.model_validate, data)
 
     def get_accounts(self, page_size: Optional[int] = None) -> AccountList:
         """Alias for list_accounts"""
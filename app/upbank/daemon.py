@@ -0,0 +1,175 @@
+"""
+Keep a database current with incremental syncs on an adaptive schedule
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional
+
+from upbank.sync import DEFAULT_OVERLAP, DatabaseHandler, UpBankSync
+
+DEFAULT_MIN_INTERVAL = timedelta(minutes=2)
+DEFAULT_HELD_INTERVAL = timedelta(minutes=5)
+# Under the API's UPBANK_LOCAL_MAX_AGE (upbank.local.DEFAULT_MAX_AGE), so an idle daemon
+# still marks each resource synced before the API treats its copy as stale
+DEFAULT_MAX_INTERVAL = timedelta(minutes=10)
+DEFAULT_REFRESH = timedelta(minutes=10)
+# Re-fetched behind each high-water mark even with nothing HELD, for late arrivals
+MIN_OVERLAP = timedelta(hours=1)
+# A HELD transaction older than this is taken to be a declined or reversed
+# hold that will never settle, and no longer caps the wait
+DEFAULT_HELD_EXPIRY = DEFAULT_OVERLAP
+
+DAEMON_RESOURCES = ("accounts", "categories", "transactions", "webhooks")
+
+class AdaptiveInterval:
+    """
+    How long to wait before the next poll, from what the last one found
+
+    Starts at ``minimum``. Every poll that changes nothing multiplies the
+    wait by ``backoff``, up to ``maximum``, and a poll that changes
+    something drops it back to ``minimum``. While HELD transactions are
+    outstanding the wait never exceeds ``held``, since they settle without
+    any other activity on the account. A failed poll backs off like an
+    idle one.
+    """
+
+    def __init__(
+        self,
+        minimum: timedelta = DEFAULT_MIN_INTERVAL,
+        held: timedelta = DEFAULT_HELD_INTERVAL,
+        maximum: timedelta = DEFAULT_MAX_INTERVAL,
+        backoff: float = 2.0,
+    ):
+        if not timedelta(0) < minimum <= maximum:
+            raise ValueError("intervals must satisfy 0 < minimum <= maximum")
+        if backoff < 1:
+            raise ValueError("backoff must be at least 1")
+        self.minimum = minimum
+        self.held = held
+        self.maximum = maximum
+        self.backoff = backoff
+        self.current = minimum
+
+    def next(self, changed: bool, held: int = 0) -> timedelta:
+        """Wait after a poll that did or didn't change anything, with ``held`` transactions outstanding"""
+        if changed:
+            self.current = self.minimum
+        else:
+            self.current = min(self.current * self.backoff, self.maximum)
+        return max(min(self.current, self.held), self.minimum) if held else self.current
+
+    def failed(self) -> timedelta:
+        """Wait after a poll that raised"""
+        self.current = min(self.current * self.backoff, self.maximum)
+        return self.current
+
+def held_overlap(
+    handler: DatabaseHandler,
+    floor: timedelta = MIN_OVERLAP,
+    cap: timedelta = DEFAULT_OVERLAP,
+) -> timedelta:
+    """How far behind the high-water marks an incremental sync must reach to re-fetch every stored HELD transaction
+
+    Bounded by ``floor`` and ``cap``, so a HELD transaction that never
+    settles (e.g. a declined pre-authorisation) can't make every poll
+    re-fetch an ever-growing window.
+    """
+    overlap = floor
+    for account_id, oldest in handler.db.get_oldest_held().items():
+        mark = handler.get_high_water_mark(account_id)
+        if mark is not None:
+            overlap = max(overlap, mark - oldest + timedelta(seconds=1))
+    return min(overlap, cap)
+
+class SyncDaemon:
+    """
+    Run incremental syncs into a database until stopped
+
+    Each cycle syncs transactions from every account's high-water mark,
+    reaching back only as far as ``held_overlap`` says, so an idle poll
+    costs one account listing plus one page per account. The other
+    resources are re-synced once they're older than ``refresh``. The wait
+    between cycles comes from ``interval``, cut short when a refresh falls
+    due sooner. Only HELD transactions younger than ``held_expiry`` cap the
+    wait at ``interval.held``.
+    """
+
+    def __init__(
+        self,
+        sync: UpBankSync,
+        handler: DatabaseHandler,
+        resources: Iterable[str] = DAEMON_RESOURCES,
+        interval: Optional[AdaptiveInterval] = None,
+        refresh: timedelta = DEFAULT_REFRESH,
+        held_expiry: timedelta = DEFAULT_HELD_EXPIRY,
+    ):
+        """
+        Args:
+            sync: Sync whose client and handler the daemon drives
+            handler: Database handler the sync writes to
+            resources: Which of accounts, categories, transactions and webhooks to keep current
+            interval: Schedule for the wait between cycles
+            refresh: How often accounts, categories and webhooks are re-synced
+            held_expiry: Age past which a HELD transaction is assumed never to settle
+        """
+        self.sync = sync
+        self.handler = handler
+        self.resources = set(resources)
+        self.interval = interval or AdaptiveInterval()
+        self.refresh = refresh
+        self.held_expiry = held_expiry
+        self._refreshed: Dict[str, float] = {}
+
+    def _due(self, resource: str) -> bool:
+        last = self._refreshed.get(resource)
+        return resource in self.resources and (last is None or time.monotonic() - last >= self.refresh.total_seconds())
+
+    def _until_refresh(self) -> timedelta:
+        """Time until the next of accounts, categories and webhooks is due, at least ``interval.minimum``"""
+        now = time.monotonic()
+        remaining = min(
+            (self.refresh.total_seconds() - (now - last) for last in self._refreshed.values()),
+            default=self.refresh.total_seconds(),
+        )
+        return max(timedelta(seconds=remaining), self.interval.minimum)
+
+    def run_once(self) -> timedelta:
+        """Sync whatever is due and return how long to wait before the next cycle"""
+        for resource, sync_resource in (
+            ("accounts", self.sync.sync_accounts),
+            ("categories", self.sync.sync_categories),
+            ("webhooks", self.sync.sync_webhooks),
+        ):
+            if self._due(resource):
+                sync_resource()
+                self._refreshed[resource] = time.monotonic()
+
+        if "transactions" not in self.resources:
+            return self._until_refresh()
+        changes = self.sync.sync_transactions(incremental=True, overlap=held_overlap(self.handler))
+        held = len(self.handler.db.get_oldest_held(since=datetime.now(timezone.utc) - self.held_expiry))
+        wait = self.interval.next(changed=bool(changes.inserted or changes.updated), held=held)
+        return min(wait, self._until_refresh())
+
+    def run(self, stop: Optional[threading.Event] = None, cycles: Optional[int] = None) -> None:
+        """Run cycles until ``stop`` is set (or ``cycles`` have run)
+
+        A cycle that raises is reported and retried after backing off, so
+        a network outage doesn't end the daemon.
+        """
+        stop = stop or threading.Event()
+        completed = 0
+        while not stop.is_set():
+            print(f"\n[{datetime.now().isoformat(timespec='seconds')}] Syncing")
+            try:
+                wait = self.run_once()
+            except Exception as e:
+                print(f"Error during sync: {e}")
+                wait = self.interval.failed()
+            completed += 1
+            if cycles is not None and completed >= cycles:
+                return
+            print(f"Next sync in {wait}")
+            stop.wait(wait.total_seconds())
@@ -2,224 +2,882 @@
 Database operations for UP Bank data
 """
 
+import base64
+import json
+import queue
+import re
 import sqlite3
-from datetime import datetime
-from typing import List, Optional, Dict, Any
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import islice
+from typing import Callable, FrozenSet, Iterable, Iterator, List, Optional, Dict, Any, Set, Tuple, Union
 from pathlib import Path
 
-class UpDatabase:
-    def __init__(self, db_path: str = "upbank.db"):
-        """Initialize database connection"""
-        self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row
-        self.create_tables()
+from upbank.migrations import migrate
+from upbank.rollups import REBUILD_ROLLUPS, spend_summary_sql
 
-    def create_tables(self):
-        """Create all necessary tables if they don't exist"""
-        with self.conn:
-            self.conn.execute("""
-                CREATE TABLE IF NOT EXISTS accounts (
-                    id TEXT PRIMARY KEY,
-                    display_name TEXT NOT NULL,
-                    account_type TEXT NOT NULL,
-                    ownership_type TEXT NOT NULL,
-                    balance_currency_code TEXT NOT NULL,
-                    balance_value TEXT NOT NULL,
-                    balance_value_in_base_units INTEGER NOT NULL,
-                    created_at TEXT NOT NULL
-                )
-            """)
+DEFAULT_BATCH_SIZE = 1000
 
-            self.conn.execute("""
-                CREATE TABLE IF NOT EXISTS transactions (
-                    id TEXT PRIMARY KEY,
-                    account_id TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    raw_text TEXT,
-                    description TEXT NOT NULL,
-                    message TEXT,
-                    is_categorizable BOOLEAN NOT NULL,
-                    amount_currency_code TEXT NOT NULL,
-                    amount_value TEXT NOT NULL,
-                    amount_value_in_base_units INTEGER NOT NULL,
-                    foreign_amount_currency_code TEXT,
-                    foreign_amount_value TEXT,
-                    foreign_amount_value_in_base_units INTEGER,
-                    settled_at TEXT,
-                    created_at TEXT NOT NULL,
-                    transaction_type TEXT,
-                    note TEXT,
-                    note_created_at TEXT,
-                    category_id TEXT,
-                    transfer_account_id TEXT,
-                    FOREIGN KEY (account_id) REFERENCES accounts(id),
-                    FOREIGN KEY (transfer_account_id) REFERENCES accounts(id)
-                )
-            """)
+# Connection pragmas per storage profile. "default" leaves SQLite's rollback
+# journal alone; "wal" lets readers run alongside a writer and trades
+# per-commit fsyncs for checkpoint-time durability (synchronous=NORMAL).
+PROFILES: Dict[str, Dict[str, Union[int, str]]] = {
+    "default": {},
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64 * 1024,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
 
-            self.conn.execute("""
-                CREATE TABLE IF NOT EXISTS categories (
-                    id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    parent_id TEXT,
-                    FOREIGN KEY (parent_id) REFERENCES categories(id)
-                )
-            """)
+# Pragmas that are per-connection and so also apply to pooled readers
+READER_PRAGMAS = {"cache_size", "mmap_size", "temp_store", "busy_timeout"}
 
-            self.conn.execute("""
-                CREATE TABLE IF NOT EXISTS tags (
-                    id TEXT PRIMARY KEY
-                )
-            """)
+ACCOUNT_COLUMNS = (
+    "id", "display_name", "account_type", "ownership_type",
+    "balance_currency_code", "balance_value", "balance_value_in_base_units",
+    "created_at",
+)
 
-            self.conn.execute("""
-                CREATE TABLE IF NOT EXISTS transaction_tags (
-                    transaction_id TEXT,
-                    tag_id TEXT,
-                    PRIMARY KEY (transaction_id, tag_id),
-                    FOREIGN KEY (transaction_id) REFERENCES transactions(id),
-                    FOREIGN KEY (tag_id) REFERENCES tags(id)
-                )
-            """)
+TRANSACTION_COLUMNS = (
+    "id", "account_id", "status", "raw_text", "description", "message",
+    "is_categorizable", "amount_currency_code", "amount_value",
+    "amount_value_in_base_units", "foreign_amount_currency_code",
+    "foreign_amount_value", "foreign_amount_value_in_base_units",
+    "settled_at", "created_at", "transaction_type", "note", "note_created_at",
+    "category_id", "transfer_account_id", "created_at_us", "settled_at_us",
+)
 
-            self.conn.execute("""
-                CREATE TABLE IF NOT EXISTS webhooks (
-                    id TEXT PRIMARY KEY,
-                    url TEXT NOT NULL,
-                    description TEXT,
-                    secret_key TEXT,
-                    created_at TEXT NOT NULL
-                )
-            """)
+CATEGORY_COLUMNS = ("id", "name", "parent_id")
 
-            self.conn.execute("""
-                CREATE TABLE IF NOT EXISTS webhook_logs (
-                    id TEXT PRIMARY KEY,
-                    webhook_id TEXT NOT NULL,
-                    request_body TEXT NOT NULL,
-                    response_status_code INTEGER,
-                    response_body TEXT,
-                    delivery_status TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    FOREIGN KEY (webhook_id) REFERENCES webhooks(id)
-                )
-            """)
+WEBHOOK_COLUMNS = ("id", "url", "description", "secret_key", "created_at")
+
+WEBHOOK_LOG_COLUMNS = (
+    "id", "webhook_id", "request_url", "request_body", "response_status_code",
+    "response_body", "delivery_status", "created_at",
+)
+
+UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+DEFAULT_QUERY_LIMIT = 50
+MAX_QUERY_LIMIT = 1000
+
+@lru_cache(maxsize=None)
+def upsert_sql(table: str, columns: Tuple[str, ...]) -> str:
+    """Build an upsert keyed on ``id`` that leaves identical rows untouched
+
+    Unlike ``INSERT OR REPLACE``, a conflicting row is updated in place
+    (no delete, so no index churn or cascades), and only when at least one
+    column actually differs.
+    """
+    updates = [column for column in columns if column != "id"]
+    return f"""
+        INSERT INTO {table} ({", ".join(columns)})
+        VALUES ({", ".join("?" for _ in columns)})
+        ON CONFLICT (id) DO UPDATE SET
+            {", ".join(f"{column} = excluded.{column}" for column in updates)}
+        WHERE ({", ".join(f"{table}.{column}" for column in updates)})
+            IS NOT ({", ".join(f"excluded.{column}" for column in updates)})
+    """
+
+def _value(value: Any) -> Any:
+    """Coerce a dumped model value into what SQLite stores and returns
+
+    Timestamps are stored as ISO 8601 text (the API's own format, so the
+    validated and trusted paths write identical rows) and booleans as 0/1,
+    letting stored rows be compared with incoming ones exactly.
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+def epoch_us(value: Optional[Union[datetime, str]]) -> Optional[int]:
+    """Microseconds since the Unix epoch for a datetime or ISO 8601 string
+
+    Naive values are taken to be UTC.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - UNIX_EPOCH) // timedelta(microseconds=1)
+
+class UpsertCounts:
+    """Rows inserted, updated and left unchanged by a batch write"""
+
+    __slots__ = ("inserted", "updated", "unchanged")
+
+    def __init__(self, inserted: int = 0, updated: int = 0, unchanged: int = 0):
+        self.inserted = inserted
+        self.updated = updated
+        self.unchanged = unchanged
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+    def __iadd__(self, other: "UpsertCounts") -> "UpsertCounts":
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        return self
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, UpsertCounts):
+            return NotImplemented
+        return (self.inserted, self.updated, self.unchanged) == (other.inserted, other.updated, other.unchanged)
+
+    def __repr__(self) -> str:
+        return f"UpsertCounts(inserted={self.inserted}, updated={self.updated}, unchanged={self.unchanged})"
+
+    def __str__(self) -> str:
+        return f"{self.inserted} new, {self.updated} updated, {self.unchanged} unchanged"
+
+def account_row(account: Dict[str, Any]) -> Tuple:
+    """Flatten a dumped account into ACCOUNT_COLUMNS order"""
+    attributes = account["attributes"]
+    return tuple(map(_value, (
+        account["id"],
+        attributes["display_name"],
+        attributes["account_type"],
+        attributes["ownership_type"],
+        attributes["balance"]["currency_code"],
+        attributes["balance"]["value"],
+        attributes["balance"]["value_in_base_units"],
+        attributes["created_at"]
+    )))
+
+def transaction_row(transaction: Dict[str, Any]) -> Tuple:
+    """Flatten a dumped transaction into TRANSACTION_COLUMNS order"""
+    attributes = transaction["attributes"]
+    relationships = transaction["relationships"]
+    foreign_amount = attributes.get("foreign_amount") or {}
+    note = attributes.get("note") or {}
+    return tuple(map(_value, (
+        transaction["id"],
+        relationships["account"]["data"]["id"],
+        attributes["status"],
+        attributes.get("raw_text"),
+        attributes["description"],
+        attributes.get("message"),
+        attributes["is_categorizable"],
+        attributes["amount"]["currency_code"],
+        attributes["amount"]["value"],
+        attributes["amount"]["value_in_base_units"],
+        foreign_amount.get("currency_code"),
+        foreign_amount.get("value"),
+        foreign_amount.get("value_in_base_units"),
+        attributes.get("settled_at"),
+        attributes["created_at"],
+        attributes.get("transaction_type"),
+        note.get("value"),
+        note.get("created_at"),
+        (relationships.get("category", {}).get("data", {}) or {}).get("id"),
+        (relationships.get("transfer_account", {}).get("data", {}) or {}).get("id"),
+        epoch_us(attributes["created_at"]),
+        epoch_us(attributes.get("settled_at"))
+    )))
+
+def transaction_tag_ids(transaction: Dict[str, Any]) -> FrozenSet[str]:
+    tags = (transaction["relationships"].get("tags") or {}).get("data") or ()
+    return frozenset(tag["id"] for tag in tags)
+
+def category_row(category: Dict[str, Any]) -> Tuple:
+    parent_data = category.get("relationships", {}).get("parent", {}).get("data")
+    parent_id = parent_data.get("id") if parent_data is not None else None
+    return (category["id"], category["attributes"]["name"], parent_id)
+
+def webhook_row(webhook: Dict[str, Any]) -> Tuple:
+    attributes = webhook["attributes"]
+    return tuple(map(_value, (
+        webhook["id"],
+        attributes["url"],
+        attributes.get("description"),
+        attributes.get("secret_key"),
+        attributes["created_at"]
+    )))
+
+def webhook_log_row(webhook_id: str, request_url: str, log: Dict[str, Any]) -> Tuple:
+    attributes = log["attributes"]
+    response = attributes.get("response")
+    return tuple(map(_value, (
+        log["id"],
+        webhook_id,
+        request_url,
+        attributes["request"]["body"],
+        response["status_code"] if response else None,
+        response["body"] if response else None,
+        attributes["delivery_status"],
+        attributes["created_at"]
+    )))
+
+def encode_cursor(created_at_us: int, transaction_id: str) -> str:
+    """Opaque keyset cursor for the row a page ended on"""
+    return base64.urlsafe_b64encode(json.dumps([created_at_us, transaction_id]).encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    try:
+        created_at_us, transaction_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(created_at_us, int) or not isinstance(transaction_id, str):
+            raise TypeError("cursor fields have the wrong types")
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    return created_at_us, transaction_id
+
+def _transaction_filters(
+    account: Optional[str],
+    category: Optional[str],
+    tag: Optional[str],
+    status: Optional[str],
+    since: Optional[Union[datetime, str]],
+    until: Optional[Union[datetime, str]],
+) -> Tuple[List[str], List[str], List[Any]]:
+    """JOINs, WHERE terms and parameters shared by the transaction queries"""
+    joins = []
+    where = []
+    params: List[Any] = []
+    if tag is not None:
+        joins.append("JOIN transaction_tags AS filter_tag ON filter_tag.transaction_id = t.id")
+        where.append("filter_tag.tag_id = ?")
+        params.append(tag)
+    for column, value in (("account_id", account), ("category_id", category), ("status", status)):
+        if value is not None:
+            where.append(f"t.{column} = ?")
+            params.append(value)
+    if since is not None:
+        where.append("t.created_at_us >= ?")
+        params.append(epoch_us(since))
+    if until is not None:
+        where.append("t.created_at_us < ?")
+        params.append(epoch_us(until))
+    return joins, where, params
+
+def transaction_query_sql(
+    account: Optional[str] = None,
+    category: Optional[str] = None,
+    tag: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[Union[datetime, str]] = None,
+    until: Optional[Union[datetime, str]] = None,
+    text: Optional[str] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[str, List[Any]]:
+    """Build the SELECT behind ``UpDatabase.query_transactions`` (without LIMIT)"""
+    joins, where, params = _transaction_filters(account, category, tag, status, since, until)
+    if text:
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        where.append(
+            "(t.description LIKE ? ESCAPE '\\' OR t.raw_text LIKE ? ESCAPE '\\' OR t.message LIKE ? ESCAPE '\\')"
+        )
+        params.extend([pattern] * 3)
+    if cursor is not None:
+        where.append("(t.created_at_us, t.id) < (?, ?)")
+        params.extend(decode_cursor(cursor))
+
+    sql = f"""
+        SELECT t.*,
+            (SELECT group_concat(tag_id) FROM transaction_tags WHERE transaction_id = t.id) AS tags
+        FROM transactions AS t
+        {" ".join(joins)}
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY t.created_at_us DESC, t.id DESC
+    """
+    return sql, params
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching every word as a prefix
+
+    Words are split the way the unicode61 tokenizer splits them, so
+    punctuation can't be mistaken for FTS5 syntax: ``"JB Hi-Fi"`` becomes
+    ``"JB"* "Hi"* "Fi"*``.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        raise ValueError("Search text must contain at least one word")
+    return " ".join(f'"{word}"*' for word in words)
+
+def transaction_search_sql(
+    query: str,
+    account: Optional[str] = None,
+    category: Optional[str] = None,
+    tag: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[Union[datetime, str]] = None,
+    until: Optional[Union[datetime, str]] = None,
+) -> Tuple[str, List[Any]]:
+    """Build the SELECT behind ``UpDatabase.search_transactions`` (without LIMIT)"""
+    joins, where, params = _transaction_filters(account, category, tag, status, since, until)
+    sql = f"""
+        SELECT t.*,
+            (SELECT group_concat(tag_id) FROM transaction_tags WHERE transaction_id = t.id) AS tags,
+            transactions_fts.rank AS rank
+        FROM transactions_fts
+        JOIN transactions AS t ON t.rowid = transactions_fts.rowid
+        {" ".join(joins)}
+        WHERE {" AND ".join(["transactions_fts MATCH ?"] + where)}
+        ORDER BY transactions_fts.rank
+    """
+    return sql, [fts_query(query)] + params
+
+class QueryPage:
+    """One page of ``query_transactions`` rows and the cursor for the next page"""
+
+    __slots__ = ("data", "next_cursor")
+
+    def __init__(self, data: List[Dict[str, Any]], next_cursor: Optional[str]):
+        self.data = data
+        self.next_cursor = next_cursor
+
+def apply_pragmas(conn: sqlite3.Connection, pragmas: Dict[str, Union[int, str]]) -> None:
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+
+class ReaderPool:
+    """
+    Fixed pool of read-only connections to one database file
+
+    Connections are opened with ``mode=ro`` and ``query_only`` so they can
+    never take the write lock, and may be used from any thread, one thread
+    at a time. ``connection()`` blocks until one is free.
+    """
+
+    def __init__(self, db_path: str, size: int, pragmas: Dict[str, Union[int, str]]):
+        self._connections: List[sqlite3.Connection] = []
+        self._idle: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        uri = f"{Path(db_path).absolute().as_uri()}?mode=ro"
+        for _ in range(size):
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            apply_pragmas(conn, {k: v for k, v in pragmas.items() if k in READER_PRAGMAS})
+            conn.execute("PRAGMA query_only = ON")
+            self._connections.append(conn)
+            self._idle.put(conn)
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        for conn in self._connections:
+            conn.close()
+
+class UpDatabase:
+    def __init__(
+        self,
+        db_path: str = "upbank.db",
+        profile: Union[str, Dict[str, Union[int, str]]] = "default",
+        readers: int = 0,
+        read_only: bool = False,
+    ):
+        """Initialize database connection, applying any pending migrations
+
+        Args:
+            db_path: Path to the SQLite database file
+            profile: Storage profile name from ``PROFILES`` (e.g. "wal"), or a dict of pragmas
+            readers: Number of pooled read-only connections to open next to the writer
+            read_only: Open only the reader pool, with no writer and no migrations,
+                for processes that never write; the database must already exist
+        """
+        if read_only and not readers:
+            raise ValueError("A read-only database needs at least one reader")
+        self.db_path = db_path
+        self.pragmas = dict(PROFILES[profile] if isinstance(profile, str) else profile)
+        self.conn: Optional[sqlite3.Connection] = None
+        if not read_only:
+            # One thread writes at a time, but it needn't be the one that opened
+            # the database (e.g. a server closing it from its shutdown hook)
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.conn.row_factory = sqlite3.Row
+            apply_pragmas(self.conn, self.pragmas)
+            migrate(self.conn)
+        self.readers = ReaderPool(db_path, readers, self.pragmas) if readers else None
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection, or the writer when no pool was opened
+
+        With the "wal" profile, pooled readers see the last committed state
+        and are never blocked by a sync writing through ``conn``.
+        """
+        if self.readers is None:
+            yield self.conn
+            return
+        with self.readers.connection() as conn:
+            yield conn
 
     def insert_account(self, account: Dict[str, Any]):
         """Insert or update an account"""
-        with self.conn:
-            self.conn.execute("""
-                INSERT OR REPLACE INTO accounts (
-                    id, display_name, account_type, ownership_type,
-                    balance_currency_code, balance_value, balance_value_in_base_units,
-                    created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                account["id"],
-                account["attributes"]["display_name"],
-                account["attributes"]["account_type"],
-                account["attributes"]["ownership_type"],
-                account["attributes"]["balance"]["currency_code"],
-                account["attributes"]["balance"]["value"],
-                account["attributes"]["balance"]["value_in_base_units"],
-                account["attributes"]["created_at"]
-            ))
+        self.insert_accounts([account])
+
+    def insert_accounts(
+        self, accounts: Iterable[Dict[str, Any]], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> UpsertCounts:
+        """Insert or update accounts, one transaction per batch"""
+        return self._insert_batches(
+            accounts, batch_size,
+            lambda batch: self._upsert("accounts", ACCOUNT_COLUMNS, map(account_row, batch))
+        )
 
     def insert_transaction(self, transaction: Dict[str, Any]):
         """Insert or update a transaction"""
-        with self.conn:
-            self.conn.execute("""
-                INSERT OR REPLACE INTO transactions (
-                    id, account_id, status, raw_text, description, message,
-                    is_categorizable, amount_currency_code, amount_value,
-                    amount_value_in_base_units, foreign_amount_currency_code,
-                    foreign_amount_value, foreign_amount_value_in_base_units,
-                    settled_at, created_at, transaction_type, note, note_created_at,
-                    category_id, transfer_account_id
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                transaction["id"],
-                transaction["relationships"]["account"]["data"]["id"],
-                transaction["attributes"]["status"],
-                transaction["attributes"].get("raw_text"),
-                transaction["attributes"]["description"],
-                transaction["attributes"].get("message"),
-                transaction["attributes"]["is_categorizable"],
-                transaction["attributes"]["amount"]["currency_code"],
-                transaction["attributes"]["amount"]["value"],
-                transaction["attributes"]["amount"]["value_in_base_units"],
-                transaction["attributes"].get("foreign_amount", {}).get("currency_code") if transaction["attributes"].get("foreign_amount") else None,
-                transaction["attributes"].get("foreign_amount", {}).get("value") if transaction["attributes"].get("foreign_amount") else None,
-                transaction["attributes"].get("foreign_amount", {}).get("value_in_base_units") if transaction["attributes"].get("foreign_amount") else None,
-                transaction["attributes"].get("settled_at"),
-                transaction["attributes"]["created_at"],
-                transaction["attributes"].get("transaction_type"),
-                transaction["attributes"].get("note", {}).get("value") if transaction["attributes"].get("note") else None,
-                transaction["attributes"].get("note", {}).get("created_at") if transaction["attributes"].get("note") else None,
-                (transaction["relationships"].get("category", {}).get("data", {}) or {}).get("id"),
-                (transaction["relationships"].get("transfer_account", {}).get("data", {}) or {}).get("id")
-            ))
+        self.insert_transactions([transaction])
+
+    def insert_transactions(
+        self, transactions: Iterable[Dict[str, Any]], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> UpsertCounts:
+        """Insert or update transactions and their tags, one transaction per batch
+
+        Each batch is compared with the stored rows first: only new or
+        changed rows are written (with one ``executemany`` per statement),
+        and tag links are diffed rather than re-inserted, so re-syncing
+        rows that haven't changed costs reads but no writes. A transaction
+        whose tags changed counts as updated.
+        """
+        return self._insert_batches(transactions, batch_size, self._write_transactions)
+
+    def _write_transactions(self, transactions: List[Dict[str, Any]]) -> UpsertCounts:
+        transactions = list({t["id"]: t for t in transactions}.values())
+        rows = [transaction_row(t) for t in transactions]
+        ids = [row[0] for row in rows]
+        stored = self._stored_rows("transactions", TRANSACTION_COLUMNS, ids)
+        stored_tags: Dict[str, Set[str]] = {}
+        for transaction_id, tag_id in self.conn.execute(
+            "SELECT transaction_id, tag_id FROM transaction_tags "
+            "WHERE transaction_id IN (SELECT value FROM json_each(?))",
+            (json.dumps(ids),)
+        ):
+            stored_tags.setdefault(transaction_id, set()).add(tag_id)
 
-            if "tags" in transaction["relationships"] and transaction["relationships"]["tags"].get("data"):
-                for tag in transaction["relationships"]["tags"]["data"]:
-                    self.conn.execute("""
-                        INSERT OR IGNORE INTO tags (id) VALUES (?)
-                    """, (tag["id"],))
-                    
-                    self.conn.execute("""
-                        INSERT OR IGNORE INTO transaction_tags (transaction_id, tag_id)
-                        VALUES (?, ?)
-                    """, (transaction["id"], tag["id"]))
+        counts = UpsertCounts()
+        pending: List[Tuple] = []
+        added: List[Tuple[str, str]] = []
+        removed: List[Tuple[str, str]] = []
+        for transaction, row in zip(transactions, rows):
+            wanted = transaction_tag_ids(transaction)
+            current = stored_tags.get(row[0], set())
+            added.extend((row[0], tag) for tag in wanted - current)
+            removed.extend((row[0], tag) for tag in current - wanted)
+            if row[0] not in stored:
+                counts.inserted += 1
+                pending.append(row)
+            elif stored[row[0]] != row:
+                counts.updated += 1
+                pending.append(row)
+            elif wanted != current:
+                counts.updated += 1
+            else:
+                counts.unchanged += 1
+
+        if pending:
+            self.conn.executemany(upsert_sql("transactions", TRANSACTION_COLUMNS), pending)
+        if added:
+            self.conn.executemany("INSERT OR IGNORE INTO tags (id) VALUES (?)", {(tag,) for _, tag in added})
+            self.conn.executemany("""
+                INSERT OR IGNORE INTO transaction_tags (transaction_id, tag_id)
+                VALUES (?, ?)
+            """, added)
+        if removed:
+            self.conn.executemany(
+                "DELETE FROM transaction_tags WHERE transaction_id = ? AND tag_id = ?", removed
+            )
+        return counts
 
     def insert_category(self, category: Dict[str, Any]):
         """Insert or update a category"""
-        with self.conn:
-            parent_data = category.get("relationships", {}).get("parent", {}).get("data")
-            parent_id = parent_data.get("id") if parent_data is not None else None
+        self.insert_categories([category])
 
-            self.conn.execute("""
-                INSERT OR REPLACE INTO categories (id, name, parent_id)
-                VALUES (?, ?, ?)
-            """, (
-                category["id"],
-                category["attributes"]["name"],
-                parent_id
-            ))
+    def insert_categories(
+        self, categories: Iterable[Dict[str, Any]], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> UpsertCounts:
+        """Insert or update categories, one transaction per batch"""
+        return self._insert_batches(
+            categories, batch_size,
+            lambda batch: self._upsert("categories", CATEGORY_COLUMNS, map(category_row, batch))
+        )
 
     def insert_webhook(self, webhook: Dict[str, Any]):
         """Insert or update a webhook"""
         with self.conn:
-            self.conn.execute("""
-                INSERT OR REPLACE INTO webhooks (
-                    id, url, description, secret_key, created_at
-                ) VALUES (?, ?, ?, ?, ?)
-            """, (
-                webhook["id"],
-                webhook["attributes"]["url"],
-                webhook["attributes"].get("description"),
-                webhook["attributes"].get("secret_key"),
-                webhook["attributes"]["created_at"]
-            ))
+            self._upsert("webhooks", WEBHOOK_COLUMNS, [webhook_row(webhook)])
 
     def insert_webhook_log(self, webhook_id: str, log: Dict[str, Any]):
         """Insert or update a webhook log"""
+        self.insert_webhook_logs(webhook_id, [log])
+
+    def insert_webhook_logs(
+        self, webhook_id: str, logs: Iterable[Dict[str, Any]], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> UpsertCounts:
+        """Insert or update a webhook's delivery logs, one transaction per batch
+
+        Logs don't carry the URL they were delivered to, so ``request_url``
+        is the stored webhook's URL (empty if the webhook isn't stored).
+        """
+        webhook = self.conn.execute("SELECT url FROM webhooks WHERE id = ?", (webhook_id,)).fetchone()
+        request_url = webhook["url"] if webhook else ""
+        return self._insert_batches(
+            logs, batch_size,
+            lambda batch: self._upsert(
+                "webhook_logs", WEBHOOK_LOG_COLUMNS,
+                (webhook_log_row(webhook_id, request_url, log) for log in batch)
+            )
+        )
+
+    def _stored_rows(self, table: str, columns: Tuple[str, ...], ids: List[str]) -> Dict[str, Tuple]:
+        """Fetch the stored rows for a batch of IDs, keyed by ID"""
+        return {
+            row[0]: tuple(row)
+            for row in self.conn.execute(
+                f"SELECT {', '.join(columns)} FROM {table} WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(ids),)
+            )
+        }
+
+    def _upsert(self, table: str, columns: Tuple[str, ...], rows: Iterable[Tuple]) -> UpsertCounts:
+        """Write only the rows that are new or differ from what is stored"""
+        rows = list({row[0]: row for row in rows}.values())
+        stored = self._stored_rows(table, columns, [row[0] for row in rows])
+        pending = [row for row in rows if stored.get(row[0]) != row]
+        if pending:
+            self.conn.executemany(upsert_sql(table, columns), pending)
+        inserted = sum(1 for row in pending if row[0] not in stored)
+        return UpsertCounts(inserted, len(pending) - inserted, len(rows) - len(pending))
+
+    def _insert_batches(
+        self,
+        items: Iterable[Dict[str, Any]],
+        batch_size: int,
+        write: Callable[[List[Dict[str, Any]]], UpsertCounts],
+    ) -> UpsertCounts:
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        counts = UpsertCounts()
+        iterator = iter(items)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                return counts
+            with self.conn:
+                counts += write(batch)
+
+    def query_transactions(
+        self,
+        account: Optional[str] = None,
+        category: Optional[str] = None,
+        tag: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[Union[datetime, str]] = None,
+        until: Optional[Union[datetime, str]] = None,
+        text: Optional[str] = None,
+        limit: int = DEFAULT_QUERY_LIMIT,
+        cursor: Optional[str] = None,
+    ) -> QueryPage:
+        """Query stored transactions, newest first, with keyset pagination
+
+        Ordering and the ``since``/``until`` range use the UTC
+        ``created_at_us`` column. Every filter is served by a composite
+        ``(column, created_at_us, id)`` index (or the tag index), so pages cost the same however deep the
+        cursor is. Pass a page's ``next_cursor`` back as ``cursor`` to
+        continue.
+
+        Args:
+            account: Only this account's transactions
+            category: Only transactions in this category
+            tag: Only transactions with this tag
+            status: HELD or SETTLED
+            since: Only transactions created at or after this time (naive values are UTC)
+            until: Only transactions created before this time (naive values are UTC)
+            text: Case-insensitive substring of the description, raw text or message
+            limit: Page size, at most ``MAX_QUERY_LIMIT``
+            cursor: ``next_cursor`` of the previous page
+        """
+        if not 1 <= limit <= MAX_QUERY_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_QUERY_LIMIT}")
+        sql, params = transaction_query_sql(
+            account=account, category=category, tag=tag, status=status,
+            since=since, until=until, text=text, cursor=cursor,
+        )
+        with self.reader() as conn:
+            rows = conn.execute(sql + " LIMIT ?", params + [limit + 1]).fetchall()
+
+        data = []
+        for row in rows[:limit]:
+            item = dict(row)
+            item["tags"] = item["tags"].split(",") if item["tags"] else []
+            data.append(item)
+        next_cursor = None
+        if len(rows) > limit:
+            last = data[-1]
+            next_cursor = encode_cursor(last["created_at_us"], last["id"])
+        return QueryPage(data, next_cursor)
+
+    def search_transactions(
+        self,
+        query: str,
+        account: Optional[str] = None,
+        category: Optional[str] = None,
+        tag: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[Union[datetime, str]] = None,
+        until: Optional[Union[datetime, str]] = None,
+        limit: int = DEFAULT_QUERY_LIMIT,
+    ) -> List[Dict[str, Any]]:
+        """Full-text search over description, raw text, message and note, best match first
+
+        Every word in ``query`` must match the start of a word in one of
+        those columns, so "wool" finds "Woolworths". Results are ranked by
+        BM25 (description matches weigh most) and come from the FTS5 index
+        rather than a scan, so cost depends on how many rows match, not on
+        the table size.
+
+        Args:
+            query: Free text; punctuation is ignored
+            account: Only this account's transactions
+            category: Only transactions in this category
+            tag: Only transactions with this tag
+            status: HELD or SETTLED
+            since: Only transactions created at or after this time (naive values are UTC)
+            until: Only transactions created before this time (naive values are UTC)
+            limit: Number of results, at most ``MAX_QUERY_LIMIT``
+
+        Returns:
+            Transaction rows as returned by ``query_transactions``, plus their
+            ``rank`` (lower is better)
+        """
+        if not 1 <= limit <= MAX_QUERY_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_QUERY_LIMIT}")
+        sql, params = transaction_search_sql(
+            query, account=account, category=category, tag=tag, status=status, since=since, until=until,
+        )
+        with self.reader() as conn:
+            rows = conn.execute(sql + " LIMIT ?", params + [limit]).fetchall()
+
+        data = []
+        for row in rows:
+            item = dict(row)
+            item["tags"] = item["tags"].split(",") if item["tags"] else []
+            data.append(item)
+        return data
+
+    def rebuild_search_index(self):
+        """Rebuild the full-text index from ``transactions``
+
+        Needed after a ``VACUUM``, which may renumber the rowids the index refers to.
+        """
+        with self.conn:
+            self.conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+
+    def spend_summary(
+        self,
+        grain: str = "month",
+        by: Optional[str] = None,
+        since: Optional[Union[date, str]] = None,
+        until: Optional[Union[date, str]] = None,
+        account: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Summarise spending per day or month from the rollup tables
+
+        The rollups are maintained by triggers as transactions are written,
+        so this reads a few rows per period instead of scanning
+        ``transactions``. Periods are the calendar day or month in the
+        offset UP reported each transaction with, unlike the UTC instants
+        ``query_transactions`` filters on: to list a period's transactions,
+        pass that period's bounds with the local offset (e.g.
+        ``since="2024-03-01T00:00:00+11:00"``).
+
+        Args:
+            grain: "day" or "month"
+            by: Break each period down by "account", "category",
+                "parent_category" or "tag" (a transaction counts once per tag),
+                or None for one total per period
+            since: First period to include, e.g. "2024-01" or a date
+            until: Period to stop before (exclusive)
+            account: Only this account's transactions
+            status: HELD or SETTLED
+
+        Returns:
+            Rows of ``period``, ``key`` (the group, or None), ``debit_base_units``
+            (money out, negative), ``credit_base_units`` (money in) and
+            ``transaction_count``
+        """
+        sql, params = spend_summary_sql(
+            grain=grain, by=by, since=since, until=until, account=account, status=status
+        )
+        with self.reader() as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def rebuild_rollups(self):
+        """Recompute the spend rollups from ``transactions``, e.g. after editing rows by hand"""
+        with self.conn:
+            for statement in REBUILD_ROLLUPS:
+                self.conn.execute(statement)
+
+    def get_accounts(self, account_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return stored account rows, or just one account's"""
+        sql = "SELECT * FROM accounts" + (" WHERE id = ?" if account_id is not None else "") + " ORDER BY rowid"
+        with self.reader() as conn:
+            return [dict(row) for row in conn.execute(sql, () if account_id is None else (account_id,))]
+
+    def get_categories(
+        self, category_id: Optional[str] = None, parent: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Return stored category rows, optionally one category or a parent's children"""
+        where = []
+        params = []
+        for column, value in (("id", category_id), ("parent_id", parent)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        sql = "SELECT * FROM categories" + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY rowid"
+        with self.reader() as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def get_transaction(self, transaction_id: str) -> Optional[Dict[str, Any]]:
+        """Return one stored transaction row, shaped like ``query_transactions`` rows"""
+        with self.reader() as conn:
+            row = conn.execute("""
+                SELECT t.*,
+                    (SELECT group_concat(tag_id) FROM transaction_tags WHERE transaction_id = t.id) AS tags
+                FROM transactions AS t
+                WHERE t.id = ?
+            """, (transaction_id,)).fetchone()
+        if row is None:
+            return None
+        item = dict(row)
+        item["tags"] = item["tags"].split(",") if item["tags"] else []
+        return item
+
+    def get_synced_at(self, resource: str) -> Optional[datetime]:
+        """Return when a resource was last synced in full, if ever"""
+        with self.reader() as conn:
+            row = conn.execute(
+                "SELECT synced_at FROM sync_freshness WHERE resource = ?", (resource,)
+            ).fetchone()
+        return datetime.fromisoformat(row["synced_at"]) if row else None
+
+    def mark_synced(self, resource: str, synced_at: Optional[datetime] = None):
+        """Record that a resource was synced in full as of ``synced_at`` (default now)
+
+        Pass the time the sync started: everything changed before then is
+        stored. Like high-water marks, this never moves backwards.
+        """
+        synced_at = synced_at or datetime.now(timezone.utc)
+        if synced_at.tzinfo is None:
+            synced_at = synced_at.replace(tzinfo=timezone.utc)
+        with self.conn:
+            self.conn.execute("""
+                INSERT INTO sync_freshness (resource, synced_at) VALUES (?, ?)
+                ON CONFLICT (resource) DO UPDATE SET synced_at = MAX(synced_at, excluded.synced_at)
+            """, (resource, synced_at.astimezone(timezone.utc).isoformat()))
+
+    def get_oldest_held(self, since: Optional[datetime] = None) -> Dict[str, datetime]:
+        """Return the created_at of each account's oldest HELD transaction, for accounts with any
+
+        With ``since``, HELD transactions created before it are ignored.
+        """
+        rows = self.conn.execute("""
+            SELECT account_id, MIN(created_at_us) AS oldest FROM transactions
+            WHERE status = 'HELD' AND created_at_us >= COALESCE(?, created_at_us)
+            GROUP BY account_id
+        """, (epoch_us(since),)).fetchall()
+        return {
+            row["account_id"]: datetime.fromtimestamp(row["oldest"] / 1_000_000, timezone.utc)
+            for row in rows
+        }
+
+    def get_checkpoints(self, resource: str) -> List[Dict[str, Any]]:
+        """Return the saved checkpoints of an interrupted sync of ``resource``, one per scope"""
+        rows = self.conn.execute(
+            "SELECT * FROM sync_checkpoints WHERE resource = ? ORDER BY scope", (resource,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def save_checkpoints(self, resource: str, checkpoints: Iterable[Dict[str, Any]]):
+        """Insert or replace checkpoints for ``resource``, keyed by their ``scope``
+
+        Each checkpoint has ``scope`` and ``params`` and optionally
+        ``window_since``, ``window_until``, ``cursor`` (the ``page[after]``
+        of the next page to fetch), ``done`` and ``rows``.
+        """
+        updated_at = datetime.now(timezone.utc).isoformat()
+        with self.conn:
+            self.conn.executemany("""
+                INSERT OR REPLACE INTO sync_checkpoints
+                    (resource, scope, params, window_since, window_until, cursor, done, rows, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (
+                    resource,
+                    checkpoint["scope"],
+                    checkpoint["params"],
+                    checkpoint.get("window_since"),
+                    checkpoint.get("window_until"),
+                    checkpoint.get("cursor"),
+                    int(checkpoint.get("done", False)),
+                    checkpoint.get("rows", 0),
+                    updated_at,
+                )
+                for checkpoint in checkpoints
+            ])
+
+    def clear_checkpoints(self, resource: str):
+        """Forget the checkpoints of ``resource``, once its sync completes or restarts"""
+        with self.conn:
+            self.conn.execute("DELETE FROM sync_checkpoints WHERE resource = ?", (resource,))
+
+    def get_high_water_mark(self, resource: str, scope: str) -> Optional[datetime]:
+        """Return the newest timestamp recorded for a resource and scope, if any"""
+        row = self.conn.execute(
+            "SELECT high_water_mark FROM sync_state WHERE resource = ? AND scope = ?",
+            (resource, scope)
+        ).fetchone()
+        return datetime.fromisoformat(row["high_water_mark"]) if row else None
+
+    def set_high_water_mark(self, resource: str, scope: str, value: datetime):
+        """Record a high-water mark, never moving an existing one backwards
+
+        Marks are stored as UTC ISO 8601 strings so they compare correctly
+        as text whatever offset the API reported them in.
+        """
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
         with self.conn:
             self.conn.execute("""
-                INSERT OR REPLACE INTO webhook_logs (
-                    id, webhook_id, request_body, response_status_code,
-                    response_body, delivery_status, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO sync_state (resource, scope, high_water_mark, synced_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (resource, scope) DO UPDATE SET
+                    high_water_mark = MAX(high_water_mark, excluded.high_water_mark),
+                    synced_at = excluded.synced_at
             """, (
-                log["id"],
-                webhook_id,
-                log["attributes"]["request"]["body"],
-                log["attributes"]["response"]["status_code"] if log["attributes"].get("response") else None,
-                log["attributes"]["response"]["body"] if log["attributes"].get("response") else None,
-                log["attributes"]["delivery_status"],
-                log["attributes"]["created_at"]
+                resource,
+                scope,
+                value.astimezone(timezone.utc).isoformat(),
+                datetime.now(timezone.utc).isoformat()
             ))
 
     def close(self):
-        """Close the database connection"""
-        self.conn.close() 
\ No newline at end of file
+        """Close the database connection and any pooled readers"""
+        if self.readers is not None:
+            self.readers.close()
+        if self.conn is None:
+            return
+        try:
+            # Refresh planner statistics for the query indexes where it's worthwhile
+            self.conn.execute("PRAGMA optimize")
+        finally:
+            self.conn.close()
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""
+Serve UP API resources from a database kept current by the sync tool
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, Optional, Union
+
+from upbank.client import DEFAULT_BASE_URL
+from upbank.database import MAX_QUERY_LIMIT, UpDatabase
+from upbank.models import Account, AccountList, Category, CategoryList, Transaction
+
+DEFAULT_MAX_AGE = timedelta(minutes=15)
+
+def _money(currency_code: Optional[str], value: Optional[str], base_units: Optional[int]) -> Optional[Dict[str, Any]]:
+    if currency_code is None:
+        return None
+    return {"currency_code": currency_code, "value": value, "value_in_base_units": base_units}
+
+def _relationship(type_: str, id_: Optional[str]) -> Dict[str, Any]:
+    return {"data": {"type": type_, "id": id_} if id_ else None}
+
+class LocalReader:
+    """
+    Read accounts, categories and transactions from an ``UpDatabase`` as API models
+
+    Rows are rebuilt into the same models ``UpClient`` returns, so callers
+    can switch between local and upstream reads without caring which they
+    got. Fields the sync doesn't store (hold info, round-ups, cashback, card
+    purchase method, performing customer) come back as None.
+
+    ``fresh()`` says whether a resource was synced recently enough to be
+    served; callers fall back to the API when it returns None.
+    """
+
+    def __init__(
+        self,
+        db: UpDatabase,
+        max_age: timedelta = DEFAULT_MAX_AGE,
+        base_url: str = DEFAULT_BASE_URL,
+    ):
+        """
+        Args:
+            db: Database kept up to date by ``UpBankSync``
+            max_age: How long after a full sync a resource still counts as fresh
+            base_url: API base URL used to build resource links
+        """
+        self.db = db
+        self.max_age = max_age
+        self.base_url = base_url.rstrip("/")
+
+    def fresh(self, resource: str) -> Optional[datetime]:
+        """Return when ``resource`` was last synced if that's within ``max_age``, else None"""
+        synced_at = self.db.get_synced_at(resource)
+        if synced_at is None or datetime.now(timezone.utc) - synced_at > self.max_age:
+            return None
+        return synced_at
+
+    def _account(self, row: Dict[str, Any]) -> Account:
+        return Account.model_validate({
+            "id": row["id"],
+            "attributes": {
+                "display_name": row["display_name"],
+                "account_type": row["account_type"],
+                "ownership_type": row["ownership_type"],
+                "balance": _money(
+                    row["balance_currency_code"], row["balance_value"], row["balance_value_in_base_units"]
+                ),
+                "created_at": row["created_at"],
+            },
+            "relationships": {
+                "transactions": {"links": {"related": f"{self.base_url}/accounts/{row['id']}/transactions"}},
+            },
+            "links": {"self": f"{self.base_url}/accounts/{row['id']}"},
+        })
+
+    def _category(self, row: Dict[str, Any]) -> Category:
+        return Category.model_validate({
+            "id": row["id"],
+            "attributes": {"name": row["name"]},
+            "relationships": {"parent": _relationship("categories", row["parent_id"])},
+            "links": {"self": f"{self.base_url}/categories/{row['id']}"},
+        })
+
+    def _transaction(self, row: Dict[str, Any], parents: Dict[str, Optional[str]]) -> Transaction:
+        return Transaction.model_validate({
+            "id": row["id"],
+            "attributes": {
+                "status": row["status"],
+                "raw_text": row["raw_text"],
+                "description": row["description"],
+                "message": row["message"],
+                "is_categorizable": bool(row["is_categorizable"]),
+                "amount": _money(
+                    row["amount_currency_code"], row["amount_value"], row["amount_value_in_base_units"]
+                ),
+                "foreign_amount": _money(
+                    row["foreign_amount_currency_code"],
+                    row["foreign_amount_value"],
+                    row["foreign_amount_value_in_base_units"],
+                ),
+                "settled_at": row["settled_at"],
+                "created_at": row["created_at"],
+                "transaction_type": row["transaction_type"],
+                "note": (
+                    {"value": row["note"], "created_at": row["note_created_at"]}
+                    if row["note"] is not None else None
+                ),
+            },
+            "relationships": {
+                "account": _relationship("accounts", row["account_id"]),
+                "transfer_account": _relationship("accounts", row["transfer_account_id"]),
+                "category": _relationship("categories", row["category_id"]),
+                "parent_category": _relationship("categories", parents.get(row["category_id"])),
+                "tags": {"data": [{"type": "tags", "id": tag} for tag in row["tags"]]},
+            },
+            "links": {"self": f"{self.base_url}/transactions/{row['id']}"},
+        })
+
+    def _category_parents(self) -> Dict[str, Optional[str]]:
+        return {row["id"]: row["parent_id"] for row in self.db.get_categories()}
+
+    def list_accounts(self) -> AccountList:
+        return AccountList(data=[self._account(row) for row in self.db.get_accounts()], links={})
+
+    def get_account(self, account_id: str) -> Optional[Account]:
+        rows = self.db.get_accounts(account_id)
+        return self._account(rows[0]) if rows else None
+
+    def list_categories(self, parent: Optional[str] = None) -> CategoryList:
+        return CategoryList(data=[self._category(row) for row in self.db.get_categories(parent=parent)], links={})
+
+    def get_category(self, category_id: str) -> Optional[Category]:
+        rows = self.db.get_categories(category_id)
+        return self._category(rows[0]) if rows else None
+
+    def get_transaction(self, transaction_id: str) -> Optional[Transaction]:
+        row = self.db.get_transaction(transaction_id)
+        return self._transaction(row, self._category_parents()) if row else None
+
+    def iter_transactions(
+        self,
+        status: Optional[str] = None,
+        since: Optional[Union[datetime, str]] = None,
+        until: Optional[Union[datetime, str]] = None,
+        category: Optional[str] = None,
+        tag: Optional[str] = None,
+    ) -> Iterator[Transaction]:
+        """Yield every matching stored transaction, newest first, like the API's listing"""
+        parents = self._category_parents()
+        cursor = None
+        while True:
+            page = self.db.query_transactions(
+                status=status, since=since, until=until, category=category, tag=tag,
+                limit=MAX_QUERY_LIMIT, cursor=cursor,
+            )
+            for row in page.data:
+                yield self._transaction(row, parents)
+            if page.next_cursor is None:
+                return
+            cursor = page.next_cursor
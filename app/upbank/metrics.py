@@ -0,0 +1,152 @@
+"""
+In-process request metrics for the UP Bank clients
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STATIC_SEGMENTS = {
+    "accounts",
+    "category",
+    "categories",
+    "logs",
+    "ping",
+    "relationships",
+    "tags",
+    "transactions",
+    "util",
+    "webhooks",
+}
+
+def endpoint_template(endpoint: str) -> str:
+    """Collapse resource IDs in an endpoint path, e.g. /accounts/abc -> /accounts/{id}"""
+    segments = endpoint.split("?", 1)[0].strip("/").split("/")
+    return "/" + "/".join(s if s in STATIC_SEGMENTS else "{id}" for s in segments)
+
+class EndpointStats:
+    """Counters for one endpoint template"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.throttled = 0
+        self.response_bytes = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.decode_seconds = 0.0
+        self.validations = 0
+        self.validation_seconds = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        buckets = {f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS, self.latency_buckets)}
+        buckets["le_inf"] = self.latency_buckets[-1]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "response_bytes": self.response_bytes,
+            "latency_sum": self.latency_sum,
+            "latency_avg": self.latency_sum / self.requests if self.requests else 0.0,
+            "latency_max": self.latency_max,
+            "latency_histogram": buckets,
+            "decode_seconds": self.decode_seconds,
+            "validations": self.validations,
+            "validation_seconds": self.validation_seconds,
+        }
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of per-endpoint client metrics
+
+    Pass one to ``UpClient``/``AsyncUpClient`` via ``metrics=`` to record
+    request latency, response size, retries, throttling, JSON decode time
+    and model validation time, keyed by ``"METHOD /endpoint/{id}"``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, EndpointStats] = {}
+
+    def _get(self, method: str, endpoint: str) -> EndpointStats:
+        key = f"{method.upper()} {endpoint_template(endpoint)}"
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats.setdefault(key, EndpointStats())
+        return stats
+
+    def record_request(
+        self, method: str, endpoint: str, seconds: float, status_code: int, response_bytes: int
+    ) -> None:
+        """Record one HTTP round trip"""
+        with self._lock:
+            stats = self._get(method, endpoint)
+            stats.requests += 1
+            stats.latency_sum += seconds
+            stats.latency_max = max(stats.latency_max, seconds)
+            stats.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            stats.response_bytes += response_bytes
+            if status_code == 429:
+                stats.throttled += 1
+            if status_code >= 400:
+                stats.errors += 1
+
+    def record_retry(self, method: str, endpoint: str) -> None:
+        with self._lock:
+            self._get(method, endpoint).retries += 1
+
+    def record_decode(self, method: str, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            self._get(method, endpoint).decode_seconds += seconds
+
+    def record_validation(self, method: str, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._get(method, endpoint)
+            stats.validations += 1
+            stats.validation_seconds += seconds
+
+    @contextmanager
+    def time_validation(self, method: str, endpoint: str) -> Iterator[None]:
+        """Time a block of model validation for an endpoint"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_validation(method, endpoint, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return a JSON-serialisable copy of every endpoint's metrics"""
+        with self._lock:
+            return {key: stats.to_dict() for key, stats in sorted(self._stats.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def format(self) -> str:
+        """Render a plain-text summary table"""
+        rows: List[str] = [
+            f"{'endpoint':<44} {'reqs':>6} {'avg ms':>8} {'max ms':>8} {'KiB':>9} "
+            f"{'retry':>5} {'429':>5} {'json ms':>8} {'valid ms':>9}"
+        ]
+        for key, stats in self.snapshot().items():
+            rows.append(
+                f"{key:<44} {stats['requests']:>6} {stats['latency_avg'] * 1000:>8.1f} "
+                f"{stats['latency_max'] * 1000:>8.1f} {stats['response_bytes'] / 1024:>9.1f} "
+                f"{stats['retries']:>5} {stats['throttled']:>5} "
+                f"{stats['decode_seconds'] * 1000:>8.1f} {stats['validation_seconds'] * 1000:>9.1f}"
+            )
+        return "\n".join(rows)
+
+_registry = MetricsRegistry()
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Return the process-wide registry used by the API server and sync CLI"""
+    return _registry
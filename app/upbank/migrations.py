@@ -4,9 +4,115 @@ Database migrations for UP Bank SQLite database
 
 import sqlite3
 from pathlib import Path
-from typing import List, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator, List, Optional, Tuple, Union
 
-MIGRATIONS: List[Tuple[str, str]] = [
+from upbank.rollups import REBUILD_ROLLUPS, ROLLUP_TABLES, ROLLUP_TRIGGERS, rollup_script
+
+def _statements(script: str) -> Iterator[str]:
+    """Split a migration script into statements (trigger bodies included)"""
+    statement = ""
+    *pieces, tail = script.split(";")
+    for piece in pieces:
+        statement += piece + ";"
+        if sqlite3.complete_statement(statement):
+            yield statement
+            statement = ""
+    if (statement + tail).strip():
+        yield statement + tail
+
+def _run_script(conn: sqlite3.Connection, script: str) -> None:
+    # Unlike executescript(), this doesn't commit, so a migration stays atomic
+    for statement in _statements(script):
+        conn.execute(statement)
+
+def _add_column(conn: sqlite3.Connection, table: str, column: str, definition: str) -> bool:
+    """Add a column unless it's already there, returning whether it was added
+
+    Databases created by ``UpDatabase`` before it ran these migrations may
+    already have columns that later migrations add.
+    """
+    if any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})")):
+        return False
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return True
+
+def _epoch_us(value: Optional[str]) -> Optional[int]:
+    """Microseconds since the Unix epoch for an ISO 8601 string, naive taken as UTC
+
+    A frozen copy of ``database.epoch_us`` as it was when 0011 was added,
+    so the migration keeps doing the same thing if that function changes.
+    """
+    if value is None:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return (parsed - datetime(1970, 1, 1, tzinfo=timezone.utc)) // timedelta(microseconds=1)
+
+def _epoch_microseconds(conn: sqlite3.Connection) -> None:
+    """Recompute the epoch columns to the microsecond, as new rows get them
+    (0004's strftime('%f') backfill stopped at milliseconds)"""
+    conn.create_function("epoch_us", 1, _epoch_us, deterministic=True)
+    conn.execute("""
+        UPDATE transactions SET
+            created_at_us = epoch_us(created_at),
+            settled_at_us = epoch_us(settled_at)
+        WHERE created_at_us IS NOT epoch_us(created_at) OR settled_at_us IS NOT epoch_us(settled_at)
+    """)
+
+def _epoch_timestamps(conn: sqlite3.Connection) -> None:
+    """UTC epoch microseconds, so ranges and ordering don't depend on the
+    +10:00/+11:00 offset each ISO string happened to be written with"""
+    _add_column(conn, "transactions", "created_at_us", "INTEGER")
+    _add_column(conn, "transactions", "settled_at_us", "INTEGER")
+    _run_script(conn, """
+        UPDATE transactions SET
+            created_at_us = CAST(strftime('%s', created_at) AS INTEGER) * 1000000
+                + CAST(substr(strftime('%f', created_at), 4) AS INTEGER) * 1000,
+            settled_at_us = CAST(strftime('%s', settled_at) AS INTEGER) * 1000000
+                + CAST(substr(strftime('%f', settled_at), 4) AS INTEGER) * 1000;
+
+        DROP INDEX IF EXISTS idx_transactions_created_id;
+        DROP INDEX IF EXISTS idx_transactions_account_created;
+        DROP INDEX IF EXISTS idx_transactions_category_created;
+        DROP INDEX IF EXISTS idx_transactions_status_created;
+        CREATE INDEX IF NOT EXISTS idx_transactions_created_us ON transactions(created_at_us, id);
+        CREATE INDEX IF NOT EXISTS idx_transactions_account_created_us ON transactions(account_id, created_at_us, id);
+        CREATE INDEX IF NOT EXISTS idx_transactions_category_created_us ON transactions(category_id, created_at_us, id);
+        CREATE INDEX IF NOT EXISTS idx_transactions_status_created_us ON transactions(status, created_at_us, id);
+        CREATE INDEX IF NOT EXISTS idx_transactions_settled_us ON transactions(settled_at_us);
+    """)
+
+def _webhook_log_request_url(conn: sqlite3.Connection) -> None:
+    """Add webhook_logs.request_url to databases UpDatabase created without it,
+    filling it with the URL of the webhook each log belongs to"""
+    if _add_column(conn, "webhook_logs", "request_url", "TEXT NOT NULL DEFAULT ''"):
+        conn.execute("""
+            UPDATE webhook_logs SET request_url = COALESCE(
+                (SELECT url FROM webhooks WHERE webhooks.id = webhook_logs.webhook_id), ''
+            )
+        """)
+
+def _iso_timestamps(conn: sqlite3.Connection) -> None:
+    """Rewrite timestamps stored by sqlite3's datetime adapter ("2024-01-01 12:00:00+10:00")
+    in the ISO 8601 form UpDatabase now writes, so the next sync doesn't see every old row as changed"""
+    for table, column in (
+        ("accounts", "created_at"),
+        ("transactions", "created_at"),
+        ("transactions", "settled_at"),
+        ("transactions", "note_created_at"),
+        ("webhooks", "created_at"),
+        ("webhook_logs", "created_at"),
+    ):
+        conn.execute(f"""
+            UPDATE {table} SET {column} = substr({column}, 1, 10) || 'T' || substr({column}, 12)
+            WHERE substr({column}, 11, 1) = ' '
+        """)
+
+# Each migration is a SQL script or a function applying it to a connection.
+# Applied migrations must never change; add a new one instead.
+MIGRATIONS: List[Tuple[str, Union[str, Callable[[sqlite3.Connection], None]]]] = [
     ("0001_initial_schema", """
         -- Create migrations table to track applied migrations
         CREATE TABLE IF NOT EXISTS migrations (
@@ -103,44 +209,175 @@ MIGRATIONS: List[Tuple[str, str]] = [
         CREATE INDEX IF NOT EXISTS idx_webhook_logs_webhook_id ON webhook_logs(webhook_id);
         CREATE INDEX IF NOT EXISTS idx_categories_parent_id ON categories(parent_id);
     """),
+    ("0002_sync_state", """
+        -- Newest record seen per resource and scope (e.g. transactions per account)
+        CREATE TABLE IF NOT EXISTS sync_state (
+            resource TEXT NOT NULL,
+            scope TEXT NOT NULL,
+            high_water_mark TEXT NOT NULL,
+            synced_at TEXT NOT NULL,
+            PRIMARY KEY (resource, scope)
+        );
+    """),
+    ("0003_query_indexes", """
+        -- Composite indexes matching query_transactions' filters plus its
+        -- (created_at, id) keyset order; they supersede the single-column ones
+        DROP INDEX IF EXISTS idx_transactions_account_id;
+        DROP INDEX IF EXISTS idx_transactions_category_id;
+        DROP INDEX IF EXISTS idx_transactions_created_at;
+        CREATE INDEX IF NOT EXISTS idx_transactions_created_id ON transactions(created_at, id);
+        CREATE INDEX IF NOT EXISTS idx_transactions_account_created ON transactions(account_id, created_at, id);
+        CREATE INDEX IF NOT EXISTS idx_transactions_category_created ON transactions(category_id, created_at, id);
+        CREATE INDEX IF NOT EXISTS idx_transactions_status_created ON transactions(status, created_at, id);
+        CREATE INDEX IF NOT EXISTS idx_transaction_tags_tag ON transaction_tags(tag_id, transaction_id);
+    """),
+    ("0004_epoch_timestamps", _epoch_timestamps),
+    # Daily/monthly spend per account, category and tag, maintained by
+    # triggers on transactions and transaction_tags (see upbank.rollups)
+    ("0005_spend_rollups", rollup_script(*ROLLUP_TABLES, *ROLLUP_TRIGGERS, *REBUILD_ROLLUPS)),
+    ("0006_transaction_search", """
+        -- FTS5 index over the free-text columns; an external content table
+        -- (the text stays in transactions) kept in step by triggers
+        CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+            description, raw_text, message, note,
+            content = 'transactions',
+            content_rowid = 'rowid',
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS transactions_search_insert AFTER INSERT ON transactions BEGIN
+            INSERT INTO transactions_fts (rowid, description, raw_text, message, note)
+            VALUES (NEW.rowid, NEW.description, NEW.raw_text, NEW.message, NEW.note);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS transactions_search_delete AFTER DELETE ON transactions BEGIN
+            INSERT INTO transactions_fts (transactions_fts, rowid, description, raw_text, message, note)
+            VALUES ('delete', OLD.rowid, OLD.description, OLD.raw_text, OLD.message, OLD.note);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS transactions_search_update
+        AFTER UPDATE OF description, raw_text, message, note ON transactions
+        WHEN OLD.description IS NOT NEW.description OR OLD.raw_text IS NOT NEW.raw_text
+            OR OLD.message IS NOT NEW.message OR OLD.note IS NOT NEW.note BEGIN
+            INSERT INTO transactions_fts (transactions_fts, rowid, description, raw_text, message, note)
+            VALUES ('delete', OLD.rowid, OLD.description, OLD.raw_text, OLD.message, OLD.note);
+            INSERT INTO transactions_fts (rowid, description, raw_text, message, note)
+            VALUES (NEW.rowid, NEW.description, NEW.raw_text, NEW.message, NEW.note);
+        END;
+
+        -- Description matches weigh most, then the raw statement text
+        INSERT INTO transactions_fts (transactions_fts, rank) VALUES ('rank', 'bm25(4.0, 2.0, 1.0, 1.0)');
+        INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild');
+    """),
+    ("0007_webhook_log_request_url", _webhook_log_request_url),
+    ("0008_sync_freshness", """
+        -- When each resource was last synced in full, so readers can tell
+        -- whether the local copy is fresh enough to serve
+        CREATE TABLE IF NOT EXISTS sync_freshness (
+            resource TEXT PRIMARY KEY,
+            synced_at TEXT NOT NULL
+        );
+    """),
+    ("0009_sync_checkpoints", """
+        -- Progress through each cursor chain of an interrupted sync, saved
+        -- after every committed batch so a resumed run skips what's stored
+        CREATE TABLE IF NOT EXISTS sync_checkpoints (
+            resource TEXT NOT NULL,
+            scope TEXT NOT NULL,
+            params TEXT NOT NULL,
+            window_since TEXT,
+            window_until TEXT,
+            cursor TEXT,
+            done INTEGER NOT NULL DEFAULT 0,
+            rows INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (resource, scope)
+        );
+    """),
+    ("0010_iso_timestamps", _iso_timestamps),
+    # Redo 0004's backfill at full precision for databases it ran on with strftime()
+    ("0011_epoch_microseconds", _epoch_microseconds),
 ]
 
-def init_db(db_path: str) -> None:
-    """Initialize the database and run migrations"""
-    conn = sqlite3.connect(db_path)
-    try:
-        conn.execute("PRAGMA foreign_keys = ON")
+def migrate(conn: sqlite3.Connection, verbose: bool = False) -> List[str]:
+    """Apply any pending migrations on an open connection
 
+    ``PRAGMA user_version`` records how many migrations a database has, so
+    opening an up-to-date one costs that single read. Otherwise pending
+    migrations are applied in one ``BEGIN IMMEDIATE`` transaction, so two
+    processes opening a new database at once can't both apply them and a
+    failed migration leaves nothing half-done.
+
+    Returns:
+        IDs of the migrations applied
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= len(MIGRATIONS):
+        return []
+
+    applied: List[str] = []
+    conn.execute("BEGIN IMMEDIATE")
+    try:
         conn.execute("""
             CREATE TABLE IF NOT EXISTS migrations (
                 id TEXT PRIMARY KEY,
                 applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        done = {row[0] for row in conn.execute("SELECT id FROM migrations")}
+        for migration_id, migration in MIGRATIONS:
+            if migration_id in done:
+                if verbose:
+                    print(f"Skipping migration {migration_id} (already applied)")
+                continue
+            if callable(migration):
+                migration(conn)
+            else:
+                _run_script(conn, migration)
+            conn.execute("INSERT INTO migrations (id) VALUES (?)", (migration_id,))
+            applied.append(migration_id)
+        conn.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
         conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
 
-        for migration_id, migration_sql in MIGRATIONS:
-            cursor = conn.execute(
-                "SELECT id FROM migrations WHERE id = ?", 
-                (migration_id,)
-            )
-            if cursor.fetchone() is None:
-                conn.executescript(migration_sql)
-                conn.execute(
-                    "INSERT INTO migrations (id) VALUES (?)",
-                    (migration_id,)
-                )
-                conn.commit()
-                print(f"Applied migration: {migration_id}")
-            else:
-                print(f"Skipping migration {migration_id} (already applied)")
+    if verbose:
+        for migration_id in applied:
+            print(f"Applied migration: {migration_id}")
+    return applied
 
+def init_db(db_path: str, verbose: bool = True) -> None:
+    """Initialize the database and run migrations"""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+        migrate(conn, verbose=verbose)
     except sqlite3.Error as e:
         print(f"Error applying migrations: {e}")
         raise
     finally:
         conn.close()
 
+def rebuild_rollups(db_path: str) -> None:
+    """Recompute the spend rollup tables from the transactions table"""
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            for statement in REBUILD_ROLLUPS:
+                conn.execute(statement)
+    finally:
+        conn.close()
+
+def rebuild_search_index(db_path: str) -> None:
+    """Rebuild the transactions full-text index, e.g. after a VACUUM"""
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+    finally:
+        conn.close()
+
 def main():
     """Main entry point for running migrations"""
     import os
@@ -152,11 +389,27 @@ def main():
         default=os.environ.get("UPBANK_DB_PATH", "upbank.db"),
         help="Path to SQLite database (default: upbank.db or UPBANK_DB_PATH env var)"
     )
+    parser.add_argument(
+        "--rebuild-rollups",
+        action="store_true",
+        help="Recompute the spend rollup tables from transactions after migrating"
+    )
+    parser.add_argument(
+        "--rebuild-search",
+        action="store_true",
+        help="Rebuild the transactions full-text index after migrating (e.g. after a VACUUM)"
+    )
     args = parser.parse_args()
 
     print(f"Initializing database at: {args.db_path}")
     init_db(args.db_path)
     print("Database initialization complete")
+    if args.rebuild_rollups:
+        rebuild_rollups(args.db_path)
+        print("Spend rollups rebuilt")
+    if args.rebuild_search:
+        rebuild_search_index(args.db_path)
+        print("Search index rebuilt")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
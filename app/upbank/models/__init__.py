@@ -6,6 +6,8 @@ from upbank.models.account import Account, AccountList
 from upbank.models.transaction import Transaction, TransactionList
 from upbank.models.category import Category, CategoryList
 from upbank.models.tag import Tag, TagList
+from upbank.models.bulk import BulkItemResult, BulkResult
+from upbank.models.records import Money, RecordPage, TransactionRecord
 from upbank.models.webhook import (
     Webhook,
     WebhookList,
@@ -26,4 +28,9 @@ __all__ = [
     "WebhookList",
     "WebhookLog",
     "WebhookLogList",
+    "BulkItemResult",
+    "BulkResult",
+    "Money",
+    "RecordPage",
+    "TransactionRecord",
 ] 
\ No newline at end of file
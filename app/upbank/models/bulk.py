@@ -0,0 +1,26 @@
+"""
+Models for bulk transaction mutation results
+"""
+
+from typing import List, Optional
+
+from upbank.models.base import UpBaseModel
+
+class BulkItemResult(UpBaseModel):
+    """Outcome of one transaction in a bulk request"""
+    transaction_id: str
+    success: bool
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkResult(UpBaseModel):
+    """Per-transaction outcomes of a bulk request"""
+    results: List[BulkItemResult]
+
+    @property
+    def succeeded(self) -> List[str]:
+        return [r.transaction_id for r in self.results if r.success]
+
+    @property
+    def failed(self) -> List[BulkItemResult]:
+        return [r for r in self.results if not r.success]
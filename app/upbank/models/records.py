@@ -0,0 +1,161 @@
+"""
+Validation-free transaction records for trusted bulk reads
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from upbank.models.base import Links
+
+class Money(NamedTuple):
+    """Tuple-backed money value"""
+    currency_code: str
+    value: str
+    value_in_base_units: int
+
+    @classmethod
+    def from_json(cls, data: Optional[Dict[str, Any]]) -> Optional["Money"]:
+        if not data:
+            return None
+        return cls(data["currencyCode"], data["value"], data["valueInBaseUnits"])
+
+    def model_dump(self) -> Dict[str, Any]:
+        return self._asdict()
+
+def _related_id(relationships: Dict[str, Any], name: str) -> Optional[str]:
+    data = (relationships.get(name) or {}).get("data")
+    return data["id"] if data else None
+
+class TransactionRecord:
+    """
+    Compact transaction built straight from API JSON without validation
+
+    Only the fields the sync handlers store are kept; hold info, performing
+    customer and links are dropped, and timestamps stay as the RFC 3339
+    strings the API returned. ``model_dump()`` produces the same nested
+    snake_case shape as ``Transaction.model_dump()`` for those fields, so
+    records can be passed anywhere a dumped transaction is expected.
+    """
+
+    __slots__ = (
+        "id",
+        "status",
+        "raw_text",
+        "description",
+        "message",
+        "is_categorizable",
+        "amount",
+        "foreign_amount",
+        "round_up",
+        "cashback",
+        "card_purchase_method",
+        "settled_at",
+        "created_at",
+        "transaction_type",
+        "note",
+        "note_created_at",
+        "account_id",
+        "transfer_account_id",
+        "category_id",
+        "parent_category_id",
+        "tag_ids",
+    )
+
+    def __init__(self, **fields: Any):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "TransactionRecord":
+        """Build a record from one element of a transactions response's ``data``"""
+        attrs = data["attributes"]
+        relationships = data.get("relationships") or {}
+        record = cls.__new__(cls)
+        record.id = data["id"]
+        record.status = attrs["status"]
+        record.raw_text = attrs.get("rawText")
+        record.description = attrs["description"]
+        record.message = attrs.get("message")
+        record.is_categorizable = attrs["isCategorizable"]
+        record.amount = Money.from_json(attrs["amount"])
+        record.foreign_amount = Money.from_json(attrs.get("foreignAmount"))
+        round_up = attrs.get("roundUp")
+        record.round_up = Money.from_json(round_up.get("amount", round_up) if round_up else None)
+        cashback = attrs.get("cashback")
+        record.cashback = Money.from_json(cashback.get("amount", cashback) if cashback else None)
+        card_purchase_method = attrs.get("cardPurchaseMethod")
+        record.card_purchase_method = card_purchase_method["method"] if card_purchase_method else None
+        record.settled_at = attrs.get("settledAt")
+        record.created_at = attrs["createdAt"]
+        record.transaction_type = attrs.get("transactionType")
+        note = attrs.get("note")
+        record.note = note["value"] if note else None
+        record.note_created_at = note["createdAt"] if note else None
+        record.account_id = _related_id(relationships, "account")
+        record.transfer_account_id = _related_id(relationships, "transferAccount")
+        record.category_id = _related_id(relationships, "category")
+        record.parent_category_id = _related_id(relationships, "parentCategory")
+        tags = (relationships.get("tags") or {}).get("data") or ()
+        record.tag_ids = tuple(tag["id"] for tag in tags)
+        return record
+
+    def model_dump(self) -> Dict[str, Any]:
+        """Return the nested dict shape produced by ``Transaction.model_dump()``"""
+        def relationship(type_: str, id_: Optional[str]) -> Dict[str, Any]:
+            return {"data": {"type": type_, "id": id_} if id_ else None}
+
+        return {
+            "type": "transactions",
+            "id": self.id,
+            "attributes": {
+                "status": self.status,
+                "raw_text": self.raw_text,
+                "description": self.description,
+                "message": self.message,
+                "is_categorizable": self.is_categorizable,
+                "round_up": self.round_up.model_dump() if self.round_up else None,
+                "cashback": self.cashback.model_dump() if self.cashback else None,
+                "amount": self.amount.model_dump(),
+                "foreign_amount": self.foreign_amount.model_dump() if self.foreign_amount else None,
+                "card_purchase_method": (
+                    {"method": self.card_purchase_method} if self.card_purchase_method else None
+                ),
+                "settled_at": self.settled_at,
+                "created_at": self.created_at,
+                "transaction_type": self.transaction_type,
+                "note": (
+                    {"value": self.note, "created_at": self.note_created_at}
+                    if self.note is not None else None
+                ),
+            },
+            "relationships": {
+                "account": relationship("accounts", self.account_id),
+                "transfer_account": relationship("accounts", self.transfer_account_id),
+                "category": relationship("categories", self.category_id),
+                "parent_category": relationship("categories", self.parent_category_id),
+                "tags": {"data": [{"type": "tags", "id": tag} for tag in self.tag_ids]},
+            },
+        }
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TransactionRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"TransactionRecord(id={self.id!r}, created_at={self.created_at!r}, amount={self.amount!r})"
+
+class RecordPage:
+    """One page of ``TransactionRecord`` objects and its pagination links"""
+
+    __slots__ = ("data", "links")
+
+    def __init__(self, data: List[TransactionRecord], links: Links):
+        self.data = data
+        self.links = links
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "RecordPage":
+        return cls(
+            [TransactionRecord.from_json(item) for item in data["data"]],
+            Links.model_validate(data.get("links") or {}),
+        )
@@ -0,0 +1,228 @@
+"""
+Pipelined sync: fetch, convert and write stages joined by bounded queues
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+DEFAULT_DEPTH = 4
+
+STAGES = ("fetch", "convert", "write")
+
+class StageStats:
+    """Work done by one pipeline stage
+
+    ``busy`` is time spent doing the stage's own work; ``waiting`` is time
+    spent blocked on a neighbour, either starved for input or held back by
+    a full queue downstream.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.batches = 0
+        self.rows = 0
+        self.busy = 0.0
+        self.waiting = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Rows per busy second"""
+        return self.rows / self.busy if self.busy else 0.0
+
+    def __iadd__(self, other: "StageStats") -> "StageStats":
+        self.batches += other.batches
+        self.rows += other.rows
+        self.busy += other.busy
+        self.waiting += other.waiting
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "busy_seconds": self.busy,
+            "waiting_seconds": self.waiting,
+            "rows_per_second": self.rate,
+        }
+
+class PipelineStats:
+    """Per-stage throughput for one or more pipeline runs"""
+
+    def __init__(self):
+        self.stages = {name: StageStats(name) for name in STAGES}
+        self.elapsed = 0.0
+
+    @property
+    def rows(self) -> int:
+        """Rows that made it all the way through to the writer"""
+        return self.stages["write"].rows
+
+    def __iadd__(self, other: "PipelineStats") -> "PipelineStats":
+        for name, stage in other.stages.items():
+            self.stages[name] += stage
+        self.elapsed += other.elapsed
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "elapsed_seconds": self.elapsed,
+            "stages": {name: stage.to_dict() for name, stage in self.stages.items()},
+        }
+
+    def format(self) -> str:
+        """Render a plain-text summary table"""
+        rows: List[str] = [f"{'stage':<8} {'batches':>7} {'rows':>8} {'busy s':>8} {'wait s':>8} {'rows/s':>9}"]
+        for stage in self.stages.values():
+            rows.append(
+                f"{stage.name:<8} {stage.batches:>7} {stage.rows:>8} {stage.busy:>8.2f} "
+                f"{stage.waiting:>8.2f} {stage.rate:>9.0f}"
+            )
+        overall = self.rows / self.elapsed if self.elapsed else 0.0
+        rows.append(f"{'total':<8} {'':>7} {self.rows:>8} {self.elapsed:>8.2f} {'':>8} {overall:>9.0f}")
+        return "\n".join(rows)
+
+class _Done:
+    """End-of-stream marker, carrying the upstream stage's exception if it failed"""
+
+    def __init__(self, error: Optional[BaseException] = None):
+        self.error = error
+
+class _Stopped(Exception):
+    """Raised inside a stage thread when the pipeline is shutting down early"""
+
+def _put(out: queue.Queue, item: Any, stop: threading.Event, stats: StageStats) -> None:
+    started = time.perf_counter()
+    try:
+        while True:
+            try:
+                out.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if stop.is_set():
+                    raise _Stopped()
+    finally:
+        stats.waiting += time.perf_counter() - started
+
+def _get(source: queue.Queue, stats: StageStats) -> Any:
+    started = time.perf_counter()
+    item = source.get()
+    stats.waiting += time.perf_counter() - started
+    return item
+
+def run_pipeline(
+    pages: Iterable[Any],
+    convert: Callable[[Any], List[Any]],
+    write: Callable[[List[Any]], None],
+    depth: int = DEFAULT_DEPTH,
+) -> PipelineStats:
+    """Stream pages through fetch, convert and write stages running concurrently
+
+    The fetch stage pulls pages from ``pages`` (which is where requests
+    happen) and the convert stage turns each one into a list of rows, each
+    in its own thread. ``write`` is called in the calling thread, in page
+    order, so it can use connections that aren't shareable across threads.
+    Queues between stages hold at most ``depth`` pages, so a slow writer
+    holds back fetching instead of buffering the whole history.
+
+    An exception in any stage stops the others and is re-raised here.
+
+    Args:
+        pages: Iterable of pages, each with a ``data`` list
+        convert: Turns one page into the rows handed to ``write``
+        write: Stores one page's rows
+        depth: Maximum pages queued between neighbouring stages
+
+    Returns:
+        Per-stage batch and row counts, busy and waiting time
+    """
+    stats = PipelineStats()
+    fetch_stats, convert_stats, write_stats = (stats.stages[name] for name in STAGES)
+    fetched: queue.Queue = queue.Queue(maxsize=depth)
+    converted: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def fetch() -> None:
+        iterator = iter(pages)
+        error = None
+        try:
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    page = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    fetch_stats.busy += time.perf_counter() - started
+                fetch_stats.batches += 1
+                fetch_stats.rows += len(page.data)
+                _put(fetched, page, stop, fetch_stats)
+        except _Stopped:
+            return
+        except BaseException as e:
+            error = e
+        finally:
+            close = getattr(iterator, "close", None)
+            if close:
+                close()
+        try:
+            _put(fetched, _Done(error), stop, fetch_stats)
+        except _Stopped:
+            pass
+
+    def convert_pages() -> None:
+        try:
+            while True:
+                page = _get(fetched, convert_stats)
+                if isinstance(page, _Done):
+                    _put(converted, page, stop, convert_stats)
+                    return
+                started = time.perf_counter()
+                try:
+                    rows = convert(page)
+                except BaseException as e:
+                    stop.set()
+                    _put(converted, _Done(e), threading.Event(), convert_stats)
+                    return
+                convert_stats.busy += time.perf_counter() - started
+                convert_stats.batches += 1
+                convert_stats.rows += len(rows)
+                _put(converted, rows, stop, convert_stats)
+        except _Stopped:
+            return
+
+    threads = [
+        threading.Thread(target=fetch, name="sync-fetch", daemon=True),
+        threading.Thread(target=convert_pages, name="sync-convert", daemon=True),
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            rows = _get(converted, write_stats)
+            if isinstance(rows, _Done):
+                if rows.error is not None:
+                    raise rows.error
+                break
+            write_started = time.perf_counter()
+            write(rows)
+            write_stats.busy += time.perf_counter() - write_started
+            write_stats.batches += 1
+            write_stats.rows += len(rows)
+    finally:
+        stop.set()
+        # Unblock a convert stage waiting on the fetch queue so it can exit
+        while threads[1].is_alive():
+            try:
+                converted.get(timeout=0.1)
+            except queue.Empty:
+                pass
+            try:
+                fetched.put_nowait(_Done())
+            except queue.Full:
+                pass
+        threads[0].join()
+        stats.elapsed = time.perf_counter() - started
+    return stats
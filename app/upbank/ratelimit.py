@@ -0,0 +1,118 @@
+"""
+Process-wide rate limiting for UP Bank API requests
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Mapping, Optional
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "PATCH", "DELETE"}
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every client in the process
+
+    Callers ``reserve()`` a token before each request and sleep for the
+    returned delay, which paces requests ahead of time instead of waiting
+    for the API to reject them. Throttling hints from responses shrink the
+    bucket or pause it entirely.
+
+    Args:
+        rate (float): Tokens added per second
+        burst (int): Maximum number of tokens the bucket can hold
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 20,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds to wait before using it"""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now, 0.0)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for at least ``seconds``"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+
+    def observe(self, headers: Optional[Mapping[str, str]]) -> None:
+        """Align the bucket with the server's remaining quota, if reported"""
+        remaining = _int_header(headers, "X-RateLimit-Remaining")
+        if remaining is None:
+            return
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens = min(self._tokens, float(remaining))
+
+def _int_header(headers: Optional[Mapping[str, str]], name: str) -> Optional[int]:
+    value = headers.get(name) if headers else None
+    if not isinstance(value, str):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+def parse_retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Read a Retry-After header given either as seconds or an HTTP date"""
+    value = headers.get("Retry-After") if headers else None
+    if not isinstance(value, str):
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def backoff_delay(
+    attempt: int,
+    retry_after: Optional[float] = None,
+    base: float = 0.5,
+    cap: float = 30.0,
+) -> float:
+    """Full-jitter exponential backoff, never shorter than Retry-After"""
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+def should_retry(method: str, status_code: int) -> bool:
+    """429s are always safe to retry; 5xx only for idempotent methods"""
+    if status_code == 429:
+        return True
+    return status_code in RETRY_STATUS_CODES and method.upper() in IDEMPOTENT_METHODS
+
+_shared_limiter = RateLimiter()
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the limiter shared by all clients in this process"""
+    return _shared_limiter
@@ -0,0 +1,205 @@
+"""
+Daily and monthly spend rollups kept up to date by SQLite triggers
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Rollup grains and the length of the created_at prefix that names their
+# period: the calendar day or month in the offset UP reported, so a purchase
+# at 11pm in Sydney lands on that Sydney day rather than the UTC one. This is
+# deliberately not the UTC basis of the *_at_us columns that query_transactions
+# and search_transactions filter on; a UTC month would split a local one.
+GRAINS: Dict[str, int] = {"day": 10, "month": 7}
+
+MEASURES = ("debit_base_units", "credit_base_units", "transaction_count")
+
+SUMMARY_GROUPS = ("account", "category", "parent_category", "tag")
+
+# Changes to any other transaction column leave the rollups untouched
+ROLLUP_SOURCE_COLUMNS = ("account_id", "status", "amount_value_in_base_units", "created_at", "category_id")
+
+def _upsert_delta(table: str, key_column: str, key: str, row: str, sign: int, source: str) -> List[str]:
+    """Add (sign=1) or remove (sign=-1) one transaction's amount in every grain"""
+    amount = f"{row}.amount_value_in_base_units"
+    columns = ("grain", "period", "account_id", key_column, "status") + MEASURES
+    conflict = ("grain", "period", "account_id", key_column, "status")
+    return [
+        f"""
+        INSERT INTO {table} ({", ".join(columns)})
+        SELECT '{grain}', substr({row}.created_at, 1, {width}), {row}.account_id, {key}, {row}.status,
+            {sign} * MIN({amount}, 0), {sign} * MAX({amount}, 0), {sign}
+        {source}
+        ON CONFLICT ({", ".join(conflict)}) DO UPDATE SET
+            {", ".join(f"{measure} = {measure} + excluded.{measure}" for measure in MEASURES)}
+        """
+        for grain, width in GRAINS.items()
+    ]
+
+def _prune(table: str, created_at: str, account_id: str) -> List[str]:
+    """Drop the buckets a removal emptied (e.g. HELD ones after a transaction settles)"""
+    return [
+        f"""
+        DELETE FROM {table}
+        WHERE grain = '{grain}' AND period = substr({created_at}, 1, {width})
+            AND account_id = {account_id} AND transaction_count = 0
+        """
+        for grain, width in GRAINS.items()
+    ]
+
+def _spend_delta(row: str, sign: int) -> List[str]:
+    return _upsert_delta(
+        "spend_rollups", "category_id", f"COALESCE({row}.category_id, '')", row, sign, "WHERE true"
+    )
+
+def _tags_delta(row: str, sign: int) -> List[str]:
+    """Apply a transaction row to the rollup of every tag it currently has"""
+    return _upsert_delta(
+        "tag_spend_rollups", "tag_id", "tt.tag_id", row, sign,
+        f"FROM transaction_tags AS tt WHERE tt.transaction_id = {row}.id"
+    )
+
+def _tag_link_delta(link: str, sign: int) -> List[str]:
+    """Apply one tag link's transaction to that tag's rollup"""
+    return _upsert_delta(
+        "tag_spend_rollups", "tag_id", f"{link}.tag_id", "t", sign,
+        f"FROM transactions AS t WHERE t.id = {link}.transaction_id"
+    )
+
+def _trigger(name: str, event: str, statements: List[str], when: str = "") -> str:
+    body = ";\n".join(statement.strip() for statement in statements)
+    return f"CREATE TRIGGER IF NOT EXISTS {name} {event}{when} BEGIN\n{body};\nEND"
+
+ROLLUP_TABLES = tuple(
+    f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+        grain TEXT NOT NULL,
+        period TEXT NOT NULL,
+        account_id TEXT NOT NULL,
+        {key_column} TEXT NOT NULL,
+        status TEXT NOT NULL,
+        debit_base_units INTEGER NOT NULL,
+        credit_base_units INTEGER NOT NULL,
+        transaction_count INTEGER NOT NULL,
+        PRIMARY KEY (grain, period, account_id, {key_column}, status)
+    ) WITHOUT ROWID
+    """
+    # Uncategorised transactions are rolled up under category_id ''
+    for table, key_column in (("spend_rollups", "category_id"), ("tag_spend_rollups", "tag_id"))
+)
+
+ROLLUP_TRIGGERS = (
+    _trigger(
+        "transactions_rollup_insert", "AFTER INSERT ON transactions",
+        _spend_delta("NEW", 1) + _tags_delta("NEW", 1),
+    ),
+    _trigger(
+        "transactions_rollup_update",
+        f"AFTER UPDATE OF {', '.join(ROLLUP_SOURCE_COLUMNS)} ON transactions",
+        _spend_delta("OLD", -1) + _tags_delta("OLD", -1)
+        + _spend_delta("NEW", 1) + _tags_delta("NEW", 1)
+        + _prune("spend_rollups", "OLD.created_at", "OLD.account_id")
+        + _prune("tag_spend_rollups", "OLD.created_at", "OLD.account_id"),
+        when=" WHEN " + " OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in ROLLUP_SOURCE_COLUMNS),
+    ),
+    _trigger(
+        "transactions_rollup_delete", "AFTER DELETE ON transactions",
+        _spend_delta("OLD", -1) + _tags_delta("OLD", -1)
+        + _prune("spend_rollups", "OLD.created_at", "OLD.account_id")
+        + _prune("tag_spend_rollups", "OLD.created_at", "OLD.account_id"),
+    ),
+    _trigger(
+        "transaction_tags_rollup_insert", "AFTER INSERT ON transaction_tags",
+        _tag_link_delta("NEW", 1),
+    ),
+    _trigger(
+        "transaction_tags_rollup_delete", "AFTER DELETE ON transaction_tags",
+        _tag_link_delta("OLD", -1) + _prune(
+            "tag_spend_rollups",
+            "(SELECT created_at FROM transactions WHERE id = OLD.transaction_id)",
+            "(SELECT account_id FROM transactions WHERE id = OLD.transaction_id)",
+        ),
+    ),
+)
+
+def _rebuild(table: str, key_column: str, key: str, source: str) -> List[str]:
+    columns = ("grain", "period", "account_id", key_column, "status") + MEASURES
+    return [
+        f"""
+        INSERT INTO {table} ({", ".join(columns)})
+        SELECT '{grain}', substr(t.created_at, 1, {width}), t.account_id, {key}, t.status,
+            SUM(MIN(t.amount_value_in_base_units, 0)), SUM(MAX(t.amount_value_in_base_units, 0)), COUNT(*)
+        {source}
+        GROUP BY 2, 3, 4, 5
+        """
+        for grain, width in GRAINS.items()
+    ]
+
+# Recompute both rollup tables from scratch, for repair or first population
+REBUILD_ROLLUPS = (
+    "DELETE FROM spend_rollups",
+    "DELETE FROM tag_spend_rollups",
+    *_rebuild("spend_rollups", "category_id", "COALESCE(t.category_id, '')", "FROM transactions AS t"),
+    *_rebuild(
+        "tag_spend_rollups", "tag_id", "tt.tag_id",
+        "FROM transactions AS t JOIN transaction_tags AS tt ON tt.transaction_id = t.id",
+    ),
+)
+
+def rollup_script(*statements: str) -> str:
+    """Join statements into one script for ``executescript``"""
+    return "".join(f"{statement.strip()};\n" for statement in statements)
+
+def _period(value: Union[date, str], width: int) -> str:
+    return (value.isoformat() if isinstance(value, date) else value)[:width]
+
+def spend_summary_sql(
+    grain: str = "month",
+    by: Optional[str] = None,
+    since: Optional[Union[date, str]] = None,
+    until: Optional[Union[date, str]] = None,
+    account: Optional[str] = None,
+    status: Optional[str] = None,
+) -> Tuple[str, List[Any]]:
+    """Build the SELECT behind ``UpDatabase.spend_summary``"""
+    if grain not in GRAINS:
+        raise ValueError(f"grain must be one of {sorted(GRAINS)}")
+    if by is not None and by not in SUMMARY_GROUPS:
+        raise ValueError(f"by must be one of {SUMMARY_GROUPS}")
+    width = GRAINS[grain]
+    table = "tag_spend_rollups" if by == "tag" else "spend_rollups"
+    key = {
+        None: "NULL",
+        "account": "r.account_id",
+        "category": "NULLIF(r.category_id, '')",
+        "parent_category": "COALESCE(c.parent_id, NULLIF(r.category_id, ''))",
+        "tag": "r.tag_id",
+    }[by]
+    join = "LEFT JOIN categories AS c ON c.id = r.category_id" if by == "parent_category" else ""
+
+    where = ["r.grain = ?"]
+    params: List[Any] = [grain]
+    if since is not None:
+        where.append("r.period >= ?")
+        params.append(_period(since, width))
+    if until is not None:
+        where.append("r.period < ?")
+        params.append(_period(until, width))
+    for column, value in (("account_id", account), ("status", status)):
+        if value is not None:
+            where.append(f"r.{column} = ?")
+            params.append(value)
+
+    sql = f"""
+        SELECT r.period, {key} AS key,
+            SUM(r.debit_base_units) AS debit_base_units,
+            SUM(r.credit_base_units) AS credit_base_units,
+            SUM(r.transaction_count) AS transaction_count
+        FROM {table} AS r
+        {join}
+        WHERE {" AND ".join(where)}
+        GROUP BY r.period, key
+        HAVING SUM(r.transaction_count) > 0
+        ORDER BY r.period, key
+    """
+    return sql, params
@@ -2,17 +2,32 @@
 Sync data from UP Bank API to local SQLite database or CSV files
 """
 
+import argparse
+import json
 import os
-from datetime import datetime, timedelta
-from typing import Optional, Protocol, Dict, Any, List
-from upbank.client import UpClient
-from upbank.database import UpDatabase
+import queue
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import IO, Callable, Iterable, Iterator, Optional, Protocol, Dict, Any, List, Set, Tuple
+from upbank.client import UpClient, next_page_cursor
+from upbank.database import DEFAULT_BATCH_SIZE, UpDatabase, UpsertCounts
+from upbank.metrics import MetricsRegistry, get_metrics_registry
+from upbank.models.account import AccountList
+from upbank.models.category import CategoryList
+from upbank.models.records import TransactionRecord
+from upbank.models.webhook import Webhook, WebhookLogList
+from upbank.pipeline import DEFAULT_DEPTH, PipelineStats, run_pipeline
 import dotenv
 import csv
 
 dotenv.load_dotenv()
 
 DEV_MODE = os.getenv('UPBANK_DEV_MODE', '').lower() in ('true', '1', 'yes')
+DB_PROFILE = os.getenv('UPBANK_DB_PROFILE', 'wal')
+DEFAULT_OVERLAP = timedelta(days=7)
 if DEV_MODE:
     print("Running in development mode - data retrieval will be limited")
 
@@ -38,38 +53,171 @@ class DataHandler(Protocol):
         """Insert webhook log data"""
         ...
 
+    def flush(self, tables: Optional[Iterable[str]] = None) -> Optional[Dict[str, UpsertCounts]]:
+        """Write out what the handler has buffered for ``tables`` (default all), returning per-table counts if tracked"""
+        ...
+
+    def get_high_water_mark(self, account_id: str) -> Optional[datetime]:
+        """Newest transaction created_at stored for an account, if tracked"""
+        ...
+
+    def set_high_water_mark(self, account_id: str, value: datetime) -> None:
+        """Record the newest transaction created_at stored for an account"""
+        ...
+
+    def mark_synced(self, resource: str, synced_at: datetime) -> None:
+        """Record that a resource was synced in full as of synced_at, if tracked"""
+        ...
+
+    def get_checkpoints(self, resource: str) -> List[Dict[str, Any]]:
+        """Checkpoints saved by an interrupted sync of a resource, if tracked"""
+        ...
+
+    def save_checkpoint(self, resource: str, checkpoint: Dict[str, Any]) -> None:
+        """Save a checkpoint once everything inserted before it is committed, if tracked"""
+        ...
+
+    def clear_checkpoints(self, resource: str) -> None:
+        """Forget a resource's checkpoints, if tracked"""
+        ...
+
+FLUSH_TABLES = ("accounts", "categories", "transactions", "webhooks", "webhook_logs")
+
 class DatabaseHandler:
-    """Handler for database output"""
-    def __init__(self, db_path: str):
-        self.db = UpDatabase(db_path)
+    """Handler for database output
+
+    Rows are buffered per table and written with ``executemany`` in one
+    transaction per ``batch_size`` rows. Call ``flush()`` (or ``close()``)
+    to write whatever is still buffered. The storage profile defaults to
+    ``UPBANK_DB_PROFILE`` ("wal" unless set), so readers such as the API
+    are not locked out while a sync runs.
+    """
+    def __init__(self, db_path: str, batch_size: int = DEFAULT_BATCH_SIZE, profile: str = DB_PROFILE):
+        self.db = UpDatabase(db_path, profile=profile)
+        self.batch_size = batch_size
+        self._accounts: List[Dict[str, Any]] = []
+        self._categories: List[Dict[str, Any]] = []
+        self._transactions: List[Dict[str, Any]] = []
+        self._webhook_logs: Dict[str, List[Dict[str, Any]]] = {}
+        self._counts: Dict[str, UpsertCounts] = {}
+        # Transaction checkpoints by scope, saved once the rows before them are committed
+        self._checkpoints: Dict[str, Dict[str, Any]] = {}
     
     def insert_account(self, data: Dict[str, Any]) -> None:
-        self.db.insert_account(data)
+        self._accounts.append(data)
+        if len(self._accounts) >= self.batch_size:
+            self._flush_accounts()
     
     def insert_category(self, data: Dict[str, Any]) -> None:
-        self.db.insert_category(data)
+        self._categories.append(data)
+        if len(self._categories) >= self.batch_size:
+            self._flush_categories()
     
     def insert_transaction(self, data: Dict[str, Any]) -> None:
-        self.db.insert_transaction(data)
+        self._transactions.append(data)
+        if len(self._transactions) >= self.batch_size:
+            self._flush_transactions()
     
     def insert_webhook(self, data: Dict[str, Any]) -> None:
         self.db.insert_webhook(data)
     
     def insert_webhook_log(self, webhook_id: str, data: Dict[str, Any]) -> None:
-        self.db.insert_webhook_log(webhook_id, data)
+        logs = self._webhook_logs.setdefault(webhook_id, [])
+        logs.append(data)
+        if len(logs) >= self.batch_size:
+            self._flush_webhook_logs(webhook_id)
+
+    def _count(self, table: str, counts: UpsertCounts) -> None:
+        self._counts.setdefault(table, UpsertCounts())
+        self._counts[table] += counts
+
+    def _flush_accounts(self) -> None:
+        self._count("accounts", self.db.insert_accounts(self._accounts, self.batch_size))
+        self._accounts = []
+
+    def _flush_categories(self) -> None:
+        self._count("categories", self.db.insert_categories(self._categories, self.batch_size))
+        self._categories = []
+
+    def _flush_transactions(self) -> None:
+        self._count("transactions", self.db.insert_transactions(self._transactions, self.batch_size))
+        self._transactions = []
+        if self._checkpoints:
+            self.db.save_checkpoints("transactions", self._checkpoints.values())
+            self._checkpoints = {}
+
+    def _flush_webhook_logs(self, webhook_id: str) -> None:
+        logs = self._webhook_logs.pop(webhook_id)
+        self._count("webhook_logs", self.db.insert_webhook_logs(webhook_id, logs, self.batch_size))
+
+    def flush(self, tables: Optional[Iterable[str]] = None) -> Dict[str, UpsertCounts]:
+        """Write buffered rows to the database
+
+        Args:
+            tables: Only flush these tables, leaving the rest buffered. Defaults to all
+
+        Returns:
+            Inserted/updated/unchanged counts per flushed table for
+            everything written to it since it was last flushed
+        """
+        tables = set(tables) if tables is not None else set(FLUSH_TABLES)
+        if "accounts" in tables:
+            self._flush_accounts()
+        if "categories" in tables:
+            self._flush_categories()
+        if "transactions" in tables:
+            self._flush_transactions()
+        if "webhook_logs" in tables:
+            for webhook_id in list(self._webhook_logs):
+                self._flush_webhook_logs(webhook_id)
+        return {table: self._counts.pop(table) for table in tables if table in self._counts}
+
+    def get_high_water_mark(self, account_id: str) -> Optional[datetime]:
+        return self.db.get_high_water_mark("transactions", account_id)
+
+    def set_high_water_mark(self, account_id: str, value: datetime) -> None:
+        self.db.set_high_water_mark("transactions", account_id, value)
+
+    def mark_synced(self, resource: str, synced_at: datetime) -> None:
+        self.db.mark_synced(resource, synced_at)
+
+    def get_checkpoints(self, resource: str) -> List[Dict[str, Any]]:
+        return self.db.get_checkpoints(resource)
+
+    def save_checkpoint(self, resource: str, checkpoint: Dict[str, Any]) -> None:
+        # Only transactions are buffered in bulk; anything else is already committed
+        if resource == "transactions":
+            self._checkpoints[checkpoint["scope"]] = checkpoint
+        else:
+            self.db.save_checkpoints(resource, [checkpoint])
+
+    def clear_checkpoints(self, resource: str) -> None:
+        if resource == "transactions":
+            self._checkpoints = {}
+        self.db.clear_checkpoints(resource)
+
+    def close(self) -> None:
+        """Flush buffered rows and close the database"""
+        self.flush()
+        self.db.close()
 
 class CsvHandler:
-    """Handler for CSV output"""
+    """Handler for CSV output
+
+    Rows are flattened once as they arrive and spilled to a temporary
+    JSON-lines file per table, while the union of their columns is
+    collected. ``flush`` streams each spill into its CSV under the final
+    header, so memory stays constant however many rows are exported. Spills
+    live in ``output_dir`` rather than the system temp directory, which may
+    be memory-backed.
+    """
+    TABLES = ('accounts', 'categories', 'transactions', 'webhooks', 'webhook_logs')
+
     def __init__(self, output_dir: str):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
-        self._data: Dict[str, List[Dict[str, Any]]] = {
-            'accounts': [],
-            'categories': [],
-            'transactions': [],
-            'webhooks': [],
-            'webhook_logs': []
-        }
+        self._spills: Dict[str, IO[str]] = {}
+        self._headers: Dict[str, Set[str]] = {}
     
     @staticmethod
     def flatten_dict(d: dict, parent_key: str = '') -> dict:
@@ -88,162 +236,435 @@ class CsvHandler:
             else:
                 items.append((new_key, v))
         return dict(items)
+
+    def _spill(self, table: str, data: Dict[str, Any]) -> None:
+        row = self.flatten_dict(data)
+        spill = self._spills.get(table)
+        if spill is None:
+            spill = self._spills[table] = tempfile.TemporaryFile(
+                'w+', newline='', dir=self.output_dir, prefix=f".{table}-", suffix='.jsonl'
+            )
+            self._headers[table] = set()
+        self._headers[table].update(row)
+        # Values json can't encode (datetimes, decimals) are stored as the str() csv would write
+        spill.write(json.dumps(row, default=str))
+        spill.write('\n')
     
-    def _write_csv(self, data_list: List[Dict[str, Any]], filename: str, extra_fields: Dict[str, Any] = None) -> None:
-        if not data_list:
-            return
-            
+    def _write_csv(self, spill: IO[str], headers: Iterable[str], filename: str) -> None:
         filepath = os.path.join(self.output_dir, filename)
-        
-        all_headers = set()
-        for item in data_list:
-            flattened = self.flatten_dict(item)
-            all_headers.update(flattened.keys())
-        
-        if extra_fields:
-            all_headers.update(extra_fields.keys())
-        
-        headers = sorted(all_headers)
-            
+        spill.seek(0)
         with open(filepath, 'w', newline='') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=headers, extrasaction='ignore')
+            writer = csv.DictWriter(csvfile, fieldnames=sorted(headers))
             writer.writeheader()
-            
-            for item in data_list:
-                row = self.flatten_dict(item)
-                if extra_fields:
-                    row = {**extra_fields, **row}
-                for header in headers:
-                    if header not in row:
-                        row[header] = None
-                writer.writerow(row)
+            for line in spill:
+                writer.writerow(json.loads(line))
     
     def insert_account(self, data: Dict[str, Any]) -> None:
-        self._data['accounts'].append(data)
+        self._spill('accounts', data)
     
     def insert_category(self, data: Dict[str, Any]) -> None:
-        self._data['categories'].append(data)
+        self._spill('categories', data)
     
     def insert_transaction(self, data: Dict[str, Any]) -> None:
-        self._data['transactions'].append(data)
+        self._spill('transactions', data)
     
     def insert_webhook(self, data: Dict[str, Any]) -> None:
-        self._data['webhooks'].append(data)
+        self._spill('webhooks', data)
     
     def insert_webhook_log(self, webhook_id: str, data: Dict[str, Any]) -> None:
         data['webhook_id'] = webhook_id  # Add webhook_id to the data
-        self._data['webhook_logs'].append(data)
+        self._spill('webhook_logs', data)
+
+    def get_high_water_mark(self, account_id: str) -> Optional[datetime]:
+        # Each CSV export is a full snapshot, so there is nothing to resume from
+        return None
+
+    def set_high_water_mark(self, account_id: str, value: datetime) -> None:
+        pass
+
+    def mark_synced(self, resource: str, synced_at: datetime) -> None:
+        pass
+
+    def get_checkpoints(self, resource: str) -> List[Dict[str, Any]]:
+        # CSV files are only written when the export finishes, so there is nothing to resume
+        return []
+
+    def save_checkpoint(self, resource: str, checkpoint: Dict[str, Any]) -> None:
+        pass
+
+    def clear_checkpoints(self, resource: str) -> None:
+        pass
         
-    def flush(self) -> None:
-        """Write all collected data to CSV files"""
-        for data_type, items in self._data.items():
-            if items:
-                self._write_csv(items, f"{data_type}.csv")
-        self._data = {k: [] for k in self._data}
+    def flush(self, tables: Optional[Iterable[str]] = None) -> None:
+        """Write collected data to CSV files, for ``tables`` only if given"""
+        for data_type in (tables if tables is not None else self.TABLES):
+            spill = self._spills.pop(data_type, None)
+            if spill is None:
+                continue
+            with spill:
+                self._write_csv(spill, self._headers.pop(data_type), f"{data_type}.csv")
+
+class TransactionCheckpoints:
+    """Resumable progress through the cursor chains of one transaction sync
+
+    Each chain (the whole history, one backfill window or one account) is a
+    scope. After every page is written its scope's next ``page[after]``
+    cursor and row count are handed to the handler, which saves them once
+    those rows are committed. A run with ``resume`` and the same parameters
+    starts each chain from its saved cursor and skips finished ones.
+    """
+
+    resource = "transactions"
+
+    def __init__(self, handler: DataHandler, params: Dict[str, Any], resume: bool = False):
+        self.handler = handler
+        self.params = json.dumps(params, sort_keys=True, default=str)
+        self.scopes: Dict[str, Dict[str, Any]] = {}
+        # (scope, next cursor) of each fetched page, oldest first; the writer
+        # sees pages in the order they were fetched
+        self._fetched: deque = deque()
+
+        saved = handler.get_checkpoints(self.resource) if resume else []
+        if saved and all(checkpoint["params"] == self.params for checkpoint in saved):
+            self.scopes = {checkpoint["scope"]: checkpoint for checkpoint in saved}
+            print(f"Resuming from checkpoint ({sum(c['rows'] for c in saved)} transactions already stored)")
+        else:
+            if saved:
+                print("Saved checkpoint is for a sync with different options - starting over")
+            elif resume:
+                print("No checkpoint to resume from - starting from the beginning")
+            handler.clear_checkpoints(self.resource)
+        self.resumed = bool(self.scopes)
+
+    def scope(
+        self,
+        scope: str,
+        window_since: Optional[datetime] = None,
+        window_until: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """Return a scope's progress, starting (and saving) it if this run hasn't seen it"""
+        if scope not in self.scopes:
+            self.scopes[scope] = {
+                "scope": scope,
+                "params": self.params,
+                "window_since": window_since.isoformat() if window_since else None,
+                "window_until": window_until.isoformat() if window_until else None,
+                "cursor": None,
+                "done": 0,
+                "rows": 0,
+            }
+            self.handler.save_checkpoint(self.resource, dict(self.scopes[scope]))
+        return self.scopes[scope]
+
+    def track(self, scope: str, pages: Iterable[Any]) -> Iterator[Any]:
+        """Pass through one chain's pages, noting where each leaves off"""
+        for page in pages:
+            self._fetched.append((scope, next_page_cursor({"links": {"next": page.links.next}})))
+            yield page
+
+    def track_windows(self, scopes: List[str], pages: Iterable[Tuple[int, Any]]) -> Iterator[Any]:
+        """Pass through ``(window index, page)`` pairs from several chains as pages"""
+        for index, page in pages:
+            self._fetched.append((scopes[index], next_page_cursor({"links": {"next": page.links.next}})))
+            yield page
+
+    def written(self, rows: int) -> None:
+        """Advance the scope of the oldest fetched page, once its rows are handed to the handler"""
+        scope, cursor = self._fetched.popleft()
+        state = self.scopes[scope]
+        state.update(cursor=cursor, done=int(cursor is None), rows=state["rows"] + rows)
+        self.handler.save_checkpoint(self.resource, dict(state))
+
+    def finish(self) -> None:
+        """Forget the checkpoints once the sync has completed"""
+        self.handler.clear_checkpoints(self.resource)
+
+def change_summary(counts: Optional[Dict[str, UpsertCounts]], table: str) -> str:
+    """Describe what a flush changed in a table, e.g. " (3 new, 1 updated, 96 unchanged)" """
+    table_counts = (counts or {}).get(table)
+    return f" ({table_counts})" if table_counts else ""
 
 class UpBankSync:
-    def __init__(self, api_key: str, handler: DataHandler):
+    def __init__(
+        self,
+        api_key: str,
+        handler: DataHandler,
+        trusted: bool = False,
+        metrics: Optional[MetricsRegistry] = None,
+        pipeline_depth: int = DEFAULT_DEPTH,
+    ):
         """
         Initialize sync with UP Bank API key and data handler
         
         Args:
             api_key: UP Bank API key
             handler: Handler for data output (database or CSV)
+            trusted: Read transactions as unvalidated TransactionRecord objects (faster bulk sync)
+            metrics: Registry to record per-endpoint request metrics in
+            pipeline_depth: Pages queued between the fetch, convert and write stages
         """
-        self.client = UpClient(api_key)
+        self.client = UpClient(api_key, metrics=metrics)
         self.handler = handler
         self.dev_mode = DEV_MODE
+        self.trusted = trusted
+        self.pipeline_depth = pipeline_depth
+        self.pipeline_stats = PipelineStats()
+        # Called by the transaction writer after each page (see sync_all's concurrent mode)
+        self._between_pages: Optional[Callable[[], None]] = None
 
     def sync_accounts(self) -> None:
         """Sync all accounts from UP Bank"""
         print("Syncing accounts...")
-        accounts = self.client.list_accounts()
+        started = datetime.now(timezone.utc)
+        self._store_accounts(self.client.list_accounts(), started)
+
+    def _store_accounts(self, accounts: AccountList, started: datetime) -> None:
         for account in accounts.data:
             self.handler.insert_account(account.model_dump())
-        print(f"Synced {len(accounts.data)} accounts")
+        counts = self.handler.flush(["accounts"])
+        self.handler.mark_synced("accounts", started)
+        print(f"Synced {len(accounts.data)} accounts" + change_summary(counts, "accounts"))
 
     def sync_categories(self) -> None:
         """Sync all categories from UP Bank"""
         print("Syncing categories...")
-        categories = self.client.list_categories()
+        started = datetime.now(timezone.utc)
+        self._store_categories(self.client.list_categories(), started)
+
+    def _store_categories(self, categories: CategoryList, started: datetime) -> None:
         for category in categories.data:
             self.handler.insert_category(category.model_dump())
-        print(f"Synced {len(categories.data)} categories")
+        counts = self.handler.flush(["categories"])
+        self.handler.mark_synced("categories", started)
+        print(f"Synced {len(categories.data)} categories" + change_summary(counts, "categories"))
 
     def sync_transactions(
         self, 
         since: Optional[datetime] = None,
         until: Optional[datetime] = None,
-        status: Optional[str] = None
-    ) -> None:
+        status: Optional[str] = None,
+        backfill: bool = False,
+        incremental: bool = False,
+        overlap: timedelta = DEFAULT_OVERLAP,
+        resume: bool = False
+    ) -> UpsertCounts:
         """
         Sync transactions from UP Bank
         
+        Progress is checkpointed after every committed batch, so an
+        interrupted run repeated with the same options and ``resume=True``
+        picks up where it stopped instead of starting over.
+
         Args:
             since: Only get transactions since this date
             until: Only get transactions until this date
             status: Filter by transaction status (HELD or SETTLED)
+            backfill: Fetch the range as parallel date windows instead of one cursor chain
+            incremental: Fetch each account only from its stored high-water mark minus
+                ``overlap`` (ignored when ``since`` is given)
+            overlap: How far before the high-water mark to re-fetch, so HELD
+                transactions that have since settled are picked up
+            resume: Continue from the checkpoint of an interrupted run with the same options
+
+        Returns:
+            How many transactions were inserted, updated or left unchanged
+            (all zero for handlers that don't track it)
         """
+        self.pipeline_stats = PipelineStats()
+        # Commit whatever an interrupted run in this process left buffered, so
+        # its checkpoint is current and this run's counts are its own
+        self.handler.flush(["transactions"])
+        if incremental and since is None:
+            changes = self._sync_transactions_incremental(until, status, overlap, resume)
+            self._print_pipeline_stats()
+            return changes
+
         print("Syncing transactions..." + (" (dev mode - limited to 1 page)" if self.dev_mode else ""))
-        
-        # Format dates for API
-        since_str = since.isoformat() if since else None
-        until_str = until.isoformat() if until else None
-        
-        transactions = self.client.list_transactions(
-            since=since_str,
-            until=until_str,
-            status=status
+        started = datetime.now(timezone.utc)
+        backfill = backfill and not self.dev_mode
+        checkpoints = TransactionCheckpoints(
+            self.handler, {"since": since, "until": until, "status": status, "backfill": backfill}, resume
         )
         
-        count = 0
-        while True:
-            for transaction in transactions.data:
-                self.handler.insert_transaction(transaction.model_dump())
-                count += 1
-            
-            # Get next page if available and not in dev mode
-            if transactions.links.next and not self.dev_mode:
-                transactions = self.client.get_transactions(
-                    since=since_str,
-                    until=until_str,
-                    status=status
+        if backfill:
+            if not checkpoints.resumed:
+                for window_since, window_until in self.client.backfill_windows(since=since, until=until):
+                    checkpoints.scope(
+                        f"{window_since.isoformat()}/{window_until.isoformat()}", window_since, window_until
+                    )
+            remaining = [state for state in checkpoints.scopes.values() if not state["done"]]
+            pages = checkpoints.track_windows(
+                [state["scope"] for state in remaining],
+                self.client.iter_window_pages(
+                    [
+                        (datetime.fromisoformat(state["window_since"]), datetime.fromisoformat(state["window_until"]))
+                        for state in remaining
+                    ],
+                    cursors=[state["cursor"] for state in remaining],
+                    status=status,
+                    raw=self.trusted
                 )
-            else:
-                break
+            )
+        else:
+            state = checkpoints.scope("all", since, until)
+            pages = checkpoints.track("all", [] if state["done"] else self.client.iter_transaction_pages(
+                since=since,
+                until=until,
+                status=status,
+                raw=self.trusted,
+                after=state["cursor"]
+            ))
         
-        print(f"Synced {count} transactions")
+        count, _ = self._insert_transaction_pages(pages, checkpoints)
+        counts = self.handler.flush(["transactions"])
+        checkpoints.finish()
+        # A resumed run fetched its early pages before this one started, so it can't vouch for them
+        if since is None and until is None and status is None and not self.dev_mode and not checkpoints.resumed:
+            self.handler.mark_synced("transactions", started)
+        print(f"Synced {count} transactions" + change_summary(counts, "transactions"))
+        self._print_pipeline_stats()
+        return (counts or {}).get("transactions", UpsertCounts())
+
+    def _sync_transactions_incremental(
+        self,
+        until: Optional[datetime],
+        status: Optional[str],
+        overlap: timedelta,
+        resume: bool = False
+    ) -> UpsertCounts:
+        """Fetch each account's transactions from its high-water mark and advance the mark"""
+        print("Syncing transactions incrementally..." + (" (dev mode - limited to 1 page)" if self.dev_mode else ""))
+        # A filtered run doesn't see everything newer than the mark, so it can't advance it
+        advance = until is None and status is None and not self.dev_mode
+        started = datetime.now(timezone.utc)
+        checkpoints = TransactionCheckpoints(
+            self.handler, {"incremental": True, "until": until, "status": status, "overlap": overlap}, resume
+        )
+
+        total = 0
+        changes = UpsertCounts()
+        for account in self.client.list_accounts().data:
+            scope = f"account:{account.id}"
+            if scope in checkpoints.scopes:
+                # Resuming: keep the window the interrupted run chose, before its mark moved
+                state = checkpoints.scopes[scope]
+                since = datetime.fromisoformat(state["window_since"]) if state["window_since"] else None
+            else:
+                mark = self.handler.get_high_water_mark(account.id)
+                since = mark - overlap if mark else None
+                state = checkpoints.scope(scope, since, until)
+            if state["done"]:
+                print(f"  {account.attributes.display_name}: already synced before the interruption")
+                continue
+            pages = checkpoints.track(scope, self.client.iter_transaction_pages(
+                since=since,
+                until=until,
+                status=status,
+                raw=self.trusted,
+                account_id=account.id,
+                after=state["cursor"]
+            ))
+            count, newest = self._insert_transaction_pages(pages, checkpoints)
+            counts = self.handler.flush(["transactions"])
+            if counts and "transactions" in counts:
+                changes += counts["transactions"]
+            if advance and newest is not None:
+                self.handler.set_high_water_mark(account.id, newest)
+            total += count
+            print(f"  {account.attributes.display_name}: {count} transactions" +
+                  (f" since {since.isoformat()}" if since else " (full history)") +
+                  change_summary(counts, "transactions"))
+
+        checkpoints.finish()
+        if advance and not checkpoints.resumed:
+            self.handler.mark_synced("transactions", started)
+        print(f"Synced {total} transactions" + (f" ({changes})" if changes.total else ""))
+        return changes
+
+    def _insert_transaction_pages(
+        self, pages, checkpoints: Optional[TransactionCheckpoints] = None
+    ) -> Tuple[int, Optional[datetime]]:
+        """Stream every transaction to the handler, returning the count and newest created_at
+
+        Fetching, dumping to rows and writing run as separate pipeline
+        stages, so the next page downloads while the last one is written.
+        Stage throughput accumulates in ``pipeline_stats``. Pages must come
+        through ``checkpoints`` (if given) so each written page advances it.
+        """
+        if self.dev_mode:
+            pages = islice(pages, 1)
+        newest = None
+
+        def convert(page) -> List[Dict[str, Any]]:
+            nonlocal newest
+            for transaction in page.data:
+                created_at = transaction.created_at if isinstance(transaction, TransactionRecord) \
+                    else transaction.attributes.created_at
+                if isinstance(created_at, str):
+                    created_at = datetime.fromisoformat(created_at)
+                if newest is None or created_at > newest:
+                    newest = created_at
+            return [transaction.model_dump() for transaction in page.data]
+
+        def write(rows: List[Dict[str, Any]]) -> None:
+            for row in rows:
+                self.handler.insert_transaction(row)
+            if checkpoints:
+                checkpoints.written(len(rows))
+            if self._between_pages:
+                self._between_pages()
+
+        stats = run_pipeline(pages, convert, write, depth=self.pipeline_depth)
+        self.pipeline_stats += stats
+        return stats.rows, newest
+
+    def _print_pipeline_stats(self) -> None:
+        if self.pipeline_stats.rows:
+            print("Pipeline throughput:")
+            print("\n".join("  " + line for line in self.pipeline_stats.format().splitlines()))
+
+    def sync_webhooks(self, max_workers: int = 1) -> None:
+        """Sync all webhooks and their logs from UP Bank
 
-    def sync_webhooks(self) -> None:
-        """Sync all webhooks from UP Bank"""
+        Args:
+            max_workers: Number of webhooks whose logs are fetched at the same time
+        """
         print("Syncing webhooks...")
-        webhooks = self.client.list_webhooks()
-        
-        webhook_count = 0
+        self._store_webhooks(self._fetch_webhooks(max_workers))
+
+    def _fetch_webhooks(self, max_workers: int) -> List[Tuple[Webhook, WebhookLogList]]:
+        """Fetch every webhook and its logs, up to ``max_workers`` log lists at a time"""
+        webhooks = self.client.list_webhooks().data
+        if self.dev_mode:
+            webhooks = webhooks[:1]
+        if max_workers <= 1 or len(webhooks) <= 1:
+            return [(webhook, self.client.list_webhook_logs(webhook.id)) for webhook in webhooks]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            logs = executor.map(lambda webhook: self.client.list_webhook_logs(webhook.id), webhooks)
+            return list(zip(webhooks, logs))
+
+    def _store_webhooks(self, webhooks: List[Tuple[Webhook, WebhookLogList]]) -> None:
         log_count = 0
-        
-        for webhook in webhooks.data:
+        for webhook, logs in webhooks:
             self.handler.insert_webhook(webhook.model_dump())
-            webhook_count += 1
-            
-            logs = self.client.list_webhook_logs(webhook.id)
-            for log in logs.data:
+            for log in logs.data[:1] if self.dev_mode else logs.data:
                 self.handler.insert_webhook_log(webhook.id, log.model_dump())
                 log_count += 1
-                if self.dev_mode:
-                    break
-            
-            if self.dev_mode:
-                break
-        
-        print(f"Synced {webhook_count} webhooks with {log_count} logs" + 
+
+        counts = self.handler.flush(["webhooks", "webhook_logs"])
+        print(f"Synced {len(webhooks)} webhooks with {log_count} logs" + change_summary(counts, "webhook_logs") +
               (" (limited by dev mode)" if self.dev_mode else ""))
 
     def sync_all(
         self,
         transaction_since: Optional[datetime] = None,
         transaction_until: Optional[datetime] = None,
-        transaction_status: Optional[str] = None
+        transaction_status: Optional[str] = None,
+        transaction_backfill: bool = False,
+        transaction_incremental: bool = False,
+        transaction_resume: bool = False,
+        concurrent: bool = False,
+        max_workers: int = 4
     ) -> None:
         """
         Sync all data from UP Bank
@@ -252,42 +673,160 @@ class UpBankSync:
             transaction_since: Only get transactions since this date
             transaction_until: Only get transactions until this date
             transaction_status: Filter by transaction status (HELD or SETTLED)
+            transaction_backfill: Fetch transactions in parallel date windows
+            transaction_incremental: Fetch transactions from each account's high-water mark
+            transaction_resume: Continue an interrupted transaction sync from its checkpoint
+            concurrent: Fetch accounts, categories and webhooks (with their logs in
+                parallel) in the background while transactions sync, instead of
+                one resource after another
+            max_workers: Background fetch threads in concurrent mode
         """
-        self.sync_accounts()
-        self.sync_categories()
-        self.sync_transactions(
+        transactions = dict(
             since=transaction_since,
             until=transaction_until,
-            status=transaction_status
+            status=transaction_status,
+            backfill=transaction_backfill,
+            incremental=transaction_incremental,
+            resume=transaction_resume
         )
+        if concurrent:
+            self._sync_all_concurrent(transactions, max_workers)
+            return
+        self.sync_accounts()
+        self.sync_categories()
+        self.sync_transactions(**transactions)
         self.sync_webhooks()
-        
-        if isinstance(self.handler, CsvHandler):
-            self.handler.flush()
 
-def main():
-    """Main entry point for syncing data"""
+    def _sync_all_concurrent(self, transactions: Dict[str, Any], max_workers: int) -> None:
+        """Sync transactions while the small resources are fetched in the background
+
+        Requests go through the client's shared rate limiter. Only this
+        thread touches the handler: fetched resources are queued and stored
+        between transaction pages, so they don't wait for the whole history.
+        A failed background fetch doesn't interrupt the transactions; the
+        first failure is raised once they are done.
+        """
+        print("Syncing accounts, categories and webhooks in the background...")
+        started = datetime.now(timezone.utc)
+        fetched: queue.Queue = queue.Queue()
+        pending = 0
+        errors: List[Exception] = []
+
+        def store_fetched(block: bool = False) -> None:
+            nonlocal pending
+            while pending:
+                try:
+                    store, future = fetched.get(block=block)
+                except queue.Empty:
+                    return
+                pending -= 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Error fetching in the background: {e}")
+                    errors.append(e)
+                    continue
+                store(result)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for fetch, store in (
+                (self.client.list_accounts, lambda accounts: self._store_accounts(accounts, started)),
+                (self.client.list_categories, lambda categories: self._store_categories(categories, started)),
+                (lambda: self._fetch_webhooks(max_workers), self._store_webhooks),
+            ):
+                future = executor.submit(fetch)
+                future.add_done_callback(lambda future, store=store: fetched.put((store, future)))
+                pending += 1
+
+            self._between_pages = store_fetched
+            try:
+                self.sync_transactions(**transactions)
+            finally:
+                self._between_pages = None
+            store_fetched(block=True)
+        if errors:
+            raise errors[0]
+
+SYNC_RESOURCES = ("accounts", "categories", "transactions", "webhooks")
+
+def parse_date(text: str) -> datetime:
+    """argparse type for YYYY-MM-DD dates and ISO 8601 timestamps"""
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a date: {text!r} (expected YYYY-MM-DD or ISO 8601)")
+
+def build_parser() -> argparse.ArgumentParser:
+    """Command-line options for ``python -m upbank.sync``"""
+    parser = argparse.ArgumentParser(
+        description="Sync data from UP Bank to SQLite or CSV. The API key is read from UP_API_KEY.",
+        epilog="With no arguments on a terminal the options are prompted for instead."
+    )
+    parser.add_argument("--interactive", action="store_true", help="Prompt for the options")
+    parser.add_argument("--output", choices=["sqlite", "csv"], default="sqlite", help="Where to save the data")
+    parser.add_argument("--path", help="SQLite database (default up.db) or CSV directory (default exports)")
+    parser.add_argument(
+        "--resources",
+        nargs="+",
+        choices=["all", *SYNC_RESOURCES],
+        default=["all"],
+        help="What to sync (default all)"
+    )
+    parser.add_argument("--since", type=parse_date, help="Only sync transactions created since this date")
+    parser.add_argument("--until", type=parse_date, help="Only sync transactions created until this date")
+    parser.add_argument("--status", choices=["HELD", "SETTLED"], help="Only sync transactions with this status")
+    parser.add_argument(
+        "--incremental",
+        action=argparse.BooleanOptionalAction,
+        help="Only fetch transactions newer than the last sync (default for SQLite without --since)"
+    )
+    parser.add_argument("--backfill", action="store_true", help="Fetch transactions in parallel date windows")
+    parser.add_argument(
+        "--concurrent",
+        action="store_true",
+        help="Fetch accounts, categories and webhooks alongside transactions (all resources only)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted transaction sync (same options) from its last checkpoint"
+    )
+    parser.add_argument("--dev", action="store_true", default=DEV_MODE, help="Development mode: fetch one page only")
+
+    daemon = parser.add_argument_group("daemon mode")
+    daemon.add_argument("--daemon", action="store_true", help="Keep syncing incrementally until stopped (SQLite only)")
+    daemon.add_argument("--min-interval", type=float, default=120, help="Seconds between polls while data is changing")
+    daemon.add_argument("--held-interval", type=float, default=300, help="Longest wait while HELD transactions are outstanding")
+    daemon.add_argument(
+        "--max-interval",
+        type=float,
+        default=600,
+        help="Longest wait once nothing is changing; keep it below the API's UPBANK_LOCAL_MAX_AGE"
+    )
+    daemon.add_argument(
+        "--refresh-interval",
+        type=float,
+        default=600,
+        help="Seconds between syncs of accounts, categories and webhooks; keep it below UPBANK_LOCAL_MAX_AGE"
+    )
+    return parser
+
+def prompt_options(args: argparse.Namespace) -> Optional[argparse.Namespace]:
+    """Fill in ``args`` by asking the user, returning None if they gave up"""
     import questionary
-    from datetime import datetime
-    import os
 
     print("Welcome to UP Bank Data Sync Tool!")
     print("----------------------------------")
-    
-    if DEV_MODE:
-        print("\n⚠️  Development mode enabled - data retrieval will be limited")
-        print("   Set UPBANK_DEV_MODE=false to disable\n")
 
-    api_key = os.environ.get("UP_API_KEY")
-    if not api_key:
+    if not os.environ.get("UP_API_KEY"):
         api_key = questionary.text(
             "Enter your UP Bank API key:",
             validate=lambda text: len(text) > 0 or "API key cannot be empty"
         ).ask()
-
-    if not api_key:
-        print("API key is required. Exiting...")
-        return
+        if not api_key:
+            print("API key is required. Exiting...")
+            return None
+        os.environ["UP_API_KEY"] = api_key
 
     output_type = questionary.select(
         "How would you like to save the data?",
@@ -297,23 +836,20 @@ def main():
         ]
     ).ask()
 
-    is_csv = "CSV" in output_type
-
-    if is_csv:
-        default_path = "exports"
-        csv_dir = questionary.text(
+    if "CSV" in output_type:
+        args.output = "csv"
+        args.path = questionary.text(
             "Enter directory for CSV files:",
-            default=default_path
+            default="exports"
         ).ask()
-        handler = CsvHandler(csv_dir)
     else:
-        default_path = "up.db"
-        db_path = questionary.text(
+        args.output = "sqlite"
+        args.path = questionary.text(
             "Enter path for SQLite database:",
-            default=default_path
+            default="up.db"
         ).ask()
         
-        if not os.path.exists(db_path):
+        if not os.path.exists(args.path):
             should_init = questionary.confirm(
                 "Database doesn't exist. Initialize it?",
                 default=True
@@ -321,12 +857,10 @@ def main():
             
             if should_init:
                 from upbank.migrations import init_db
-                print(f"Initializing database at: {db_path}")
-                init_db(db_path)
-        
-        handler = DatabaseHandler(db_path)
+                print(f"Initializing database at: {args.path}")
+                init_db(args.path)
 
-    sync_types = questionary.checkbox(
+    args.resources = questionary.checkbox(
         "What data would you like to sync?",
         choices=[
             questionary.Choice("All (syncs everything)", "all"),
@@ -338,9 +872,14 @@ def main():
         validate=lambda answers: len(answers) > 0 or "Please select at least one option"
     ).ask()
 
-    transaction_filters = {}
-    if "all" in sync_types or "transactions" in sync_types:
-        if questionary.confirm("Would you like to filter transactions by date?").ask():
+    args.incremental = False
+    if "all" in args.resources or "transactions" in args.resources:
+        if args.output == "sqlite" and questionary.confirm(
+            "Only fetch transactions newer than the last sync?",
+            default=True
+        ).ask():
+            args.incremental = True
+        elif questionary.confirm("Would you like to filter transactions by date?").ask():
             date_format = "YYYY-MM-DD"
             since = questionary.text(
                 f"Enter start date ({date_format}) or leave empty:",
@@ -358,50 +897,148 @@ def main():
                 )
             ).ask()
 
-            if since:
-                transaction_filters['since'] = datetime.fromisoformat(since)
-            if until:
-                transaction_filters['until'] = datetime.fromisoformat(until)
+            args.since = datetime.fromisoformat(since) if since else None
+            args.until = datetime.fromisoformat(until) if until else None
 
         if questionary.confirm("Would you like to filter transactions by status?").ask():
-            status = questionary.select(
+            args.status = questionary.select(
                 "Select transaction status:",
                 choices=["HELD", "SETTLED"]
             ).ask()
-            transaction_filters['status'] = status
 
-    sync = UpBankSync(api_key, handler)
+        if not args.incremental and questionary.confirm(
+            "Fetch transactions in parallel date windows? (faster for a full backfill)",
+            default=False
+        ).ask():
+            args.backfill = True
 
-    if "all" in sync_types:
-        sync_types = ["accounts", "categories", "transactions", "webhooks"]
-    
+    args.concurrent = "all" in args.resources and questionary.confirm(
+        "Fetch accounts, categories and webhooks alongside transactions?",
+        default=True
+    ).ask()
+    return args
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main entry point for syncing data, returning the process exit status"""
+    import sys
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    given = sys.argv[1:] if argv is None else argv
+    if args.interactive or (not given and sys.stdin.isatty()):
+        try:
+            args = prompt_options(args)
+        except ImportError:
+            print("Please install required package: pip install questionary")
+            return 1
+        if args is None:
+            return 1
+
+    api_key = os.environ.get("UP_API_KEY")
+    if not api_key:
+        parser.error("UP_API_KEY is not set")
+    is_csv = args.output == "csv"
+    path = args.path or ("exports" if is_csv else "up.db")
+    resources = list(SYNC_RESOURCES) if "all" in args.resources else list(dict.fromkeys(args.resources))
+    if args.incremental is None:
+        args.incremental = not is_csv and args.since is None and not args.backfill
+    if is_csv and (args.incremental or args.daemon):
+        parser.error("--incremental and --daemon need --output sqlite")
+    if args.concurrent and set(resources) != set(SYNC_RESOURCES):
+        parser.error("--concurrent syncs every resource; drop --resources or --concurrent")
+    if args.dev:
+        print("\n⚠️  Development mode enabled - data retrieval will be limited")
+        print("   Set UPBANK_DEV_MODE=false and drop --dev to disable\n")
+
+    handler = CsvHandler(path) if is_csv else DatabaseHandler(path)
+    metrics = get_metrics_registry()
+    sync = UpBankSync(api_key, handler, metrics=metrics)
+    sync.dev_mode = args.dev
+
+    if args.daemon:
+        return run_daemon(sync, handler, resources, args)
+
+    transaction_filters = dict(
+        since=args.since,
+        until=args.until,
+        status=args.status,
+        backfill=args.backfill,
+        incremental=args.incremental,
+        resume=args.resume
+    )
     try:
-        for sync_type in sync_types:
-            if sync_type == "transactions":
-                sync.sync_transactions(**transaction_filters)
-            elif sync_type == "accounts":
-                sync.sync_accounts()
-            elif sync_type == "categories":
-                sync.sync_categories()
-            elif sync_type == "webhooks":
-                sync.sync_webhooks()
+        if args.concurrent:
+            sync.sync_all(
+                concurrent=True,
+                **{f"transaction_{name}": value for name, value in transaction_filters.items()}
+            )
+        else:
+            for sync_type in resources:
+                if sync_type == "transactions":
+                    sync.sync_transactions(**transaction_filters)
+                elif sync_type == "accounts":
+                    sync.sync_accounts()
+                elif sync_type == "categories":
+                    sync.sync_categories()
+                elif sync_type == "webhooks":
+                    sync.sync_webhooks()
         
         if is_csv:
             handler.flush()
-            print(f"\nData has been exported to: {os.path.abspath(csv_dir)}")
+            print(f"\nData has been exported to: {os.path.abspath(path)}")
         else:
-            print(f"\nData has been saved to: {os.path.abspath(db_path)}")
+            handler.close()
+            print(f"\nData has been saved to: {os.path.abspath(path)}")
             
     except Exception as e:
         print(f"\nError during sync: {str(e)}")
-        return
+        if not is_csv:
+            print("Transactions stored so far are kept; run again with the same options and --resume to continue.")
+        return 1
 
     print("\nSync completed successfully!")
+    print("\nRequest metrics:")
+    print(metrics.format())
+    return 0
 
-if __name__ == "__main__":
+def run_daemon(sync: UpBankSync, handler: DatabaseHandler, resources: List[str], args: argparse.Namespace) -> int:
+    """Keep ``handler``'s database current until SIGTERM or Ctrl-C"""
+    import signal
+    import threading
+    from upbank.daemon import AdaptiveInterval, SyncDaemon
+    from upbank.local import DEFAULT_MAX_AGE
+
+    max_age = float(os.getenv("UPBANK_LOCAL_MAX_AGE", DEFAULT_MAX_AGE.total_seconds()))
+    if max(args.max_interval, args.refresh_interval) >= max_age:
+        print(
+            f"Warning: --max-interval and --refresh-interval should stay below UPBANK_LOCAL_MAX_AGE "
+            f"({max_age:g}s), or the API will serve local reads from upstream while the daemon is idle"
+        )
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    daemon = SyncDaemon(
+        sync,
+        handler,
+        resources=resources,
+        interval=AdaptiveInterval(
+            minimum=timedelta(seconds=args.min_interval),
+            held=timedelta(seconds=args.held_interval),
+            maximum=timedelta(seconds=args.max_interval),
+        ),
+        refresh=timedelta(seconds=args.refresh_interval),
+    )
+    print(f"Syncing {', '.join(resources)} into {os.path.abspath(handler.db.db_path)} until stopped")
     try:
-        import questionary
-    except ImportError:
-        print("Please install required package: pip install questionary")
-    else:
-        main() 
\ No newline at end of file
+        daemon.run(stop)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        handler.close()
+    print("\nStopped.")
+    print("\nRequest metrics:")
+    print(get_metrics_registry().format())
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
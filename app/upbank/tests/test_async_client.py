@@ -0,0 +1,139 @@
+"""
+Tests for the asynchronous UP Bank API client
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from upbank.async_client import AsyncUpClient
+from upbank.ratelimit import RateLimiter
+from upbank.models import Account, AccountList, Transaction, TransactionList
+
+def make_client(handler) -> AsyncUpClient:
+    """Create an AsyncUpClient backed by an in-memory transport"""
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return AsyncUpClient(
+        "test-token",
+        http_client=http_client,
+        rate_limiter=RateLimiter(rate=1000, burst=1000),
+    )
+
+def test_client_initialization():
+    """Test client initialization"""
+    client = AsyncUpClient("test-token")
+    assert client.token == "test-token"
+    assert client.base_url == "https://api.up.com.au/api/v1"
+    assert client.headers["Authorization"] == "Bearer test-token"
+    asyncio.run(client.aclose())
+
+def test_get_accounts(account_response):
+    """Test list_accounts sends auth headers and validates the response"""
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, json={"data": [account_response["data"]], "links": {"self": "test"}})
+
+    async def run():
+        async with make_client(handler) as client:
+            return await client.get_accounts()
+
+    accounts = asyncio.run(run())
+    assert isinstance(accounts, AccountList)
+    assert accounts.data[0].id == "test-account-id"
+    assert seen[0].headers["Authorization"] == "Bearer test-token"
+    assert seen[0].url.path == "/api/v1/accounts"
+
+def test_get_account(account_response):
+    """Test get_account method"""
+    client = make_client(lambda request: httpx.Response(200, json=account_response))
+    account = asyncio.run(client.get_account("test-account-id"))
+    assert isinstance(account, Account)
+    assert account.id == "test-account-id"
+
+def test_list_transactions_follows_cursor(transaction_response):
+    """Test list_transactions walks every page"""
+    second = dict(transaction_response["data"], id="test-transaction-2")
+
+    def handler(request):
+        if request.url.params.get("page[after]") == "cursor-2":
+            return httpx.Response(200, json={"data": [second], "links": {"next": None}})
+        return httpx.Response(200, json={
+            "data": [transaction_response["data"]],
+            "links": {"next": "https://api.up.com.au/api/v1/transactions?page[after]=cursor-2"}
+        })
+
+    client = make_client(handler)
+    transactions = asyncio.run(client.list_transactions(status="SETTLED"))
+    assert isinstance(transactions, TransactionList)
+    assert [t.id for t in transactions.data] == ["test-transaction-id", "test-transaction-2"]
+
+def test_get_transaction(transaction_response):
+    """Test get_transaction method"""
+    client = make_client(lambda request: httpx.Response(200, json=transaction_response))
+    transaction = asyncio.run(client.get_transaction("test-transaction-id"))
+    assert isinstance(transaction, Transaction)
+    assert transaction.id == "test-transaction-id"
+
+def test_concurrent_requests_overlap():
+    """Test concurrent calls run together instead of queueing"""
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={"meta": {"id": "ping"}})
+
+    async def run():
+        async with make_client(handler) as client:
+            await asyncio.gather(*(client.ping() for _ in range(5)))
+
+    asyncio.run(run())
+    assert peak == 5
+
+def test_http_error_is_raised():
+    """Test HTTP errors propagate"""
+    client = make_client(lambda request: httpx.Response(404, json={"errors": []}))
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client.get_account("missing"))
+
+def test_list_tags_follows_every_page():
+    """Test async list methods merge every page"""
+    def handler(request):
+        if request.url.params.get("page[after]") == "cursor-2":
+            return httpx.Response(200, json={"data": [{"type": "tags", "id": "b", "relationships": {"transactions": {}}}], "links": {"next": None}})
+        return httpx.Response(200, json={
+            "data": [{"type": "tags", "id": "a", "relationships": {"transactions": {}}}],
+            "links": {"next": "https://api.up.com.au/api/v1/tags?page[after]=cursor-2"}
+        })
+
+    tags = asyncio.run(make_client(handler).list_tags())
+    assert [tag.id for tag in tags.data] == ["a", "b"]
+
+def test_bulk_set_category_limits_concurrency():
+    """Test async bulk calls respect max_workers and report failures"""
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if "txn-3" in request.url.path:
+            return httpx.Response(422, json={"errors": []})
+        return httpx.Response(204)
+
+    mapping = {f"txn-{i}": "groceries" for i in range(6)}
+    result = asyncio.run(make_client(handler).bulk_set_category(mapping, max_workers=2))
+    assert peak == 2
+    assert len(result.succeeded) == 5
+    assert result.failed[0].transaction_id == "txn-3"
+    assert result.failed[0].status_code == 422
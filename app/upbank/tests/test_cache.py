@@ -0,0 +1,83 @@
+"""
+Tests for the UP Bank response cache
+"""
+
+from upbank.cache import ResponseCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_hit_and_expiry():
+    """Test entries are served until their resource TTL passes"""
+    clock = FakeClock()
+    cache = ResponseCache(ttls={"categories": 10}, clock=clock)
+    cache.set("/categories", None, {"data": []})
+    assert cache.get("/categories") == {"data": []}
+    clock.now = 10
+    assert cache.get("/categories") is None
+    assert len(cache) == 0
+
+def test_params_are_part_of_key():
+    """Test different query params are cached separately"""
+    cache = ResponseCache(ttls={"categories": 10})
+    cache.set("/categories", {"filter[parent]": "home"}, {"data": ["home"]})
+    assert cache.get("/categories") is None
+    assert cache.get("categories", {"filter[parent]": "home"}) == {"data": ["home"]}
+
+def test_uncached_resources():
+    """Test resources without a TTL are never stored"""
+    cache = ResponseCache(ttls={"categories": 10})
+    cache.set("/transactions", None, {"data": []})
+    assert not cache.cacheable("/transactions")
+    assert cache.get("/transactions") is None
+
+def test_lru_eviction():
+    """Test the least recently used entry is dropped when full"""
+    cache = ResponseCache(max_entries=2, ttls={"categories": 10})
+    cache.set("/categories/a", None, {"id": "a"})
+    cache.set("/categories/b", None, {"id": "b"})
+    cache.get("/categories/a")
+    cache.set("/categories/c", None, {"id": "c"})
+    assert cache.get("/categories/b") is None
+    assert cache.get("/categories/a") == {"id": "a"}
+
+def test_returns_copies():
+    """Test callers cannot mutate cached data"""
+    cache = ResponseCache(ttls={"categories": 10})
+    cache.set("/categories", None, {"data": [1]})
+    cache.get("/categories")["data"].append(2)
+    assert cache.get("/categories") == {"data": [1]}
+
+def test_invalidate():
+    """Test eviction by resource, by path and in full"""
+    cache = ResponseCache(ttls={"categories": 10, "tags": 10})
+    cache.set("/categories/a", None, {})
+    cache.set("/categories/a", {"x": 1}, {})
+    cache.set("/tags", None, {})
+    cache.invalidate(endpoint="/categories/a")
+    assert len(cache) == 1
+    cache.set("/categories/b", None, {})
+    cache.invalidate(resource="tags")
+    assert cache.get("/tags") is None
+    assert cache.get("/categories/b") == {}
+    cache.invalidate()
+    assert len(cache) == 0
+
+def test_nested_collections_belong_to_their_resource():
+    """Test an account's transaction list isn't cached or kept under the accounts TTL"""
+    cache = ResponseCache(ttls={"accounts": 60})
+    assert cache.cacheable("/accounts/a")
+    assert not cache.cacheable("/accounts/a/transactions")
+    cache.set("/accounts/a/transactions", None, {"data": []})
+    assert cache.get("/accounts/a/transactions") is None
+
+    cache = ResponseCache(ttls={"accounts": 60, "transactions": 60})
+    cache.set("/accounts/a", None, {})
+    cache.set("/accounts/a/transactions", None, {"data": []})
+    cache.invalidate(resource="transactions")
+    assert cache.get("/accounts/a/transactions") is None
+    assert cache.get("/accounts/a") == {}
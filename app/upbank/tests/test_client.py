@@ -6,6 +6,7 @@ import pytest
 from unittest.mock import patch, MagicMock
 
 from upbank.client import UpClient
+from upbank.ratelimit import RateLimiter
 from upbank.models import (
     Account,
     AccountList,
@@ -30,7 +31,7 @@ def client():
         mock.request.return_value.content = True
         mock.request.return_value.json.return_value = {}
         mock_session.return_value = mock
-        client = UpClient("test-token")
+        client = UpClient("test-token", rate_limiter=RateLimiter(rate=1000, burst=1000))
         return client
 
 def test_client_initialization():
@@ -154,4 +155,265 @@ def test_ping(client):
     client.session.request.return_value.json.return_value = response
 
     result = client.ping()
-    assert result["meta"]["id"] == "test-ping-id" 
\ No newline at end of file
+    assert result["meta"]["id"] == "test-ping-id" 
+
+
+def _page(items, next_cursor=None):
+    """Build a mocked transaction page response"""
+    response = MagicMock()
+    response.status_code = 200
+    response.content = True
+    next_url = f"https://api.up.com.au/api/v1/transactions?page[after]={next_cursor}" if next_cursor else None
+    response.json.return_value = {"data": items, "links": {"prev": None, "next": next_url}}
+    return response
+
+def test_iter_transaction_pages(client, transaction_response):
+    """Test iter_transaction_pages yields each page as it is fetched"""
+    first = transaction_response["data"]
+    second = dict(first, id="test-transaction-2")
+    client.session.request.side_effect = [_page([first], "cursor-2"), _page([second])]
+    client.prefetch = False
+
+    pages = client.iter_transaction_pages(page_size=1)
+    page = next(pages)
+    assert isinstance(page, TransactionList)
+    assert [t.id for t in page.data] == ["test-transaction-id"]
+    assert client.session.request.call_count == 1
+
+    page = next(pages)
+    assert [t.id for t in page.data] == ["test-transaction-2"]
+    assert client.session.request.call_args.kwargs["params"]["page[after]"] == "cursor-2"
+    assert next(pages, None) is None
+
+def test_iter_transactions(client, transaction_response):
+    """Test iter_transactions flattens pages"""
+    first = transaction_response["data"]
+    second = dict(first, id="test-transaction-2")
+    client.session.request.side_effect = [_page([first], "cursor-2"), _page([second])]
+
+    ids = [t.id for t in client.iter_transactions()]
+    assert ids == ["test-transaction-id", "test-transaction-2"]
+
+def test_date_windows():
+    """Test date_windows covers the range newest first without gaps"""
+    from datetime import datetime, timedelta
+    from upbank.client import date_windows
+
+    since = datetime(2024, 1, 1)
+    until = datetime(2024, 1, 25)
+    windows = date_windows(since, until, timedelta(days=10))
+    assert windows == [
+        (datetime(2024, 1, 15), datetime(2024, 1, 25)),
+        (datetime(2024, 1, 5), datetime(2024, 1, 15)),
+        (datetime(2024, 1, 1), datetime(2024, 1, 5)),
+    ]
+
+def test_backfill_transactions(client, transaction_response):
+    """Test backfill_transactions walks every window and drops duplicates"""
+    from datetime import datetime, timedelta
+
+    base = transaction_response["data"]
+    by_window = {
+        "2024-01-11T00:00:00": [[dict(base, id="a")], [dict(base, id="b")]],
+        "2024-01-01T00:00:00": [[dict(base, id="b"), dict(base, id="c")]],
+    }
+
+    def request(method, url, params=None, json=None):
+        chain = by_window[params["filter[since]"]]
+        index = int(params.get("page[after]", 0))
+        return _page(chain[index], str(index + 1) if index + 1 < len(chain) else None)
+
+    client.session.request.side_effect = request
+
+    pages = list(client.backfill_transactions(
+        since=datetime(2024, 1, 1),
+        until=datetime(2024, 1, 21),
+        window=timedelta(days=10),
+        max_workers=2,
+    ))
+    ids = [t.id for page in pages for t in page.data]
+    assert sorted(ids) == ["a", "b", "c"]
+    assert client.session.request.call_count == 3
+
+def test_request_retries_throttled_responses(client):
+    """Test 429s are retried with the Retry-After delay before succeeding"""
+    throttled = MagicMock()
+    throttled.status_code = 429
+    throttled.headers = {"Retry-After": "2"}
+    ok = MagicMock()
+    ok.status_code = 200
+    ok.headers = {}
+    ok.content = True
+    ok.json.return_value = {"meta": {"id": "ping"}}
+    client.session.request.side_effect = [throttled, ok]
+    client.rate_limiter = RateLimiter()
+
+    with patch("upbank.client.time.sleep") as sleep:
+        result = client.ping()
+
+    assert result["meta"]["id"] == "ping"
+    assert client.session.request.call_count == 2
+    assert max(call.args[0] for call in sleep.call_args_list) >= 2
+
+def test_request_gives_up_after_max_retries(client):
+    """Test the final throttled response is raised"""
+    import requests
+
+    throttled = MagicMock()
+    throttled.status_code = 429
+    throttled.headers = {}
+    throttled.raise_for_status.side_effect = requests.exceptions.HTTPError("429")
+    client.session.request.return_value = throttled
+    client.max_retries = 2
+    client.rate_limiter = RateLimiter()
+
+    with patch("upbank.client.time.sleep"):
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.ping()
+    assert client.session.request.call_count == 3
+
+def test_cached_categories(client, category_response):
+    """Test cached GETs skip the network and mutations evict affected entries"""
+    from upbank.cache import ResponseCache
+
+    client.cache = ResponseCache()
+    client.session.request.return_value.json.return_value = category_response
+    client.get_category("test-category-id")
+    client.get_category("test-category-id")
+    assert client.session.request.call_count == 1
+
+    client.session.request.return_value.json.return_value = {"data": [], "links": {}}
+    client.list_tags()
+    client.list_tags()
+    assert client.session.request.call_count == 2
+
+    client.add_tags_to_transaction("test-transaction-id", ["new-tag"])
+    client.list_tags()
+    assert client.session.request.call_count == 4
+
+def test_list_transactions_raw(client, transaction_response):
+    """Test raw mode returns records without building pydantic models"""
+    from upbank.models.records import RecordPage, TransactionRecord
+
+    client.session.request.side_effect = [_page([transaction_response["data"]])]
+    with patch("upbank.client.TransactionList.model_validate") as validate:
+        page = client.list_transactions(raw=True)
+    validate.assert_not_called()
+    assert isinstance(page, RecordPage)
+    assert isinstance(page.data[0], TransactionRecord)
+    assert page.data[0].id == "test-transaction-id"
+
+def test_list_endpoints_follow_every_page(client, account_response, webhook_response):
+    """Test list methods no longer stop at the first page"""
+    first = account_response["data"]
+    second = dict(first, id="test-account-2")
+    client.session.request.side_effect = [_page([first], "cursor-2"), _page([second])]
+    accounts = client.list_accounts(page_size=1)
+    assert [a.id for a in accounts.data] == ["test-account-id", "test-account-2"]
+    assert accounts.links.next is None
+
+    hook = webhook_response["data"]
+    client.session.request.side_effect = [_page([hook], "cursor-2"), _page([dict(hook, id="test-webhook-2")])]
+    assert len(client.list_webhooks().data) == 2
+
+def test_paginator_prefetches_next_page():
+    """Test the next page is requested while the caller holds the current one"""
+    import threading
+    from upbank.client import Paginator
+
+    requested = []
+    second_requested = threading.Event()
+
+    def request(method, endpoint, params=None):
+        cursor = (params or {}).get("page[after]")
+        requested.append(cursor)
+        if cursor is None:
+            return {"data": [1], "links": {"next": "https://x/y?page[after]=2"}}
+        second_requested.set()
+        return {"data": [2], "links": {"next": None}}
+
+    pages = iter(Paginator(request, "/accounts", {"page[size]": 1}))
+    assert next(pages)["data"] == [1]
+    assert second_requested.wait(timeout=1)
+    assert next(pages)["data"] == [2]
+    assert next(pages, None) is None
+    assert requested == [None, "2"]
+
+def test_paginator_without_prefetch():
+    """Test pages are fetched strictly on demand when prefetch is off"""
+    from upbank.client import Paginator
+
+    requested = []
+
+    def request(method, endpoint, params=None):
+        requested.append(params)
+        return {"data": [], "links": {"next": "https://x/y?page[after]=n" if len(requested) < 3 else None}}
+
+    pages = iter(Paginator(request, "/tags", prefetch=False))
+    next(pages)
+    assert requested == [None]
+    assert len(list(pages)) == 2
+    assert requested[1:] == [{"page[after]": "n"}, {"page[after]": "n"}]
+
+def test_bulk_add_tags_reports_each_item(client):
+    """Test bulk tagging dispatches every item and reports failures per transaction"""
+    import requests
+    from upbank.models.bulk import BulkResult
+
+    def request(method, url, params=None, json=None):
+        response = MagicMock()
+        response.status_code = 204
+        response.content = False
+        if "bad-txn" in url:
+            response.status_code = 404
+            error = requests.exceptions.HTTPError("404 Not Found", response=response)
+            response.raise_for_status.side_effect = error
+        return response
+
+    client.session.request.side_effect = request
+    result = client.bulk_add_tags({"txn-1": ["a"], "bad-txn": ["a"], "txn-2": ["b", "c"]})
+
+    assert isinstance(result, BulkResult)
+    assert [r.transaction_id for r in result.results] == ["txn-1", "bad-txn", "txn-2"]
+    assert result.succeeded == ["txn-1", "txn-2"]
+    assert result.failed[0].status_code == 404
+    assert client.session.request.call_count == 3
+    posted = {call.args[1]: call.kwargs["json"] for call in client.session.request.call_args_list}
+    assert posted["https://api.up.com.au/api/v1/transactions/txn-2/relationships/tags"] == {
+        "data": [{"type": "tags", "id": "b"}, {"type": "tags", "id": "c"}]
+    }
+
+def test_bulk_set_category(client):
+    """Test bulk categorisation sends one PATCH per transaction"""
+    client.session.request.return_value.status_code = 204
+    client.session.request.return_value.content = False
+    result = client.bulk_set_category({"txn-1": "groceries", "txn-2": None})
+    assert result.succeeded == ["txn-1", "txn-2"]
+    methods = {call.args[0] for call in client.session.request.call_args_list}
+    assert methods == {"PATCH"}
+
+def test_metrics_recorded_per_endpoint(client, account_response):
+    """Test requests, retries, decode and validation are recorded when metrics are enabled"""
+    from upbank.metrics import MetricsRegistry
+
+    throttled = MagicMock()
+    throttled.status_code = 429
+    throttled.headers = {}
+    throttled.content = b""
+    ok = MagicMock()
+    ok.status_code = 200
+    ok.headers = {}
+    ok.content = b"x" * 64
+    ok.json.return_value = account_response
+    client.session.request.side_effect = [throttled, ok]
+    client.metrics = MetricsRegistry()
+
+    with patch("upbank.client.time.sleep"):
+        client.get_account("test-account-id")
+
+    stats = client.metrics.snapshot()["GET /accounts/{id}"]
+    assert stats["requests"] == 2
+    assert stats["retries"] == 1
+    assert stats["throttled"] == 1
+    assert stats["response_bytes"] == 64
+    assert stats["validations"] == 1
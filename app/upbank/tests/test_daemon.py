@@ -0,0 +1,141 @@
+"""
+Tests for the adaptive incremental sync daemon
+"""
+
+import contextlib
+import io
+import os
+import threading
+import unittest
+from datetime import timedelta
+
+from upbank.benchmarks.simulator import UpSimulator
+from upbank.client import UpClient
+from upbank.daemon import MIN_OVERLAP, AdaptiveInterval, SyncDaemon, held_overlap
+from upbank.ratelimit import RateLimiter
+from upbank.sync import DatabaseHandler, UpBankSync
+
+MINUTE = timedelta(minutes=1)
+
+class TestAdaptiveInterval(unittest.TestCase):
+    def test_backs_off_when_idle_and_resets_on_change(self):
+        """Test idle polls double the wait up to the maximum and a change resets it"""
+        interval = AdaptiveInterval(minimum=MINUTE, held=5 * MINUTE, maximum=10 * MINUTE)
+        self.assertEqual(interval.next(changed=True), MINUTE)
+        self.assertEqual(
+            [interval.next(changed=False) for _ in range(5)],
+            [2 * MINUTE, 4 * MINUTE, 8 * MINUTE, 10 * MINUTE, 10 * MINUTE]
+        )
+        self.assertEqual(interval.next(changed=True), MINUTE)
+        self.assertEqual(interval.failed(), 2 * MINUTE)
+
+    def test_held_transactions_cap_the_wait(self):
+        """Test outstanding HELD transactions keep polling at least every ``held``"""
+        interval = AdaptiveInterval(minimum=MINUTE, held=3 * MINUTE, maximum=60 * MINUTE)
+        waits = [interval.next(changed=False, held=2) for _ in range(4)]
+        self.assertEqual(waits, [2 * MINUTE, 3 * MINUTE, 3 * MINUTE, 3 * MINUTE])
+        # Once they settle the backoff carries on from where it got to
+        self.assertEqual(interval.next(changed=False), 32 * MINUTE)
+
+        with self.assertRaises(ValueError):
+            AdaptiveInterval(minimum=MINUTE, maximum=timedelta(seconds=30))
+
+class TestSyncDaemon(unittest.TestCase):
+    def setUp(self):
+        self.test_db_path = "test_daemon.db"
+        self.handler = DatabaseHandler(self.test_db_path)
+        self.sync = UpBankSync("test-api-key", self.handler)
+        self.sync.dev_mode = False
+
+    def tearDown(self):
+        self.handler.db.close()
+        if os.path.exists(self.test_db_path):
+            os.remove(self.test_db_path)
+
+    def test_cycles_poll_minimally_and_follow_held_transactions(self):
+        """Test idle cycles cost one page per account and the schedule follows HELD transactions"""
+        interval = AdaptiveInterval(minimum=MINUTE, held=3 * MINUTE, maximum=60 * MINUTE)
+        # The simulator's history starts in 2020, so its HELD transactions need a long expiry to count
+        daemon = SyncDaemon(self.sync, self.handler, interval=interval, held_expiry=timedelta(days=3650))
+
+        with UpSimulator(transactions=400, accounts=2, held=5) as simulator, \
+                contextlib.redirect_stdout(io.StringIO()):
+            self.sync.client = UpClient(
+                "test-api-key",
+                base_url=simulator.base_url,
+                rate_limiter=RateLimiter(rate=1000, burst=1000),
+                prefetch=False,
+            )
+            self.assertEqual(daemon.run_once(), MINUTE)
+            self.assertEqual(len(self.handler.db.get_oldest_held()), 2)
+            self.assertGreater(held_overlap(self.handler), MIN_OVERLAP)
+
+            before = simulator.requests
+            self.assertEqual(daemon.run_once(), 2 * MINUTE)
+            # Accounts, categories and webhooks aren't due yet: one listing plus one page per account
+            self.assertEqual(simulator.requests - before, 1 + 2)
+            self.assertEqual(daemon.run_once(), 3 * MINUTE)
+
+            # The HELD transactions settle, which the next poll picks up
+            simulator.bank.held = 0
+            self.assertEqual(daemon.run_once(), MINUTE)
+            self.assertEqual(self.handler.db.get_oldest_held(), {})
+            self.assertEqual(held_overlap(self.handler), MIN_OVERLAP)
+            self.assertEqual(daemon.run_once(), 2 * MINUTE)
+
+        count = self.handler.db.conn.execute(
+            "SELECT COUNT(*) FROM transactions WHERE status = 'SETTLED'"
+        ).fetchone()[0]
+        self.assertEqual(count, 400)
+
+    def test_stale_held_transactions_stop_capping_the_wait(self):
+        """Test HELD transactions past the expiry are taken as never settling and the wait backs off"""
+        interval = AdaptiveInterval(minimum=MINUTE, held=3 * MINUTE, maximum=60 * MINUTE)
+        daemon = SyncDaemon(self.sync, self.handler, interval=interval)
+
+        with UpSimulator(transactions=40, accounts=2, held=5) as simulator, \
+                contextlib.redirect_stdout(io.StringIO()):
+            self.sync.client = UpClient(
+                "test-api-key",
+                base_url=simulator.base_url,
+                rate_limiter=RateLimiter(rate=1000, burst=1000),
+                prefetch=False,
+            )
+            self.assertEqual(daemon.run_once(), MINUTE)
+            self.assertEqual(len(self.handler.db.get_oldest_held()), 2)
+            self.assertEqual(daemon.run_once(), 2 * MINUTE)
+            self.assertEqual(daemon.run_once(), 4 * MINUTE)
+
+    def test_wait_ends_when_a_refresh_is_due(self):
+        """Test an idle wait never outlasts the next account, category or webhook refresh"""
+        interval = AdaptiveInterval(minimum=MINUTE, maximum=60 * MINUTE)
+        daemon = SyncDaemon(self.sync, self.handler, interval=interval, refresh=10 * MINUTE)
+
+        with UpSimulator(transactions=40, accounts=2, held=0) as simulator, \
+                contextlib.redirect_stdout(io.StringIO()):
+            self.sync.client = UpClient(
+                "test-api-key",
+                base_url=simulator.base_url,
+                rate_limiter=RateLimiter(rate=1000, burst=1000),
+                prefetch=False,
+            )
+            waits = [daemon.run_once() for _ in range(6)]
+        self.assertEqual(waits[:4], [MINUTE, 2 * MINUTE, 4 * MINUTE, 8 * MINUTE])
+        self.assertTrue(all(9 * MINUTE < wait <= 10 * MINUTE for wait in waits[4:]))
+
+    def test_run_survives_errors_until_stopped(self):
+        """Test a failing cycle backs off and the loop ends when asked"""
+        self.sync.client = UpClient("test-api-key", base_url="http://127.0.0.1:9", max_retries=0)
+        interval = AdaptiveInterval(minimum=MINUTE, maximum=60 * MINUTE)
+        daemon = SyncDaemon(self.sync, self.handler, resources=["accounts"], interval=interval)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            daemon.run(cycles=1)
+            daemon.run(cycles=1)
+        stop = threading.Event()
+        stop.set()
+        daemon.run(stop=stop)
+        self.assertEqual(output.getvalue().count("Error during sync"), 2)
+        self.assertEqual(interval.current, 4 * MINUTE)
+
+if __name__ == '__main__':
+    unittest.main()
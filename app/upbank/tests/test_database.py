@@ -5,7 +5,7 @@ Tests for the UP Bank database operations
 import os
 import unittest
 from datetime import datetime
-from upbank.database import UpDatabase
+from upbank.database import UpDatabase, UpsertCounts
 
 class TestUpDatabase(unittest.TestCase):
     def setUp(self):
@@ -121,6 +121,319 @@ class TestUpDatabase(unittest.TestCase):
         self.assertIsNotNone(tag)
         self.assertEqual(tag["id"], "test-tag")
 
+    def test_insert_transactions_in_batches(self):
+        """Test batch inserts write every row and tag link across several batches"""
+        from upbank.benchmarks.synthetic import make_transactions
+        from upbank.models.records import TransactionRecord
+
+        transactions = [TransactionRecord.from_json(t).model_dump() for t in make_transactions(25)]
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+
+        written = self.db.insert_transactions(iter(transactions), batch_size=10)
+
+        self.db.conn.set_trace_callback(None)
+        self.assertEqual(written, UpsertCounts(inserted=25))
+        self.assertEqual(self.db.conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0], 25)
+        links = sum(len(t["relationships"]["tags"]["data"]) for t in transactions)
+        self.assertEqual(self.db.conn.execute("SELECT COUNT(*) FROM transaction_tags").fetchone()[0], links)
+        self.assertEqual(sum(1 for sql in statements if sql.strip().upper() == "COMMIT"), 3)
+
+    def test_upsert_only_writes_changed_rows(self):
+        """Test re-syncing unchanged rows writes nothing and changes update in place"""
+        from upbank.benchmarks.synthetic import make_transactions
+        from upbank.models.records import TransactionRecord
+
+        raw = make_transactions(10)
+        self.db.insert_transactions(TransactionRecord.from_json(t).model_dump() for t in raw)
+        rowid = self.db.conn.execute("SELECT rowid FROM transactions WHERE id = ?", (raw[3]["id"],)).fetchone()[0]
+
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        counts = self.db.insert_transactions(TransactionRecord.from_json(t).model_dump() for t in raw)
+        self.db.conn.set_trace_callback(None)
+        self.assertEqual(counts, UpsertCounts(unchanged=10))
+        self.assertFalse([sql for sql in statements if not sql.lstrip().upper().startswith("SELECT")])
+
+        raw[3]["attributes"]["status"] = "HELD"
+        raw[5]["relationships"]["tags"]["data"] = [{"type": "tags", "id": "new-tag"}]
+        counts = self.db.insert_transactions(TransactionRecord.from_json(t).model_dump() for t in raw)
+        self.assertEqual(counts, UpsertCounts(updated=2, unchanged=8))
+        row = self.db.conn.execute("SELECT rowid, status FROM transactions WHERE id = ?", (raw[3]["id"],)).fetchone()
+        self.assertEqual(tuple(row), (rowid, "HELD"))
+        tags = self.db.conn.execute(
+            "SELECT tag_id FROM transaction_tags WHERE transaction_id = ?", (raw[5]["id"],)
+        ).fetchall()
+        self.assertEqual([tag[0] for tag in tags], ["new-tag"])
+
+    def test_validated_and_trusted_rows_match(self):
+        """Test pydantic and record dumps store identical rows, so switching paths isn't a change"""
+        from upbank.benchmarks.synthetic import make_transactions
+        from upbank.client import parse_transaction_page
+        from upbank.models.records import TransactionRecord
+
+        raw = make_transactions(5)
+        self.db.insert_transactions(TransactionRecord.from_json(t).model_dump() for t in raw)
+        page = parse_transaction_page({"data": raw, "links": {}})
+        counts = self.db.insert_transactions(t.model_dump() for t in page.data)
+        self.assertEqual(counts, UpsertCounts(unchanged=5))
+
+    def test_insert_batch_size_must_be_positive(self):
+        """Test a zero batch size is rejected"""
+        with self.assertRaises(ValueError):
+            self.db.insert_categories([], batch_size=0)
+
+    def test_wal_profile_readers_see_committed_rows_during_write(self):
+        """Test pooled readers are read-only and not blocked by an open write"""
+        import sqlite3
+
+        path = "test_upbank_wal.db"
+        db = UpDatabase(path, profile="wal", readers=2)
+        try:
+            self.assertEqual(db.conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            db.insert_category({"id": "a", "attributes": {"name": "A"}})
+
+            db.conn.execute("BEGIN IMMEDIATE")
+            db.conn.execute("INSERT INTO categories (id, name) VALUES ('b', 'B')")
+            with db.reader() as conn:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM categories").fetchone()[0], 1)
+                with self.assertRaises(sqlite3.OperationalError):
+                    conn.execute("DELETE FROM categories")
+            db.conn.commit()
+
+            with db.reader() as conn:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM categories").fetchone()[0], 2)
+        finally:
+            db.close()
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def test_reader_without_pool_uses_writer(self):
+        """Test reader() falls back to the writer connection"""
+        with self.db.reader() as conn:
+            self.assertIs(conn, self.db.conn)
+
+    def test_read_only_opens_no_writer(self):
+        """Test a read-only database reads through its pool and never creates or migrates a file"""
+        import sqlite3
+
+        self.db.insert_category({"id": "a", "attributes": {"name": "A"}})
+        db = UpDatabase(self.test_db_path, readers=1, read_only=True)
+        try:
+            self.assertIsNone(db.conn)
+            self.assertEqual([row["id"] for row in db.get_categories()], ["a"])
+            with db.reader() as conn:
+                with self.assertRaises(sqlite3.OperationalError):
+                    conn.execute("DELETE FROM categories")
+        finally:
+            db.close()
+
+        with self.assertRaises(sqlite3.OperationalError):
+            UpDatabase("test_upbank_missing.db", readers=1, read_only=True)
+        self.assertFalse(os.path.exists("test_upbank_missing.db"))
+        with self.assertRaises(ValueError):
+            UpDatabase(self.test_db_path, read_only=True)
+
+    def test_close_from_another_thread(self):
+        """Test a database opened in one thread can be closed from another"""
+        import threading
+
+        path = "test_upbank_thread.db"
+        db = UpDatabase(path, profile="wal", readers=1)
+        errors = []
+
+        def close():
+            try:
+                db.close()
+            except Exception as e:
+                errors.append(e)
+
+        try:
+            thread = threading.Thread(target=close)
+            thread.start()
+            thread.join()
+            self.assertEqual(errors, [])
+        finally:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def test_high_water_mark_only_moves_forward(self):
+        """Test marks are stored in UTC and never regress"""
+        from datetime import timedelta, timezone
+
+        aest = timezone(timedelta(hours=10))
+        self.assertIsNone(self.db.get_high_water_mark("transactions", "acct"))
+        self.db.set_high_water_mark("transactions", "acct", datetime(2024, 1, 2, 9, tzinfo=aest))
+        self.db.set_high_water_mark("transactions", "acct", datetime(2024, 1, 1, 23, tzinfo=timezone.utc))
+        self.assertEqual(
+            self.db.get_high_water_mark("transactions", "acct"),
+            datetime(2024, 1, 1, 23, tzinfo=timezone.utc)
+        )
+        self.db.set_high_water_mark("transactions", "acct", datetime(2024, 1, 1, 12, tzinfo=timezone.utc))
+        self.assertEqual(
+            self.db.get_high_water_mark("transactions", "acct"),
+            datetime(2024, 1, 1, 23, tzinfo=timezone.utc)
+        )
+
+    def _insert_synthetic(self, count):
+        from upbank.benchmarks.synthetic import make_transactions
+        from upbank.models.records import TransactionRecord
+
+        raw = make_transactions(count)
+        self.db.insert_transactions(TransactionRecord.from_json(t).model_dump() for t in raw)
+        return raw
+
+    def test_query_transactions_keyset_pages(self):
+        """Test cursor pages walk every row once, newest first"""
+        self._insert_synthetic(45)
+        ids = []
+        page = self.db.query_transactions(limit=20)
+        ids.extend(row["id"] for row in page.data)
+        while page.next_cursor:
+            page = self.db.query_transactions(limit=20, cursor=page.next_cursor)
+            ids.extend(row["id"] for row in page.data)
+        self.assertEqual(ids, [f"txn-{i:08d}" for i in reversed(range(45))])
+
+    def test_query_transactions_filters(self):
+        """Test each filter matches what the synthetic data says it should"""
+        raw = self._insert_synthetic(60)
+        tagged = [t["id"] for t in reversed(raw) if {"type": "tags", "id": "work"} in t["relationships"]["tags"]["data"]]
+        page = self.db.query_transactions(tag="work", limit=100)
+        self.assertEqual([row["id"] for row in page.data], tagged)
+        self.assertTrue(all("work" in row["tags"] for row in page.data))
+
+        groceries = self.db.query_transactions(category="groceries", account="account-0", limit=100).data
+        self.assertTrue(groceries)
+        self.assertTrue(all(row["category_id"] == "groceries" for row in groceries))
+
+        coles = self.db.query_transactions(text="coles", limit=100).data
+        self.assertEqual(
+            {row["id"] for row in coles},
+            {t["id"] for t in raw if t["attributes"]["description"] == "Coles"}
+        )
+        self.assertEqual(self.db.query_transactions(text="%", limit=100).data, [])
+
+        window = self.db.query_transactions(since=raw[10]["attributes"]["createdAt"], until=raw[20]["attributes"]["createdAt"])
+        self.assertEqual([row["id"] for row in window.data], [f"txn-{i:08d}" for i in reversed(range(10, 20))])
+
+        with self.assertRaises(ValueError):
+            self.db.query_transactions(cursor="not-a-cursor")
+
+    def test_query_orders_by_instant_across_offsets(self):
+        """Test ordering and ranges follow real time, not the ISO text, around a DST change"""
+        raw = self._insert_synthetic(2)
+        raw[0]["attributes"]["createdAt"] = "2024-04-07T02:30:00+11:00"  # 15:30 UTC
+        raw[1]["attributes"]["createdAt"] = "2024-04-07T02:10:00+10:00"  # 16:10 UTC
+        from upbank.models.records import TransactionRecord
+        self.db.insert_transactions(TransactionRecord.from_json(t).model_dump() for t in raw)
+
+        page = self.db.query_transactions()
+        self.assertEqual([row["id"] for row in page.data], [raw[1]["id"], raw[0]["id"]])
+        self.assertEqual(page.data[1]["created_at_us"], 1712417400000000)
+        window = self.db.query_transactions(since="2024-04-06T16:00:00+00:00")
+        self.assertEqual([row["id"] for row in window.data], [raw[1]["id"]])
+
+    def test_epoch_columns_backfilled_on_legacy_database(self):
+        """Test opening a database written before the epoch columns adds and fills them"""
+        import sqlite3
+
+        path = "test_upbank_legacy.db"
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE transactions (id TEXT PRIMARY KEY, account_id TEXT, status TEXT, "
+            "raw_text TEXT, description TEXT, message TEXT, is_categorizable BOOLEAN, "
+            "amount_currency_code TEXT, amount_value TEXT, amount_value_in_base_units INTEGER, "
+            "foreign_amount_currency_code TEXT, foreign_amount_value TEXT, "
+            "foreign_amount_value_in_base_units INTEGER, settled_at TEXT, created_at TEXT, "
+            "transaction_type TEXT, note TEXT, note_created_at TEXT, category_id TEXT, "
+            "transfer_account_id TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO transactions (id, account_id, status, amount_value_in_base_units, created_at) "
+            "VALUES ('old', 'acct', 'HELD', -100, '2024-01-01 12:00:00+10:00')"
+        )
+        conn.commit()
+        conn.close()
+        try:
+            db = UpDatabase(path)
+            row = db.conn.execute("SELECT created_at_us, settled_at_us FROM transactions").fetchone()
+            self.assertEqual(tuple(row), (1704074400000000, None))
+            db.close()
+        finally:
+            os.remove(path)
+
+    def test_query_plans_use_indexes(self):
+        """Test every structured filter is served by an index, never a table scan or sort"""
+        from upbank.database import encode_cursor, transaction_query_sql
+
+        self._insert_synthetic(200)
+        cursor = encode_cursor(1578000000000000, "txn-00000050")
+        cases = [
+            {},
+            {"account": "account-0"},
+            {"category": "groceries"},
+            {"status": "SETTLED"},
+            {"since": "2020-01-02", "until": "2020-01-04"},
+            {"tag": "work"},
+            {"account": "account-0", "cursor": cursor},
+            {"category": "groceries", "cursor": cursor},
+            {"status": "HELD", "cursor": cursor},
+            {"tag": "work", "cursor": cursor},
+        ]
+        for filters in cases:
+            sql, params = transaction_query_sql(**filters)
+            plan = [row[3] for row in self.db.conn.execute("EXPLAIN QUERY PLAN " + sql + " LIMIT ?", params + [50])]
+            with self.subTest(filters=filters, plan=plan):
+                scans = [step for step in plan if step.startswith("SCAN") and "USING" not in step]
+                self.assertEqual(scans, [])
+                self.assertTrue(any("idx_transaction" in step for step in plan))
+                if "tag" not in filters:
+                    # Tag pages sort only the rows carrying that tag
+                    self.assertNotIn("USE TEMP B-TREE FOR ORDER BY", plan)
+
+    def test_search_transactions(self):
+        """Test full-text search matches word prefixes, ranks description hits first and filters"""
+        raw = self._insert_synthetic(200)
+        woolworths = {t["id"] for t in raw if t["attributes"]["description"] == "Woolworths"}
+        results = self.db.search_transactions("wool", limit=1000)
+        self.assertEqual({row["id"] for row in results}, woolworths)
+        self.assertEqual([row["rank"] for row in results], sorted(row["rank"] for row in results))
+
+        # Punctuation is ignored rather than parsed as FTS5 syntax
+        hifi = self.db.search_transactions('jb hi-fi"', limit=1000)
+        self.assertEqual(
+            {row["id"] for row in hifi}, {t["id"] for t in raw if t["attributes"]["description"] == "JB Hi-Fi"}
+        )
+        with self.assertRaises(ValueError):
+            self.db.search_transactions("--")
+
+        # A description match outranks the same word only in a note
+        with self.db.conn:
+            self.db.conn.execute("UPDATE transactions SET note = 'bought at woolworths' WHERE id = 'txn-00000000'")
+        results = self.db.search_transactions("woolworths", limit=1000)
+        self.assertEqual(results[-1]["id"], "txn-00000000")
+
+        filtered = self.db.search_transactions("wool", tag="work", status="SETTLED", limit=1000)
+        self.assertTrue(filtered)
+        self.assertTrue(all("work" in row["tags"] for row in filtered))
+
+    def test_search_index_follows_writes(self):
+        """Test the FTS index tracks upserted, changed and deleted transactions"""
+        from upbank.models.records import TransactionRecord
+
+        raw = self._insert_synthetic(20)
+        raw[3]["attributes"]["description"] = "Corner Bakery"
+        raw[4]["attributes"]["message"] = "Bakery run"
+        self.db.insert_transactions(TransactionRecord.from_json(t).model_dump() for t in raw)
+        self.assertEqual([row["id"] for row in self.db.search_transactions("bakery")], ["txn-00000003", "txn-00000004"])
+
+        with self.db.conn:
+            self.db.conn.execute("DELETE FROM transactions WHERE id = 'txn-00000003'")
+        self.assertEqual([row["id"] for row in self.db.search_transactions("bakery")], ["txn-00000004"])
+        self.db.conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('integrity-check')")
+
     def test_insert_category(self):
         """Test inserting a category"""
         category_data = {
@@ -184,12 +497,12 @@ class TestUpDatabase(unittest.TestCase):
 
         # Now insert a webhook log
         log_data = {
+            "type": "webhook-delivery-logs",
             "id": "test-log-1",
             "attributes": {
-                "request_url": "https://test.com/webhook",
-                "request_body": '{"test": "data"}',
-                "response_status_code": 200,
-                "response_body": '{"status": "ok"}',
+                "request": {"body": '{"test": "data"}'},
+                "response": {"status_code": 200, "body": '{"status": "ok"}'},
+                "delivery_status": "DELIVERED",
                 "created_at": "2024-01-01T12:00:00+10:00"
             }
         }
@@ -201,6 +514,7 @@ class TestUpDatabase(unittest.TestCase):
         log = cursor.fetchone()
         self.assertIsNotNone(log)
         self.assertEqual(log["webhook_id"], "test-webhook-1")
+        self.assertEqual(log["request_url"], "https://test.com/webhook")
         self.assertEqual(log["response_status_code"], 200)
 
 if __name__ == '__main__':
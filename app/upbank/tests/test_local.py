@@ -0,0 +1,96 @@
+"""
+Tests for serving API models from the synced database
+"""
+
+import os
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from upbank.benchmarks.synthetic import make_account, make_categories, make_transactions
+from upbank.client import parse_transaction_page
+from upbank.database import UpDatabase
+from upbank.local import LocalReader
+from upbank.models import Account, AccountList, Category, CategoryList
+
+# Attributes the sync doesn't store, so local reads return them as None
+UNSTORED = {"hold_info", "round_up", "cashback", "card_purchase_method", "performing_customer"}
+
+class TestLocalReader(unittest.TestCase):
+    def setUp(self):
+        self.test_db_path = "test_local.db"
+        self.db = UpDatabase(self.test_db_path)
+        self.local = LocalReader(self.db, base_url="https://api.example.com/v1/")
+
+        self.accounts = [Account.model_validate(make_account(i)) for i in range(2)]
+        self.categories = CategoryList.model_validate({"data": make_categories(), "links": {}}).data
+        self.transactions = parse_transaction_page({"data": make_transactions(30), "links": {}}).data
+        self.db.insert_accounts(account.model_dump() for account in self.accounts)
+        self.db.insert_categories(category.model_dump() for category in self.categories)
+        self.db.insert_transactions(transaction.model_dump() for transaction in self.transactions)
+
+    def tearDown(self):
+        self.db.close()
+        if os.path.exists(self.test_db_path):
+            os.remove(self.test_db_path)
+
+    def test_fresh_follows_last_full_sync(self):
+        """Test fresh() is None until a sync is recorded and again once it's older than max_age"""
+        self.assertIsNone(self.local.fresh("accounts"))
+        synced_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+        self.db.mark_synced("accounts", synced_at)
+        self.assertEqual(self.local.fresh("accounts"), synced_at)
+
+        # Marks never move backwards
+        self.db.mark_synced("accounts", synced_at - timedelta(hours=1))
+        self.assertEqual(self.db.get_synced_at("accounts"), synced_at)
+
+        stale = LocalReader(self.db, max_age=timedelta(minutes=1))
+        self.assertIsNone(stale.fresh("accounts"))
+
+    def test_accounts_and_categories_match_api_models(self):
+        """Test stored accounts and categories rebuild into the models the client returns"""
+        accounts = self.local.list_accounts()
+        self.assertIsInstance(accounts, AccountList)
+        self.assertEqual(
+            [a.model_dump(exclude={"links", "relationships"}) for a in accounts.data],
+            [a.model_dump(exclude={"links", "relationships"}) for a in self.accounts]
+        )
+        self.assertEqual(accounts.data[0].links.self, "https://api.example.com/v1/accounts/account-0")
+        self.assertIsNone(self.local.get_account("missing"))
+
+        children = self.local.list_categories(parent="transport")
+        self.assertEqual({c.id for c in children.data}, {"fuel", "public-transport"})
+        category = self.local.get_category("fuel")
+        self.assertIsInstance(category, Category)
+        self.assertEqual(category.relationships.parent.data.id, "transport")
+
+    def test_transactions_match_api_models(self):
+        """Test stored transactions rebuild into matching models, newest first, with filters"""
+        listed = list(self.local.iter_transactions())
+        self.assertEqual([t.id for t in listed], [t.id for t in reversed(self.transactions)])
+
+        for original, local in zip(reversed(self.transactions), listed):
+            self.assertEqual(
+                local.attributes.model_dump(exclude=UNSTORED),
+                original.attributes.model_dump(exclude=UNSTORED)
+            )
+            for name in ("account", "category", "parent_category"):
+                self.assertEqual(
+                    getattr(local.relationships, name).data, getattr(original.relationships, name).data
+                )
+            self.assertEqual(
+                sorted(tag.id for tag in local.relationships.tags.data),
+                sorted(tag.id for tag in original.relationships.tags.data)
+            )
+
+        groceries = list(self.local.iter_transactions(category="groceries", status="SETTLED"))
+        self.assertEqual(
+            [t.id for t in groceries],
+            [t.id for t in reversed(self.transactions)
+             if t.relationships.category.data and t.relationships.category.data.id == "groceries"]
+        )
+        self.assertEqual(self.local.get_transaction(listed[3].id), listed[3])
+        self.assertIsNone(self.local.get_transaction("missing"))
+
+if __name__ == '__main__':
+    unittest.main()
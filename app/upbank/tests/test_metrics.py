@@ -0,0 +1,42 @@
+"""
+Tests for the client metrics registry
+"""
+
+from upbank.metrics import MetricsRegistry, endpoint_template
+
+def test_endpoint_template_collapses_ids():
+    """Test resource IDs are folded so metrics stay bounded per endpoint"""
+    assert endpoint_template("/accounts") == "/accounts"
+    assert endpoint_template("accounts/abc-123/transactions") == "/accounts/{id}/transactions"
+    assert endpoint_template("/transactions/t1/relationships/tags") == "/transactions/{id}/relationships/tags"
+
+def test_record_request_aggregates():
+    """Test latency, size, errors and throttling are accumulated per endpoint"""
+    registry = MetricsRegistry()
+    registry.record_request("get", "/accounts/a", 0.02, 200, 100)
+    registry.record_request("GET", "/accounts/b", 0.3, 429, 50)
+    registry.record_retry("GET", "/accounts/b")
+
+    stats = registry.snapshot()["GET /accounts/{id}"]
+    assert stats["requests"] == 2
+    assert stats["response_bytes"] == 150
+    assert stats["errors"] == 1
+    assert stats["throttled"] == 1
+    assert stats["retries"] == 1
+    assert stats["latency_max"] == 0.3
+    assert stats["latency_histogram"]["le_0.05"] == 1
+    assert stats["latency_histogram"]["le_0.5"] == 1
+
+def test_time_validation_and_reset():
+    """Test validation timing is recorded and reset clears everything"""
+    registry = MetricsRegistry()
+    with registry.time_validation("GET", "/tags"):
+        pass
+    registry.record_decode("GET", "/tags", 0.001)
+    stats = registry.snapshot()["GET /tags"]
+    assert stats["validations"] == 1
+    assert stats["decode_seconds"] == 0.001
+    assert "GET /tags" in registry.format()
+
+    registry.reset()
+    assert registry.snapshot() == {}
@@ -5,6 +5,7 @@ Tests for UP Bank database migrations
 import os
 import sqlite3
 import unittest
+from datetime import datetime, timedelta, timezone
 from upbank.migrations import init_db
 
 class TestMigrations(unittest.TestCase):
@@ -34,13 +35,18 @@ class TestMigrations(unittest.TestCase):
             # Check that migrations table exists and has our migration
             cursor.execute("SELECT id FROM migrations")
             migrations = cursor.fetchall()
-            self.assertEqual(len(migrations), 1)
-            self.assertEqual(migrations[0][0], "0001_initial_schema")
+            self.assertEqual(
+                [row[0] for row in migrations],
+                ["0001_initial_schema", "0002_sync_state", "0003_query_indexes", "0004_epoch_timestamps",
+                 "0005_spend_rollups", "0006_transaction_search",
+                 "0007_webhook_log_request_url", "0008_sync_freshness", "0009_sync_checkpoints",
+                 "0010_iso_timestamps", "0011_epoch_microseconds"]
+            )
 
             # Check that all tables exist
             cursor.execute("""
                 SELECT name FROM sqlite_master 
-                WHERE type='table' 
+                WHERE type='table' AND name NOT LIKE 'transactions_fts_%'
                 ORDER BY name
             """)
             tables = [row[0] for row in cursor.fetchall()]
@@ -48,9 +54,15 @@ class TestMigrations(unittest.TestCase):
                 'accounts',
                 'categories',
                 'migrations',
+                'spend_rollups',
+                'sync_checkpoints',
+                'sync_freshness',
+                'sync_state',
+                'tag_spend_rollups',
                 'tags',
                 'transaction_tags',
                 'transactions',
+                'transactions_fts',
                 'webhook_logs',
                 'webhooks'
             ]
@@ -65,9 +77,12 @@ class TestMigrations(unittest.TestCase):
             indexes = [row[0] for row in cursor.fetchall()]
             expected_indexes = [
                 'idx_categories_parent_id',
-                'idx_transactions_account_id',
-                'idx_transactions_category_id',
-                'idx_transactions_created_at',
+                'idx_transaction_tags_tag',
+                'idx_transactions_account_created_us',
+                'idx_transactions_category_created_us',
+                'idx_transactions_created_us',
+                'idx_transactions_settled_us',
+                'idx_transactions_status_created_us',
                 'idx_webhook_logs_webhook_id'
             ]
             self.assertEqual(sorted(indexes), expected_indexes)
@@ -80,10 +95,185 @@ class TestMigrations(unittest.TestCase):
             init_db(self.test_db_path)
             cursor.execute("SELECT COUNT(*) FROM migrations")
             migration_count = cursor.fetchone()[0]
-            self.assertEqual(migration_count, 1)
+            self.assertEqual(migration_count, 11)
 
         finally:
             conn.close()
 
+    def test_epoch_migration_backfills_existing_rows(self):
+        """Test later migrations fill epoch columns and rollups for rows written by earlier schemas"""
+        from unittest.mock import patch
+        from upbank.migrations import MIGRATIONS
+
+        with patch("upbank.migrations.MIGRATIONS", MIGRATIONS[:3]):
+            init_db(self.test_db_path)
+        conn = sqlite3.connect(self.test_db_path)
+        try:
+            conn.execute("""
+                INSERT INTO transactions (
+                    id, account_id, status, description, is_categorizable, amount_currency_code,
+                    amount_value, amount_value_in_base_units, created_at, settled_at
+                ) VALUES ('t1', 'a1', 'SETTLED', 'Coffee', 1, 'AUD', '-4.50', -450,
+                          '2024-01-01T12:00:00+10:00', '2024-01-02T00:00:00.500123+11:00')
+            """)
+            conn.commit()
+            init_db(self.test_db_path)
+            row = conn.execute("SELECT created_at_us, settled_at_us FROM transactions").fetchone()
+            self.assertEqual(row, (1704074400000000, 1704114000500123))
+            # 0005 then rolls the existing row up
+            rollups = conn.execute(
+                "SELECT grain, period, debit_base_units, transaction_count FROM spend_rollups ORDER BY grain"
+            ).fetchall()
+            self.assertEqual(rollups, [("day", "2024-01-01", -450, 1), ("month", "2024-01", -450, 1)])
+            # and 0006 indexes it for search
+            matches = conn.execute(
+                "SELECT rowid FROM transactions_fts WHERE transactions_fts MATCH 'coff*'"
+            ).fetchall()
+            self.assertEqual(len(matches), 1)
+        finally:
+            conn.close()
+
+    def test_millisecond_epoch_backfills_are_redone(self):
+        """Test epoch columns truncated to milliseconds are recomputed to the microsecond"""
+        from unittest.mock import patch
+        from upbank.migrations import MIGRATIONS
+
+        with patch("upbank.migrations.MIGRATIONS", MIGRATIONS[:10]):
+            init_db(self.test_db_path, verbose=False)
+        conn = sqlite3.connect(self.test_db_path)
+        try:
+            conn.execute("""
+                INSERT INTO transactions (
+                    id, account_id, status, description, is_categorizable, amount_currency_code,
+                    amount_value, amount_value_in_base_units, created_at, created_at_us
+                ) VALUES ('t1', 'a1', 'HELD', 'Coffee', 1, 'AUD', '-4.50', -450,
+                          '2024-01-01T12:00:00.123456+10:00', 1704074400123000)
+            """)
+            conn.commit()
+            init_db(self.test_db_path, verbose=False)
+            row = conn.execute("SELECT created_at_us, settled_at_us FROM transactions").fetchone()
+            self.assertEqual(row, (1704074400123456, None))
+        finally:
+            conn.close()
+
+    def test_adapter_timestamps_are_rewritten_as_iso(self):
+        """Test rows stored with a space separator match what a re-sync would write"""
+        from unittest.mock import patch
+        from upbank.database import UpDatabase
+        from upbank.migrations import MIGRATIONS
+
+        with patch("upbank.migrations.MIGRATIONS", MIGRATIONS[:9]):
+            init_db(self.test_db_path, verbose=False)
+        conn = sqlite3.connect(self.test_db_path)
+        conn.executescript("""
+            INSERT INTO accounts VALUES ('a1', 'Spending', 'TRANSACTIONAL', 'INDIVIDUAL', 'AUD', '10.00', 1000,
+                                         '2023-01-01 00:00:00+10:00');
+            INSERT INTO transactions (
+                id, account_id, status, description, is_categorizable, amount_currency_code,
+                amount_value, amount_value_in_base_units, created_at, settled_at, created_at_us
+            ) VALUES ('t1', 'a1', 'SETTLED', 'Coffee', 1, 'AUD', '-4.50', -450,
+                      '2024-01-01 12:00:00+10:00', '2024-01-02 00:00:00.500000+11:00', 1704074400000000);
+            INSERT INTO webhooks VALUES ('hook', 'https://example.com/hook', NULL, NULL, '2024-01-01 00:00:00+10:00');
+        """)
+        conn.close()
+
+        db = UpDatabase(self.test_db_path)
+        try:
+            row = db.conn.execute("SELECT created_at, settled_at, note_created_at FROM transactions").fetchone()
+            self.assertEqual(tuple(row), ("2024-01-01T12:00:00+10:00", "2024-01-02T00:00:00.500000+11:00", None))
+            self.assertEqual(db.conn.execute("SELECT created_at FROM webhooks").fetchone()[0], "2024-01-01T00:00:00+10:00")
+            account = {
+                "id": "a1",
+                "attributes": {
+                    "display_name": "Spending", "account_type": "TRANSACTIONAL", "ownership_type": "INDIVIDUAL",
+                    "balance": {"currency_code": "AUD", "value": "10.00", "value_in_base_units": 1000},
+                    "created_at": datetime(2023, 1, 1, tzinfo=timezone(timedelta(hours=10))),
+                },
+            }
+            self.assertEqual(db.insert_accounts([account]).unchanged, 1)
+        finally:
+            db.close()
+
+    def test_up_to_date_database_opens_with_one_read(self):
+        """Test user_version short-circuits the runner once every migration is applied"""
+        from upbank.migrations import MIGRATIONS, migrate
+
+        init_db(self.test_db_path, verbose=False)
+        conn = sqlite3.connect(self.test_db_path)
+        try:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], len(MIGRATIONS))
+            statements = []
+            conn.set_trace_callback(statements.append)
+            self.assertEqual(migrate(conn), [])
+            self.assertEqual(statements, ["PRAGMA user_version"])
+        finally:
+            conn.close()
+
+    def test_failed_migration_rolls_back(self):
+        """Test a failing migration leaves neither its changes nor its record behind"""
+        from unittest.mock import patch
+        from upbank.migrations import MIGRATIONS
+
+        broken = MIGRATIONS[:1] + [("0002_broken", "CREATE TABLE half_done (id TEXT); SELECT * FROM missing;")]
+        with patch("upbank.migrations.MIGRATIONS", broken):
+            with self.assertRaises(sqlite3.OperationalError):
+                init_db(self.test_db_path, verbose=False)
+        conn = sqlite3.connect(self.test_db_path)
+        try:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            self.assertNotIn("half_done", tables)
+            self.assertNotIn("accounts", tables)
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], 0)
+        finally:
+            conn.close()
+
+    def test_database_created_without_migrations_is_adopted(self):
+        """Test a database made by the old UpDatabase.create_tables is brought up to date"""
+        from upbank.database import UpDatabase
+
+        conn = sqlite3.connect(self.test_db_path)
+        conn.executescript("""
+            CREATE TABLE transactions (
+                id TEXT PRIMARY KEY, account_id TEXT NOT NULL, status TEXT NOT NULL, raw_text TEXT,
+                description TEXT NOT NULL, message TEXT, is_categorizable BOOLEAN NOT NULL,
+                amount_currency_code TEXT NOT NULL, amount_value TEXT NOT NULL,
+                amount_value_in_base_units INTEGER NOT NULL, foreign_amount_currency_code TEXT,
+                foreign_amount_value TEXT, foreign_amount_value_in_base_units INTEGER, settled_at TEXT,
+                created_at TEXT NOT NULL, transaction_type TEXT, note TEXT, note_created_at TEXT,
+                category_id TEXT, transfer_account_id TEXT, created_at_us INTEGER, settled_at_us INTEGER
+            );
+            CREATE TABLE webhooks (
+                id TEXT PRIMARY KEY, url TEXT NOT NULL, description TEXT, secret_key TEXT,
+                created_at TEXT NOT NULL
+            );
+            CREATE TABLE webhook_logs (
+                id TEXT PRIMARY KEY, webhook_id TEXT NOT NULL, request_body TEXT NOT NULL,
+                response_status_code INTEGER, response_body TEXT, delivery_status TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            INSERT INTO webhooks VALUES ('hook', 'https://example.com/hook', NULL, NULL, '2024-01-01');
+            INSERT INTO webhook_logs VALUES ('log', 'hook', '{}', 200, 'ok', 'DELIVERED', '2024-01-01');
+            INSERT INTO transactions (
+                id, account_id, status, description, is_categorizable, amount_currency_code,
+                amount_value, amount_value_in_base_units, created_at
+            ) VALUES ('t1', 'a1', 'HELD', 'Coffee', 1, 'AUD', '-4.50', -450, '2024-01-01T12:00:00+10:00');
+        """)
+        conn.close()
+
+        db = UpDatabase(self.test_db_path)
+        try:
+            indexes = {
+                row[0] for row in db.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+            }
+            self.assertIn("idx_transactions_account_created_us", indexes)
+            self.assertIn("idx_webhook_logs_webhook_id", indexes)
+            self.assertNotIn("idx_transactions_created_id", indexes)
+            log = db.conn.execute("SELECT request_url FROM webhook_logs").fetchone()
+            self.assertEqual(log["request_url"], "https://example.com/hook")
+            self.assertEqual(db.search_transactions("coffee")[0]["created_at_us"], 1704074400000000)
+            self.assertEqual(db.spend_summary()[0]["debit_base_units"], -450)
+        finally:
+            db.close()
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
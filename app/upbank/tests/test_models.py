@@ -19,6 +19,7 @@ from upbank.models import (
     WebhookList,
 )
 from upbank.models.base import MoneyObject, Links, Relationship, RelationshipData
+from upbank.models.records import Money, TransactionRecord
 
 def test_money_object():
     """Test MoneyObject model"""
@@ -120,4 +121,41 @@ def test_paginated_response(account_response):
     assert len(accounts.data) == 1
     assert isinstance(accounts.data[0], Account)
     assert accounts.links.prev is None
-    assert accounts.links.next == "https://api.up.com.au/api/v1/accounts?page=2" 
\ No newline at end of file
+    assert accounts.links.next == "https://api.up.com.au/api/v1/accounts?page=2" 
+
+def test_transaction_record(transaction_response):
+    """Test TransactionRecord reads the same stored fields as the Transaction model"""
+    record = TransactionRecord.from_json(transaction_response["data"])
+    assert record.id == "test-transaction-id"
+    assert record.amount == Money("AUD", "-10.00", -1000)
+    assert record.category_id == "test-category-id"
+    assert record.transfer_account_id is None
+    assert record.tag_ids == ()
+    assert not hasattr(record, "__dict__")
+
+    expected = Transaction.model_validate(transaction_response["data"]).model_dump()
+    dumped = record.model_dump()
+    for key in ("status", "raw_text", "description", "message", "is_categorizable", "amount", "transaction_type"):
+        assert dumped["attributes"][key] == expected["attributes"][key]
+    assert dumped["relationships"]["account"]["data"] == expected["relationships"]["account"]["data"]
+    assert dumped["relationships"]["category"]["data"] == expected["relationships"]["category"]["data"]
+
+def test_transaction_record_money_objects(transaction_response):
+    """Test round-up and cashback objects are unwrapped to their amounts"""
+    data = transaction_response["data"]
+    data["attributes"]["roundUp"] = {
+        "amount": {"currencyCode": "AUD", "value": "-0.50", "valueInBaseUnits": -50},
+        "boostPortion": None
+    }
+    data["attributes"]["cashback"] = {
+        "description": "Cashback",
+        "amount": {"currencyCode": "AUD", "value": "1.00", "valueInBaseUnits": 100}
+    }
+    data["attributes"]["note"] = {"value": "lunch", "createdAt": "2023-01-02T00:00:00+10:00"}
+    record = TransactionRecord.from_json(data)
+    assert record.round_up == Money("AUD", "-0.50", -50)
+    assert record.cashback == Money("AUD", "1.00", 100)
+    assert record.model_dump()["attributes"]["note"] == {
+        "value": "lunch",
+        "created_at": "2023-01-02T00:00:00+10:00"
+    }
@@ -0,0 +1,96 @@
+"""
+Tests for the pipelined fetch/convert/write sync engine
+"""
+
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from upbank.pipeline import PipelineStats, run_pipeline
+
+def make_pages(count, size=10, delay=0.0, fail_at=None, events=None):
+    try:
+        for i in range(count):
+            if i == fail_at:
+                raise RuntimeError("fetch failed")
+            time.sleep(delay)
+            if events is not None:
+                events.append(("fetch", i))
+            yield SimpleNamespace(data=[i * size + j for j in range(size)])
+    finally:
+        if events is not None:
+            events.append(("closed", threading.current_thread().name))
+
+class TestRunPipeline(unittest.TestCase):
+    def test_rows_arrive_in_order_with_stage_stats(self):
+        """Test every row is written once, in page order, and each stage is counted"""
+        written = []
+        writer_threads = set()
+
+        def write(rows):
+            writer_threads.add(threading.current_thread())
+            written.extend(rows)
+
+        stats = run_pipeline(make_pages(7), lambda page: [n * 2 for n in page.data], write)
+        self.assertEqual(written, [n * 2 for n in range(70)])
+        self.assertEqual(writer_threads, {threading.current_thread()})
+        for stage in stats.stages.values():
+            self.assertEqual((stage.batches, stage.rows), (7, 70))
+        self.assertEqual(stats.rows, 70)
+
+        total = PipelineStats()
+        total += stats
+        total += stats
+        self.assertEqual(total.stages["fetch"].rows, 140)
+        self.assertIn("convert", total.format())
+
+    def test_slow_writer_holds_back_fetching(self):
+        """Test the bounded queues stop fetching from running ahead of the writer"""
+        events = []
+
+        def write(rows):
+            events.append(("write", rows[0] // 10))
+            time.sleep(0.02)
+
+        run_pipeline(make_pages(30, events=events), lambda page: page.data, write, depth=2)
+        writes = 0
+        for kind, i in events:
+            if kind == "write":
+                writes += 1
+            elif kind == "fetch":
+                # Two queues of depth 2 plus one page in each stage
+                self.assertLessEqual(i - writes, 6)
+
+    def test_stages_overlap(self):
+        """Test fetching and writing run at the same time rather than back to back"""
+        def write(rows):
+            time.sleep(0.03)
+
+        stats = run_pipeline(make_pages(10, delay=0.03), lambda page: page.data, write)
+        self.assertLess(stats.elapsed, 0.5)  # 0.6s if run one after the other
+
+    def test_errors_in_any_stage_are_raised(self):
+        """Test a failing stage stops the pipeline and its exception reaches the caller"""
+        with self.assertRaisesRegex(RuntimeError, "fetch failed"):
+            run_pipeline(make_pages(5, fail_at=3), lambda page: page.data, lambda rows: None)
+
+        def convert(page):
+            raise ValueError("bad page")
+
+        with self.assertRaisesRegex(ValueError, "bad page"):
+            run_pipeline(make_pages(50), convert, lambda rows: None, depth=1)
+
+        events = []
+
+        def write(rows):
+            raise OSError("disk full")
+
+        with self.assertRaisesRegex(OSError, "disk full"):
+            run_pipeline(make_pages(50, events=events), lambda page: page.data, write, depth=1)
+        # The page source is closed from the fetch thread before run_pipeline returns
+        self.assertEqual(events[-1], ("closed", "sync-fetch"))
+        self.assertLess(len(events), 10)
+
+if __name__ == '__main__':
+    unittest.main()
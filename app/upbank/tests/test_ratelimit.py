@@ -0,0 +1,80 @@
+"""
+Tests for the shared UP Bank API rate limiter
+"""
+
+import pytest
+
+from upbank.ratelimit import (
+    RateLimiter,
+    backoff_delay,
+    get_rate_limiter,
+    parse_retry_after,
+    should_retry,
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_burst_then_paced():
+    """Test the bucket allows a burst and then spaces requests out"""
+    clock = FakeClock()
+    limiter = RateLimiter(rate=2.0, burst=2, clock=clock)
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == pytest.approx(0.5)
+    assert limiter.reserve() == pytest.approx(1.0)
+
+def test_refills_over_time():
+    """Test tokens come back at the configured rate"""
+    clock = FakeClock()
+    limiter = RateLimiter(rate=1.0, burst=1, clock=clock)
+    limiter.reserve()
+    clock.now = 1.0
+    assert limiter.reserve() == 0
+
+def test_pause_blocks_all_callers():
+    """Test a pause delays requests even with tokens available"""
+    clock = FakeClock()
+    limiter = RateLimiter(rate=10.0, burst=10, clock=clock)
+    limiter.pause(3.0)
+    assert limiter.reserve() == pytest.approx(3.0)
+    clock.now = 3.0
+    assert limiter.reserve() == 0
+
+def test_observe_remaining_header():
+    """Test X-RateLimit-Remaining caps the local bucket"""
+    clock = FakeClock()
+    limiter = RateLimiter(rate=1.0, burst=10, clock=clock)
+    limiter.observe({"X-RateLimit-Remaining": "0"})
+    assert limiter.reserve() == pytest.approx(1.0)
+    limiter.observe({"X-RateLimit-Remaining": "not-a-number"})
+    limiter.observe(None)
+
+def test_parse_retry_after():
+    """Test Retry-After parsing for seconds and HTTP dates"""
+    assert parse_retry_after({"Retry-After": "7"}) == 7.0
+    assert parse_retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0.0
+    assert parse_retry_after({"Retry-After": "soon"}) is None
+    assert parse_retry_after({}) is None
+
+def test_backoff_delay():
+    """Test backoff is jittered, capped and respects Retry-After"""
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, base=1.0, cap=4.0) <= 4.0
+    assert backoff_delay(0, retry_after=12.0) >= 12.0
+
+def test_should_retry():
+    """Test which responses are retried"""
+    assert should_retry("POST", 429)
+    assert should_retry("GET", 503)
+    assert not should_retry("POST", 503)
+    assert not should_retry("GET", 404)
+
+def test_shared_limiter():
+    """Test clients share one limiter by default"""
+    from upbank.client import UpClient
+    assert UpClient("a").rate_limiter is UpClient("b").rate_limiter is get_rate_limiter()
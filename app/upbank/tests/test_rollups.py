@@ -0,0 +1,130 @@
+"""
+Tests for the trigger-maintained spend rollups
+"""
+
+import os
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from upbank.benchmarks.synthetic import make_categories, make_transaction, make_transactions
+from upbank.database import UpDatabase
+from upbank.models.records import TransactionRecord
+
+def dump(transaction):
+    return TransactionRecord.from_json(transaction).model_dump()
+
+class TestSpendRollups(unittest.TestCase):
+    def setUp(self):
+        self.test_db_path = "test_rollups.db"
+        self.db = UpDatabase(self.test_db_path)
+
+    def tearDown(self):
+        self.db.close()
+        if os.path.exists(self.test_db_path):
+            os.remove(self.test_db_path)
+
+    def rollups(self):
+        return {
+            table: self.db.conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2, 3, 4, 5").fetchall()
+            for table in ("spend_rollups", "tag_spend_rollups")
+        }
+
+    def assertRollupsMatchRebuild(self):
+        """The incrementally maintained rows must equal a from-scratch aggregate"""
+        maintained = {table: [tuple(row) for row in rows] for table, rows in self.rollups().items()}
+        self.db.rebuild_rollups()
+        rebuilt = {table: [tuple(row) for row in rows] for table, rows in self.rollups().items()}
+        self.assertEqual(maintained, rebuilt)
+        self.assertTrue(rebuilt["spend_rollups"])
+
+    def test_rollups_follow_inserts_updates_and_deletes(self):
+        """Test triggers keep rollups exact through status, category, tag and amount changes"""
+        raw = [make_transaction(i, status="HELD" if i % 3 == 0 else "SETTLED") for i in range(300)]
+        self.db.insert_transactions(dump(t) for t in raw)
+        self.assertRollupsMatchRebuild()
+
+        # Held transactions settle, one changes category, one loses its tags,
+        # one is re-tagged, one's amount is corrected and one is deleted
+        changed = [make_transaction(i) for i in range(0, 300, 3)]
+        changed[1]["relationships"]["category"]["data"] = {"type": "categories", "id": "fuel"}
+        changed[2]["relationships"]["tags"]["data"] = []
+        changed[3]["relationships"]["tags"]["data"] = [{"type": "tags", "id": "gift"}]
+        changed[4]["attributes"]["amount"]["valueInBaseUnits"] = -1
+        self.db.insert_transactions(dump(t) for t in changed)
+        with self.db.conn:
+            self.db.conn.execute("DELETE FROM transactions WHERE id = 'txn-00000001'")
+        self.assertRollupsMatchRebuild()
+
+        held = self.db.conn.execute(
+            "SELECT COUNT(*) FROM spend_rollups WHERE status = 'HELD'"
+        ).fetchone()[0]
+        self.assertEqual(held, 0)
+
+    def test_unchanged_resync_does_not_touch_rollups(self):
+        """Test re-writing identical rows leaves the rollups as they were"""
+        raw = make_transactions(50)
+        self.db.insert_transactions(dump(t) for t in raw)
+        before = self.rollups()
+        self.db.insert_transactions(dump(t) for t in raw)
+        self.assertEqual(self.rollups(), before)
+
+    def test_spend_summary(self):
+        """Test summaries group by period and dimension and agree with the raw rows"""
+        raw = make_transactions(2000)  # about seven weeks of history
+        self.db.insert_categories(make_categories())
+        self.db.insert_transactions(dump(t) for t in raw)
+
+        months = self.db.spend_summary(grain="month")
+        self.assertEqual([row["period"] for row in months], ["2020-01", "2020-02"])
+        self.assertEqual(sum(row["transaction_count"] for row in months), 2000)
+        self.assertEqual(
+            sum(row["debit_base_units"] for row in months),
+            sum(t["attributes"]["amount"]["valueInBaseUnits"] for t in raw)
+        )
+
+        by_parent = self.db.spend_summary(grain="month", by="parent_category", since="2020-02")
+        self.assertEqual(
+            {row["key"] for row in by_parent}, {None, "good-life", "home", "transport"}
+        )
+        groceries = sum(
+            t["attributes"]["amount"]["valueInBaseUnits"] for t in raw
+            if t["attributes"]["createdAt"].startswith("2020-01-05")
+            and (t["relationships"]["category"]["data"] or {}).get("id") == "groceries"
+        )
+        day = self.db.spend_summary(grain="day", by="category", since="2020-01-05", until="2020-01-06")
+        self.assertEqual({row["period"] for row in day}, {"2020-01-05"})
+        self.assertEqual(
+            next(row["debit_base_units"] for row in day if row["key"] == "groceries"), groceries
+        )
+
+        tags = self.db.spend_summary(grain="month", by="tag")
+        work = sum(
+            1 for t in raw if {"type": "tags", "id": "work"} in t["relationships"]["tags"]["data"]
+        )
+        self.assertEqual(sum(row["transaction_count"] for row in tags if row["key"] == "work"), work)
+
+        with self.assertRaises(ValueError):
+            self.db.spend_summary(grain="week")
+
+    def test_periods_are_local_calendar_days(self):
+        """Test a transaction just after a local month boundary is rolled up in the local month"""
+        # 8:30am on 1 March in Sydney is still 29 February in UTC
+        self.db.insert_transactions([dump(make_transaction(
+            1, created_at=datetime(2024, 3, 1, 8, 30, tzinfo=timezone(timedelta(hours=11)))
+        ))])
+        self.assertEqual(
+            [(row["period"], row["transaction_count"]) for row in self.db.spend_summary(grain="month")],
+            [("2024-03", 1)]
+        )
+        self.assertEqual([row["period"] for row in self.db.spend_summary(grain="day")], ["2024-03-01"])
+        self.assertEqual(len(self.db.spend_summary(since="2024-03", until="2024-04")), 1)
+
+        # Range queries are on UTC instants, so the same period needs its local bounds
+        self.assertEqual(self.db.query_transactions(since="2024-03-01").data, [])
+        local_march = self.db.query_transactions(
+            since="2024-03-01T00:00:00+11:00", until="2024-04-01T00:00:00+11:00"
+        )
+        self.assertEqual([row["id"] for row in local_march.data], ["txn-00000001"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Tests for the local UP Bank API simulator
+"""
+
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from upbank.benchmarks.simulator import UpSimulator
+from upbank.benchmarks.synthetic import AEST
+from upbank.client import UpClient
+from upbank.ratelimit import RateLimiter
+
+@pytest.fixture
+def simulator():
+    with UpSimulator(transactions=250, accounts=2, held=3) as simulator:
+        yield simulator
+
+def make_client(simulator: UpSimulator) -> UpClient:
+    return UpClient(
+        "test-token",
+        base_url=simulator.base_url,
+        rate_limiter=RateLimiter(rate=1000, burst=1000),
+    )
+
+def test_cursor_pagination_covers_history(simulator):
+    """Test every transaction is served once, newest first, across cursor pages"""
+    pages = list(make_client(simulator).iter_transaction_pages(page_size=100))
+    ids = [t.id for page in pages for t in page.data]
+    assert len(pages) == 3
+    assert len(ids) == len(set(ids)) == 250
+    assert ids[0] == "txn-00000249"
+    assert pages[0].data[0].attributes.status == "HELD"
+
+def test_filters(simulator):
+    """Test status and date filters narrow the generated history"""
+    client = make_client(simulator)
+    held = list(client.iter_transactions(status="HELD"))
+    assert [t.id for t in held] == ["txn-00000249", "txn-00000248", "txn-00000247"]
+
+    since = datetime(2020, 1, 1, 1, 0, tzinfo=AEST)
+    until = datetime(2020, 1, 1, 2, 0, tzinfo=AEST)
+    window = list(client.iter_transactions(since=since, until=until))
+    assert all(since <= t.attributes.created_at < until for t in window)
+    assert [t.id for t in window] == ["txn-00000003", "txn-00000002"]
+
+def test_list_endpoints(simulator):
+    """Test accounts and categories are served in the shapes the models expect"""
+    client = make_client(simulator)
+    assert [a.id for a in client.list_accounts().data] == ["account-0", "account-1"]
+    assert client.list_categories().data
+    assert client.get_transaction("txn-00000010").id == "txn-00000010"
+
+def test_injected_throttling_is_retried():
+    """Test 429 bursts are absorbed by the client's retry loop"""
+    with UpSimulator(transactions=50, throttle_every=1, retry_after=0.01) as simulator:
+        client = make_client(simulator)
+        client.prefetch = False
+        with patch("upbank.client.time.sleep"):
+            ids = [t.id for t in client.iter_transactions(page_size=20)]
+        assert len(ids) == 50
+        assert simulator.requests == 5
+        assert simulator.throttled == 2
@@ -2,11 +2,13 @@
 Tests for UP Bank data sync
 """
 
+import csv
 import os
+import tempfile
 import unittest
 from datetime import datetime
 from unittest.mock import Mock, patch
-from upbank.sync import UpBankSync
+from upbank.sync import CsvHandler, DatabaseHandler, UpBankSync
 from upbank.models.account import Account, AccountList
 from upbank.models.transaction import Transaction, TransactionList
 from upbank.models.category import Category, CategoryList
@@ -24,12 +26,14 @@ class TestUpBankSync(unittest.TestCase):
         self.mock_client = Mock()
         
         # Create sync instance with mock client
+        self.handler = DatabaseHandler(self.test_db_path)
         with patch('upbank.sync.UpClient') as mock_client_class:
             mock_client_class.return_value = self.mock_client
-            self.sync = UpBankSync("test-api-key", self.test_db_path)
+            self.sync = UpBankSync("test-api-key", self.handler)
 
     def tearDown(self):
         """Clean up after tests"""
+        self.handler.db.close()
         if os.path.exists(self.test_db_path):
             os.remove(self.test_db_path)
 
@@ -70,7 +74,7 @@ class TestUpBankSync(unittest.TestCase):
         self.sync.sync_accounts()
         
         # Verify account was inserted
-        cursor = self.sync.db.conn.execute(
+        cursor = self.handler.db.conn.execute(
             "SELECT * FROM accounts WHERE id = ?", 
             ("test-account-1",)
         )
@@ -124,7 +128,7 @@ class TestUpBankSync(unittest.TestCase):
         )
         
         # First insert a test account
-        self.sync.db.insert_account({
+        self.handler.db.insert_account({
             "type": "accounts",
             "id": "test-account-1",
             "attributes": {
@@ -141,13 +145,13 @@ class TestUpBankSync(unittest.TestCase):
         })
         
         # Set up mock response
-        self.mock_client.list_transactions.return_value = mock_transactions
+        self.mock_client.iter_transaction_pages.return_value = iter([mock_transactions])
         
         # Run sync
         self.sync.sync_transactions()
         
         # Verify transaction was inserted
-        cursor = self.sync.db.conn.execute(
+        cursor = self.handler.db.conn.execute(
             "SELECT * FROM transactions WHERE id = ?", 
             ("test-transaction-1",)
         )
@@ -157,7 +161,7 @@ class TestUpBankSync(unittest.TestCase):
         self.assertEqual(transaction["amount_value"], "-10.00")
         
         # Verify tag was inserted and linked
-        cursor = self.sync.db.conn.execute("""
+        cursor = self.handler.db.conn.execute("""
             SELECT t.id FROM tags t
             JOIN transaction_tags tt ON t.id = tt.tag_id
             WHERE tt.transaction_id = ?
@@ -166,6 +170,240 @@ class TestUpBankSync(unittest.TestCase):
         self.assertIsNotNone(tag)
         self.assertEqual(tag["id"], "test-tag")
 
+    def test_sync_transactions_trusted(self):
+        """Test syncing transactions from unvalidated records"""
+        from upbank.models.records import RecordPage
+        from upbank.benchmarks.synthetic import make_transaction_page
+
+        page = RecordPage.from_json(make_transaction_page(0, 3))
+        self.mock_client.iter_transaction_pages.return_value = iter([page])
+        self.sync.trusted = True
+
+        self.sync.sync_transactions()
+
+        self.assertEqual(self.mock_client.iter_transaction_pages.call_args.kwargs["raw"], True)
+        cursor = self.handler.db.conn.execute("SELECT COUNT(*) FROM transactions")
+        self.assertEqual(cursor.fetchone()[0], 3)
+        cursor = self.handler.db.conn.execute(
+            "SELECT description, amount_value_in_base_units FROM transactions WHERE id = ?",
+            (page.data[0].id,)
+        )
+        row = cursor.fetchone()
+        self.assertEqual(row["description"], page.data[0].description)
+        self.assertEqual(row["amount_value_in_base_units"], page.data[0].amount.value_in_base_units)
+
+    def test_database_handler_buffers_until_flush(self):
+        """Test the handler writes in batches and flushes the remainder"""
+        from upbank.benchmarks.synthetic import make_transactions
+        from upbank.models.records import TransactionRecord
+
+        self.handler.batch_size = 4
+        for transaction in make_transactions(6):
+            self.handler.insert_transaction(TransactionRecord.from_json(transaction).model_dump())
+
+        count = lambda: self.handler.db.conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        self.assertEqual(count(), 4)
+        self.handler.flush()
+        self.assertEqual(count(), 6)
+
+    def test_sync_transactions_incremental(self):
+        """Test a second incremental run only fetches the overlap window"""
+        from datetime import timedelta
+        from upbank.benchmarks.simulator import UpSimulator
+        from upbank.client import UpClient
+        from upbank.ratelimit import RateLimiter
+
+        with UpSimulator(transactions=400, accounts=2) as simulator:
+            self.sync.client = UpClient(
+                "test-api-key",
+                base_url=simulator.base_url,
+                rate_limiter=RateLimiter(rate=1000, burst=1000),
+            )
+            self.sync.dev_mode = False
+            self.sync.sync_transactions(incremental=True)
+            first_run = simulator.requests
+            changes = self.handler.db.conn.total_changes
+
+            self.sync.sync_transactions(incremental=True, overlap=timedelta(hours=2))
+            second_run = simulator.requests - first_run
+            # Re-fetched overlap rows are unchanged, so only the two sync_state marks,
+            # the transactions freshness row and the two account checkpoints (saved,
+            # then cleared when the run completes) are written
+            self.assertEqual(self.handler.db.conn.total_changes - changes, 3 + 2 * 2)
+            self.assertEqual(self.handler.db.get_checkpoints("transactions"), [])
+            self.assertIsNotNone(self.handler.db.get_synced_at("transactions"))
+
+        count = self.handler.db.conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        self.assertEqual(count, 400)
+        self.assertEqual(first_run, 1 + 2 * 2)
+        self.assertEqual(second_run, 1 + 2)
+        mark = self.handler.get_high_water_mark("account-1")
+        newest = self.handler.db.conn.execute(
+            "SELECT created_at FROM transactions WHERE id = 'txn-00000399'"
+        ).fetchone()[0]
+        self.assertEqual(mark, datetime.fromisoformat(newest))
+
+    def interrupt_and_resume(self, **options):
+        """Fail a sync on its sixth request, then resume it; return both runs' request counts"""
+        import requests
+        from upbank.benchmarks.simulator import UpSimulator
+        from upbank.client import UpClient
+        from upbank.ratelimit import RateLimiter
+
+        self.handler.batch_size = 200
+        with UpSimulator(transactions=1000, accounts=2) as simulator:
+            client = UpClient(
+                "test-api-key",
+                base_url=simulator.base_url,
+                rate_limiter=RateLimiter(rate=1000, burst=1000),
+                prefetch=False,
+            )
+            self.sync.client = client
+            self.sync.dev_mode = False
+            request = client._request
+            calls = []
+
+            def flaky(*args, **kwargs):
+                calls.append(args)
+                if len(calls) == 6:
+                    raise requests.ConnectionError("connection reset")
+                return request(*args, **kwargs)
+
+            client._request = flaky
+            with self.assertRaises(requests.ConnectionError):
+                self.sync.sync_transactions(**options)
+            interrupted = simulator.requests
+
+            # Resume as a new process would, without the rows left buffered
+            self.handler.db.close()
+            self.handler = DatabaseHandler(self.test_db_path)
+            self.sync.handler = self.handler
+            client._request = request
+            self.sync.sync_transactions(resume=True, **options)
+            resumed = simulator.requests - interrupted
+
+        count = self.handler.db.conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        self.assertEqual(count, 1000)
+        self.assertEqual(self.handler.db.get_checkpoints("transactions"), [])
+        # Part of the resumed run's data predates it, so it doesn't count as a full sync
+        self.assertIsNone(self.handler.db.get_synced_at("transactions"))
+        return interrupted, resumed
+
+    def test_sync_transactions_resume(self):
+        """Test an interrupted sync keeps its committed batches and resumes from their cursor"""
+        interrupted, resumed = self.interrupt_and_resume()
+        # Five pages were fetched and batches of 200 committed 400 rows. The
+        # checkpoint saved with that commit covers the three whole pages
+        # written before it, so only page four is fetched twice.
+        self.assertEqual(interrupted, 5)
+        self.assertEqual(resumed, 7)
+
+    def test_sync_transactions_backfill_resume(self):
+        """Test a resumed backfill reuses the interrupted run's windows and cursors"""
+        from datetime import timezone
+        # Three 90-day windows, only the newest of which has transactions
+        interrupted, resumed = self.interrupt_and_resume(
+            backfill=True,
+            since=datetime(2019, 7, 1, tzinfo=timezone.utc),
+            until=datetime(2020, 3, 1, tzinfo=timezone.utc),
+        )
+        self.assertEqual(interrupted, 5)
+        self.assertLess(resumed, 10 + 2)
+
+    def test_main_flags(self):
+        """Test the CLI syncs non-interactively from flags and validates them"""
+        import contextlib
+        import io
+        from upbank import sync as sync_module
+        from upbank.benchmarks.simulator import UpSimulator
+        from upbank.client import UpClient
+
+        cli_db = "test_sync_cli.db"
+        self.addCleanup(lambda: os.path.exists(cli_db) and os.remove(cli_db))
+        with UpSimulator(transactions=300, accounts=2) as simulator, \
+                patch.dict(os.environ, {"UP_API_KEY": "test-api-key"}), \
+                patch.object(sync_module, "UpClient",
+                             lambda api_key, metrics=None: UpClient(api_key, base_url=simulator.base_url)), \
+                contextlib.redirect_stdout(io.StringIO()) as output:
+            status = sync_module.main(["--path", cli_db, "--resources", "accounts", "transactions"])
+            first_run = simulator.requests
+            self.assertEqual(sync_module.main(["--path", cli_db, "--resources", "transactions"]), 0)
+            second_run = simulator.requests - first_run
+
+        self.assertEqual(status, 0, output.getvalue())
+        self.assertIn("Syncing transactions incrementally", output.getvalue())
+        # Incremental by default: the second run only re-fetches the overlap window
+        self.assertLess(second_run, first_run)
+        db = DatabaseHandler(cli_db).db
+        self.assertEqual(db.conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0], 300)
+        self.assertEqual(db.conn.execute("SELECT COUNT(*) FROM categories").fetchone()[0], 0)
+        db.close()
+
+        with patch.dict(os.environ, {"UP_API_KEY": "test-api-key"}), \
+                contextlib.redirect_stderr(io.StringIO()):
+            for argv in (["--output", "csv", "--daemon"], ["--resources", "accounts", "--concurrent"]):
+                with self.assertRaises(SystemExit):
+                    sync_module.main(argv)
+
+    def test_sync_all_concurrent(self):
+        """Test small resources are stored between transaction pages, not after them"""
+        from upbank.benchmarks.simulator import UpSimulator
+        from upbank.client import UpClient
+        from upbank.ratelimit import RateLimiter
+
+        stored = []
+        insert_account = self.handler.insert_account
+        insert_transaction = self.handler.insert_transaction
+        self.handler.insert_account = lambda data: (stored.append(("account", len(stored))), insert_account(data))
+        self.handler.insert_transaction = lambda data: (stored.append(("transaction", 0)), insert_transaction(data))
+
+        with UpSimulator(transactions=1000, accounts=2) as simulator:
+            self.sync.client = UpClient(
+                "test-api-key",
+                base_url=simulator.base_url,
+                rate_limiter=RateLimiter(rate=1000, burst=1000),
+            )
+            self.sync.dev_mode = False
+            self.sync.sync_all(concurrent=True)
+
+        counts = {
+            table: self.handler.db.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("accounts", "categories", "transactions")
+        }
+        self.assertEqual(counts, {"accounts": 2, "categories": 9, "transactions": 1000})
+        first_account = next(i for kind, i in stored if kind == "account")
+        self.assertLess(first_account, 1000)
+        for resource in ("accounts", "categories", "transactions"):
+            self.assertIsNotNone(self.handler.db.get_synced_at(resource))
+
+    def test_sync_all_concurrent_survives_a_failed_fetch(self):
+        """Test a failed background fetch is raised only after the transactions are stored"""
+        import contextlib
+        import io
+        from upbank.benchmarks.simulator import UpSimulator
+        from upbank.client import UpClient
+        from upbank.ratelimit import RateLimiter
+
+        with UpSimulator(transactions=1000, accounts=2) as simulator, \
+                contextlib.redirect_stdout(io.StringIO()):
+            self.sync.client = UpClient(
+                "test-api-key",
+                base_url=simulator.base_url,
+                rate_limiter=RateLimiter(rate=1000, burst=1000),
+            )
+            self.sync.client.list_categories = Mock(side_effect=RuntimeError("categories unavailable"))
+            self.sync.dev_mode = False
+            with self.assertRaisesRegex(RuntimeError, "categories unavailable"):
+                self.sync.sync_all(concurrent=True)
+
+        counts = {
+            table: self.handler.db.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("accounts", "categories", "transactions")
+        }
+        self.assertEqual(counts, {"accounts": 2, "categories": 0, "transactions": 1000})
+        self.assertIsNotNone(self.handler.db.get_synced_at("transactions"))
+        self.assertIsNone(self.handler.db.get_synced_at("categories"))
+
     def test_sync_categories(self):
         """Test syncing categories"""
         # Create mock category data
@@ -195,7 +433,7 @@ class TestUpBankSync(unittest.TestCase):
         self.sync.sync_categories()
         
         # Verify category was inserted
-        cursor = self.sync.db.conn.execute(
+        cursor = self.handler.db.conn.execute(
             "SELECT * FROM categories WHERE id = ?", 
             ("test-category-1",)
         )
@@ -266,7 +504,7 @@ class TestUpBankSync(unittest.TestCase):
         self.sync.sync_webhooks()
         
         # Verify webhook was inserted
-        cursor = self.sync.db.conn.execute(
+        cursor = self.handler.db.conn.execute(
             "SELECT * FROM webhooks WHERE id = ?", 
             ("test-webhook-1",)
         )
@@ -276,7 +514,7 @@ class TestUpBankSync(unittest.TestCase):
         self.assertEqual(webhook["description"], "Test Webhook")
         
         # Verify webhook log was inserted
-        cursor = self.sync.db.conn.execute(
+        cursor = self.handler.db.conn.execute(
             "SELECT * FROM webhook_logs WHERE id = ?", 
             ("test-log-1",)
         )
@@ -285,5 +523,59 @@ class TestUpBankSync(unittest.TestCase):
         self.assertEqual(log["webhook_id"], "test-webhook-1")
         self.assertEqual(log["response_status_code"], 200)
 
+        # Logs for several webhooks are fetched in parallel and stored against the right webhook
+        import time
+        webhooks = [mock_webhooks.data[0].model_copy(update={"id": f"webhook-{i}"}) for i in range(4)]
+        self.mock_client.list_webhooks.return_value = WebhookList(data=webhooks, links=Links(prev=None, next=None))
+
+        def list_webhook_logs(webhook_id):
+            time.sleep(0.1)
+            log = mock_logs.data[0].model_copy(update={"id": f"log-{webhook_id}"})
+            return WebhookLogList(data=[log], links=Links(prev=None, next=None))
+
+        self.mock_client.list_webhook_logs.side_effect = list_webhook_logs
+        started = time.perf_counter()
+        self.sync.sync_webhooks(max_workers=4)
+        self.assertLess(time.perf_counter() - started, 0.3)
+        rows = self.handler.db.conn.execute(
+            "SELECT id, webhook_id FROM webhook_logs WHERE id LIKE 'log-%' ORDER BY id"
+        ).fetchall()
+        self.assertEqual([tuple(row) for row in rows], [(f"log-webhook-{i}", f"webhook-{i}") for i in range(4)])
+
+class TestCsvHandler(unittest.TestCase):
+    def setUp(self):
+        self.output = tempfile.TemporaryDirectory()
+        self.addCleanup(self.output.cleanup)
+        self.handler = CsvHandler(self.output.name)
+
+    def read(self, filename):
+        with open(os.path.join(self.output.name, filename), newline='') as f:
+            return list(csv.DictReader(f))
+
+    def test_rows_stream_through_a_spill(self):
+        """Test rows are spilled as they arrive and written under the union of their columns"""
+        created = datetime(2024, 1, 2, 3, 4, 5)
+        self.handler.insert_transaction({"id": "t1", "amount": {"value": "1.50"}, "created_at": created})
+        self.handler.insert_transaction({"id": "t2", "tags": ["a", "b"], "note": None, "settled": True})
+        self.handler.insert_account({"id": "a1"})
+        # Nothing is written until flush
+        self.assertFalse([name for name in os.listdir(self.output.name) if name.endswith(".csv")])
+
+        self.handler.flush(["transactions"])
+        rows = self.read("transactions.csv")
+        self.assertEqual(list(rows[0]), ["amount_value", "created_at", "id", "note", "settled", "tags"])
+        self.assertEqual(rows[0], {
+            "amount_value": "1.50", "created_at": str(created), "id": "t1",
+            "note": "", "settled": "", "tags": "",
+        })
+        self.assertEqual((rows[1]["tags"], rows[1]["settled"], rows[1]["note"]), ("a,b", "True", ""))
+        self.assertEqual(sorted(os.listdir(self.output.name)), ["transactions.csv"])
+
+        self.handler.insert_webhook_log("w1", {"id": "l1"})
+        self.handler.flush()
+        self.assertEqual(self.read("accounts.csv"), [{"id": "a1"}])
+        self.assertEqual(self.read("webhook_logs.csv"), [{"id": "l1", "webhook_id": "w1"}])
+        self.assertEqual(sorted(os.listdir(self.output.name)), ["accounts.csv", "transactions.csv", "webhook_logs.csv"])
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file